@@ -1,15 +1,23 @@
-import dash
-from dash import dcc, html, Input, Output, State, callback_context
-import dash_bootstrap_components as dbc
-import plotly.graph_objs as go
-import pandas as pd
-import numpy as np
-from datetime import datetime
-import json
-
-# Initialize the Dash app
-app = dash.Dash(__name__, external_stylesheets=[dbc.themes.BOOTSTRAP])
-app.title = "ApexMind - F1 Race Engineer"
+import os
+from collections import OrderedDict
+from functools import lru_cache, partial, wraps
+
+from race_simulator import RaceSimulator
+from prediction import MonteCarloPredictor
+from session_store import SessionStore
+from strategy_cache import StrategyCache
+from race_clock import RaceClock
+from telemetry_ingest import TelemetryIngest, TelemetryFeed, apply_lap
+from downsample import MinMaxDecimator
+from race_history import RaceHistoryStore
+from race_timeline import RaceTimeline
+from anomaly_detector import describe
+from rolling_stats import RollingStats, parse_stats_query
+from metrics import Registry, Counter, Gauge, Histogram, SIZE_BUCKETS, instrument
+
+# Dash, Plotly and the Bootstrap components are imported by create_app() and
+# the few functions that need them, so loading this module only pulls in the
+# simulator core
 
 # F1-inspired color scheme
 colors = {
@@ -26,262 +34,508 @@ colors = {
 		'chart_danger': '#dc0000'
 }
 
-# Race Simulator Class
-class RaceSimulator:
-		def __init__(self):
-				self.lap = 0
-				self.total_laps = 50
-				self.speed = 280
-				self.battery = 100
-				self.tyre_wear = 0
-				self.tyre_temp = 85
-				self.fuel = 100
-				self.position = 3
-				self.tyre_compound = "Medium"
-				self.weather = "Dry"
-				self.safety_car = False
-				self.lap_times = []
-				self.tyre_age = 0
-				self.pit_stops = 0
-				self.historical_degradation = []
-			
-		def to_dict(self):
-				return {
-						'lap': self.lap,
-						'total_laps': self.total_laps,
-						'speed': self.speed,
-						'battery': self.battery,
-						'tyre_wear': self.tyre_wear,
-						'tyre_temp': self.tyre_temp,
-						'fuel': self.fuel,
-						'position': self.position,
-						'tyre_compound': self.tyre_compound,
-						'weather': self.weather,
-						'safety_car': self.safety_car,
-						'lap_times': self.lap_times,
-						'tyre_age': self.tyre_age,
-						'pit_stops': self.pit_stops,
-						'historical_degradation': self.historical_degradation
-				}
-	
-		@staticmethod
-		def from_dict(data):
-				sim = RaceSimulator()
-				for key, value in data.items():
-						setattr(sim, key, value)
-				return sim
-	
-		def simulate_lap(self):
-				self.lap += 1
-				self.tyre_age += 1
-			
-				base_degradation = 1.2
-				degradation_factor = 1 + (self.tyre_age / 15) ** 1.5
-				self.tyre_wear = min(100, self.tyre_wear + base_degradation * degradation_factor)
-			
-				if self.weather == "Wet":
-						self.tyre_wear += 0.3
-						self.speed = max(200, self.speed - 15)
-				else:
-						self.speed = 280 - (self.tyre_wear * 0.4) + np.random.uniform(-5, 5)
-					
-				self.tyre_temp = 85 + (self.tyre_age * 1.5) - (self.tyre_wear * 0.2) + np.random.uniform(-3, 3)
-				self.tyre_temp = max(60, min(110, self.tyre_temp))
-			
-				self.battery = max(0, self.battery - np.random.uniform(1.5, 2.5))
-				self.fuel = max(0, self.fuel - np.random.uniform(1.6, 2.0))
-			
-				base_lap_time = 82.5
-				wear_penalty = (self.tyre_wear / 100) * 5
-				weather_penalty = 8 if self.weather == "Wet" else 0
-				lap_time = base_lap_time + wear_penalty + weather_penalty + np.random.uniform(-0.5, 0.5)
-				self.lap_times.append(lap_time)
-			
-				self.historical_degradation.append({
-						'lap': self.lap,
-						'tyre_age': self.tyre_age,
-						'wear': self.tyre_wear,
-						'lap_time': lap_time,
-						'compound': self.tyre_compound
-				})
-			
-				return lap_time
-	
-		def predict_future_performance(self, laps_ahead=10):
-				predictions = []
-			
-				if len(self.historical_degradation) < 3:
-						return predictions
-			
-				recent_data = self.historical_degradation[-5:]
-				wear_rates = [recent_data[i]['wear'] - recent_data[i-1]['wear'] 
-											for i in range(1, len(recent_data))]
-				avg_wear_rate = np.mean(wear_rates) if wear_rates else 1.2
-			
-				current_wear = self.tyre_wear
-				current_age = self.tyre_age
-			
-				for i in range(1, laps_ahead + 1):
-						future_age = current_age + i
-						future_wear = min(100, current_wear + (avg_wear_rate * i))
-						base_time = 82.5
-						predicted_time = base_time + (future_wear / 100) * 5 + np.random.uniform(-0.3, 0.3)
-					
-						predictions.append({
-								'lap': self.lap + i,
-								'predicted_wear': future_wear,
-								'predicted_time': predicted_time,
-								'tyre_age': future_age
-						})
-					
-				return predictions
-	
-		def ai_strategy_recommendation(self):
-				predictions = self.predict_future_performance(laps_ahead=10)
-				laps_remaining = self.total_laps - self.lap
-			
-				if self.tyre_wear < 30:
-						recommendation = "STAY OUT"
-						confidence = 95
-						reasoning = "Tyres in excellent condition. No performance loss detected."
-				elif self.tyre_wear < 55:
-						if laps_remaining > 15:
-								recommendation = "STAY OUT 3-5 LAPS"
-								confidence = 78
-								reasoning = "Tyres degrading but still competitive. Monitor closely."
-						else:
-								recommendation = "STAY OUT"
-								confidence = 85
-								reasoning = "Too few laps remaining. Push current tyres to the end."
-				elif self.tyre_wear < 75:
-						if laps_remaining > 10:
-								recommendation = "PIT WITHIN 2 LAPS"
-								confidence = 88
-								reasoning = "Significant tyre wear detected. Fresh tyres will gain 1-1.5s/lap."
-						else:
-								recommendation = "PIT NOW (OPTIONAL)"
-								confidence = 65
-								reasoning = "High wear but few laps left. Marginal call."
-				else:
-						recommendation = "PIT NOW!"
-						confidence = 98
-						reasoning = "Critical tyre wear! Losing 2+ seconds per lap. Immediate pit required."
-					
-				if self.weather == "Wet" and self.tyre_compound != "Wet":
-						recommendation = "PIT NOW - WRONG TYRES!"
-						confidence = 99
-						reasoning = "Wet conditions require wet tyres immediately for safety."
-					
-				if self.safety_car:
-						recommendation = "PIT NOW (SAFETY CAR)"
-						confidence = 95
-						reasoning = "Safety car deployed! Free pit stop opportunity."
-					
-				return {
-						'recommendation': recommendation,
-						'confidence': confidence,
-						'reasoning': reasoning,
-						'predictions': predictions
-				}
-	
-		def pit_stop(self, new_compound="Medium"):
-				self.tyre_wear = 0
-				self.tyre_age = 0
-				self.tyre_compound = new_compound
-				self.pit_stops += 1
-				self.position = min(20, self.position + 2)
-				return 22.5
-	
-# Dashboard Layout
-app.layout = dbc.Container([
-		# Store for simulator state
-		dcc.Store(id='simulator-state', data=RaceSimulator().to_dict()),
-		dcc.Store(id='chat-history', data=[{"role": "ai", "message": "AI ENGINEER: Ready to assist! Ask me anything about race strategy."}]),
-	
-		# Auto-run interval
-		dcc.Interval(id='auto-interval', interval=1500, disabled=True, n_intervals=0),
-	
-		# Header
-		dbc.Row([
-				dbc.Col([
-						html.Div([
-								html.H1("APEXMIND", 
-												style={
-														'fontFamily': 'Consolas, monospace',
-														'fontWeight': 'bold',
-														'fontSize': '48px',
-														'color': colors['accent_red'],
-														'textAlign': 'center',
-														'marginBottom': '5px',
-														'letterSpacing': '3px'
-												}),
-								html.P("AI RACE ENGINEER | HAAS F1 × MPHASIS TRACKSHIFT",
-											style={
-													'fontFamily': 'Consolas, monospace',
-													'fontSize': '12px',
-													'color': colors['text_secondary'],
-													'textAlign': 'center',
-													'marginBottom': '0'
-											})
-						], style={
-								'backgroundColor': colors['bg_secondary'],
-								'padding': '20px',
-								'borderRadius': '5px',
-								'marginBottom': '20px'
-						})
-				], width=12)
-		]),
-	
-		# Main Content
-		dbc.Row([
-				# Left Panel - Controls & Telemetry
-				dbc.Col([
-						# Race Control
-						dbc.Card([
-								dbc.CardHeader(" RACE CONTROL", style={
-										'fontFamily': 'Consolas, monospace',
-										'fontWeight': 'bold',
-										'backgroundColor': colors['bg_tertiary'],
-										'color': colors['text_primary'],
-										'border': 'none'
-								}),
-								dbc.CardBody([
+# Server-side simulators; the browser only keeps a session id and version
+sessions = SessionStore(
+		max_sessions=int(os.environ.get('APEXMIND_MAX_SESSIONS', 1000)),
+		ttl_seconds=float(os.environ.get('APEXMIND_SESSION_TTL', 3600)),
+		max_bytes=int(float(os.environ.get('APEXMIND_SESSION_MEMORY_MB', 256)) * 1024 * 1024),
+		# Full-field simulation sets positions and gaps; 0 disables it. Sector
+		# segments switch on the per-corner tyre model; 0 keeps one aggregate tyre.
+		factory=partial(RaceSimulator, field_size=int(os.environ.get('APEXMIND_FIELD_SIZE', 20)),
+										sector_segments=int(os.environ.get('APEXMIND_SECTOR_SEGMENTS', 0)) or None)
+)
+
+# Monte Carlo prediction bands, kept inside a per-callback latency budget
+predictor = MonteCarloPredictor(
+		n_rollouts=int(os.environ.get('APEXMIND_PREDICTION_ROLLOUTS', 5000)),
+		budget_ms=float(os.environ.get('APEXMIND_PREDICTION_BUDGET_MS', 20.0))
+)
+
+# Recorded telemetry (a .npy/.csv file or udp://host:port) replaces the synthetic
+# speed, tyre temp, battery and fuel of each lap once that lap is complete, and
+# every sample is checked for anomalies unless APEXMIND_TELEMETRY_ANOMALIES=0.
+# The feed thread is started by create_app().
+telemetry = None
+telemetry_feed = None
+TELEMETRY_SOURCE = os.environ.get('APEXMIND_TELEMETRY_SOURCE')
+TELEMETRY_CAR = int(os.environ.get('APEXMIND_TELEMETRY_CAR', 0))
+if TELEMETRY_SOURCE:
+		telemetry = TelemetryIngest(n_cars=int(os.environ.get('APEXMIND_TELEMETRY_CARS', 20)),
+																capacity=int(os.environ.get('APEXMIND_TELEMETRY_BUFFER', 4096)),
+																detect_anomalies=os.environ.get('APEXMIND_TELEMETRY_ANOMALIES', '1') != '0')
+		telemetry_feed = TelemetryFeed(TELEMETRY_SOURCE, telemetry,
+																	 speed=float(os.environ.get('APEXMIND_TELEMETRY_SPEED', 1.0)))
+
+# Every completed lap and pit stop across sessions, kept on disk; empty disables.
+# The file is opened by create_app(), so loading this module never writes to it.
+HISTORY_PATH = os.environ.get('APEXMIND_HISTORY_DB', 'race_history.sqlite')
+history_store = None
+
+def open_history(path=HISTORY_PATH):
+		global history_store
+		if path and history_store is None:
+				history_store = RaceHistoryStore(path)
+		return history_store
+
+def run_lap(simulator):
+		with simulator_seconds.time('simulate_lap'):
+				simulator.simulate_lap()
+		if telemetry is not None:
+				record = telemetry.lap(TELEMETRY_CAR, simulator.lap)
+				if record is not None:
+						apply_lap(simulator, record)
+		if history_store is not None:
+				history_store.record_lap(simulator)
+
+# Server-side auto-run clocks pushing state over Server-Sent Events
+clocks = RaceClock(sessions, interval=float(os.environ.get('APEXMIND_CLOCK_INTERVAL_MS', 1500)) / 1000,
+									 step=run_lap)
+
+# Memoized strategy calls and prediction bands, keyed on simulator state
+strategy_cache = StrategyCache(maxsize=int(os.environ.get('APEXMIND_STRATEGY_CACHE_SIZE', 512)))
+
+# Prometheus metrics, served on /metrics
+metrics = Registry()
+callback_seconds = metrics.register(Histogram('apexmind_callback_seconds', "Dash callback latency", ['callback']))
+callback_errors = metrics.register(Counter('apexmind_callback_errors_total', "Dash callback exceptions", ['callback']))
+callback_request_bytes = metrics.register(Histogram('apexmind_callback_request_bytes', "Dash callback request body size",
+																										['callback'], buckets=SIZE_BUCKETS))
+callback_response_bytes = metrics.register(Histogram('apexmind_callback_response_bytes', "Dash callback response size",
+																										 ['callback'], buckets=SIZE_BUCKETS))
+simulator_seconds = metrics.register(Histogram('apexmind_simulator_seconds', "Time in simulator and strategy work",
+																							 ['method']))
+metrics.register(Gauge('apexmind_sessions', "Live sessions", collect=lambda: {(): len(sessions)}))
+metrics.register(Gauge('apexmind_session_bytes', "Estimated bytes held by live sessions",
+											 collect=lambda: {(): sessions.total_bytes}))
+metrics.register(Counter('apexmind_session_evictions_total', "Sessions evicted since start",
+												 collect=lambda: {(): sessions.evictions}))
+metrics.register(Gauge('apexmind_clocks_running', "Sessions on auto-run", collect=lambda: {(): len(clocks)}))
+metrics.register(Gauge('apexmind_stream_subscribers', "Open race clock event streams",
+											 collect=lambda: {(): clocks.subscriber_count()}))
+render_cache = metrics.register(Counter('apexmind_render_cache_total', "Display renders by cache result", ['result']))
+metrics.register(Gauge('apexmind_strategy_cache', "Strategy cache counters", ['stat'],
+											 collect=lambda: {(key,): value for key, value in strategy_cache.stats().items()}))
+
+def callback_metrics(name):
+		# Latency and error counts per callback; the name is left on flask.g so
+		# the response hook can attribute payload sizes
+		import flask
+		from dash.exceptions import PreventUpdate
+		timed = instrument(name, callback_seconds, callback_errors, ignore=PreventUpdate)
+
+		def decorate(func):
+				@wraps(func)
+				def named(*args):
+						if flask.has_request_context():
+								flask.g.callback = name
+						return func(*args)
+				return timed(named)
+		return decorate
+
+def gap_text(simulator):
+		# Gaps to the cars either side, when the whole field is simulated
+		if not simulator.field:
+				return ""
+		ahead, behind = simulator.field.gaps()
+		parts = []
+		if ahead is not None:
+				parts.append(f"+{ahead:.1f}s TO P{simulator.position - 1}")
+		if behind is not None:
+				parts.append(f"-{behind:.1f}s TO P{simulator.position + 1}")
+		return " | ".join(parts)
+
+# Laps an anomaly alert stays on the strategy panel
+ALERT_LAPS = 5
+
+def race_alerts(simulator, laps=ALERT_LAPS):
+		# Anomalies of the last `laps` laps: the simulator's lap checks, then the
+		# telemetry feed's sample checks. Each has a key the chat posts once; the
+		# feed keeps the first of its alerts per lap, channel and kind.
+		alerts = {f"lap-{a['lap']}-{a['channel']}-{a['kind']}": describe(a)
+							for a in simulator.anomalies.recent(simulator.lap, laps)}
+		if telemetry is not None:
+				for a in telemetry.alerts(TELEMETRY_CAR, simulator.lap, laps):
+						alerts.setdefault(f"telemetry-{a['lap']}-{a['channel']}-{a['kind']}", f"{describe(a)} IN TELEMETRY")
+		return [{'key': key, 'message': message} for key, message in alerts.items()]
+
+def panel_state(simulator, strategy):
+		# Everything the telemetry and strategy panels show; assets/panels.js renders it
+		ahead, behind = simulator.field.gaps() if simulator.field else (None, None)
+		return {
+				'lap': simulator.lap,
+				'total_laps': simulator.total_laps,
+				'position': simulator.position,
+				'gap_ahead': None if ahead is None else round(ahead, 2),
+				'gap_behind': None if behind is None else round(behind, 2),
+				'speed': round(float(simulator.speed), 1),
+				'tyre_compound': simulator.tyre_compound,
+				'tyre_age': simulator.tyre_age,
+				'battery': round(float(simulator.battery), 2),
+				'tyre_wear': round(float(simulator.tyre_wear), 2),
+				'recommendation': strategy['recommendation'],
+				'confidence': strategy['confidence'],
+				'reasoning': strategy['reasoning'],
+				'alerts': race_alerts(simulator)
+		}
+
+def rgba(hex_color, alpha):
+		return f"rgba({int(hex_color[1:3], 16)}, {int(hex_color[3:5], 16)}, {int(hex_color[5:7], 16)}, {alpha})"
+
+# Chart layouts and trace styles are built once; each render only fills in data
+def chart_layout(title, yaxis_title, **extra):
+		import plotly.graph_objs as go
+		return go.Layout(
+				template='plotly_dark',
+				paper_bgcolor=colors['bg_tertiary'],
+				plot_bgcolor=colors['bg_primary'],
+				font=dict(family='Consolas, monospace', color=colors['text_secondary']),
+				title={'text': title, 'font': {'size': 14, 'color': colors['text_primary']}},
+				xaxis_title="Lap",
+				yaxis_title=yaxis_title,
+				margin=dict(l=50, r=20, t=40, b=40),
+				showlegend=True,
+				legend=dict(orientation='h', yanchor='top', y=1.1, xanchor='left', x=0),
+				**extra
+		).to_plotly_json()
+
+@lru_cache(maxsize=None)
+def chart_layouts():
+		# The plotly_dark template is expanded into each layout, so Plotly is
+		# loaded on the first chart (create_app() builds them up front)
+		import plotly.graph_objs as go
+		lap_times = chart_layout('LAP TIMES & PREDICTIONS', "Time (s)")
+		tyre_wear = chart_layout('TYRE DEGRADATION ANALYSIS', "Wear (%)", yaxis=dict(range=[0, 105]))
+
+		# Critical zone
+		critical = go.Figure(layout=tyre_wear)
+		critical.add_hrect(y0=70, y1=100, fillcolor=colors['chart_danger'], opacity=0.15,
+											 line_width=0, annotation_text="CRITICAL ZONE",
+											 annotation_position="top right")
+		return lap_times, tyre_wear, critical.layout.to_plotly_json()
+
+LAP_TIME_TRACE = {
+		'type': 'scatter',
+		'mode': 'lines+markers',
+		'name': 'ACTUAL',
+		'line': {'color': colors['chart_line'], 'width': 3},
+		'marker': {'size': 6}
+}
+
+WEAR_TRACE = {
+		'type': 'scatter',
+		'mode': 'lines+markers',
+		'name': 'ACTUAL WEAR',
+		'fill': 'tozeroy',
+		'line': {'color': colors['chart_danger'], 'width': 3},
+		'marker': {'size': 6},
+		'fillcolor': rgba(colors['chart_danger'], 0.2)
+}
+
+# P10-P90 shaded region with the P50 rollout as the dashed prediction
+BAND_LOW_TRACE = {
+		'type': 'scatter',
+		'mode': 'lines',
+		'line': {'width': 0},
+		'hoverinfo': 'skip',
+		'showlegend': False
+}
+
+BAND_HIGH_TRACE = {
+		'type': 'scatter',
+		'mode': 'lines',
+		'name': 'P10-P90',
+		'fill': 'tonexty',
+		'fillcolor': rgba(colors['chart_warn'], 0.2),
+		'line': {'width': 0}
+}
+
+PREDICTION_TRACE = {
+		'type': 'scatter',
+		'mode': 'lines+markers',
+		'line': {'color': colors['chart_warn'], 'width': 2, 'dash': 'dash'},
+		'marker': {'size': 5, 'symbol': 'square'}
+}
+
+# Mean wear by tyre age of past stints on the same compound and weather
+PAST_STINTS_TRACE = {
+		'type': 'scatter',
+		'mode': 'lines',
+		'name': 'PAST STINTS',
+		'line': {'color': colors['accent_silver'], 'width': 2, 'dash': 'dot'}
+}
+
+# Trace slots are fixed so incremental updates can address them by index:
+# 0 actual, 1 band low, 2 band high, 3 median prediction, 4 actual (open tail),
+# 5 past stints (wear chart only)
+ACTUAL_SLOT, BAND_LOW_SLOT, BAND_HIGH_SLOT, PREDICTION_SLOT, TAIL_SLOT, PAST_STINTS_SLOT = range(6)
+
+# Points per actual series sent to the browser, about one per pixel of chart width
+CHART_MAX_POINTS = int(os.environ.get('APEXMIND_CHART_MAX_POINTS', 800))
+CHART_SERIES = (('lap_time', LAP_TIME_TRACE), ('wear', WEAR_TRACE))
+
+def chart_series(entry):
+		# Per-session decimators for the actual series, caught up to the history.
+		# The first lap of each stint is kept so pit stops stay visible.
+		decimators = entry.views.get('charts')
+		if decimators is None:
+				decimators = {name: MinMaxDecimator(CHART_MAX_POINTS) for name, _ in CHART_SERIES}
+				entry.views['charts'] = decimators
+		history = entry.simulator.history
+		stint_starts = history.tyre_age <= 1
+		for name, decimator in decimators.items():
+				decimator.update(history.column(name), stint_starts)
+		return decimators
+
+def actual_traces(history, name, trace, decimator):
+		laps = history.lap
+		values = history.column(name)
+		closed = decimator.closed()
+		tail = decimator.tail(values)
+		return (dict(trace, x=laps[closed], y=values[closed]),
+						dict(trace, x=laps[tail], y=values[tail], showlegend=False))
+
+def prediction_traces(bands, key, name):
+		pred_laps = [p['lap'] for p in bands]
+		return [
+				dict(BAND_LOW_TRACE, x=pred_laps, y=[p[f'{key}_p10'] for p in bands]),
+				dict(BAND_HIGH_TRACE, x=pred_laps, y=[p[f'{key}_p90'] for p in bands]),
+				dict(PREDICTION_TRACE, name=name, x=pred_laps, y=[p[f'{key}_p50'] for p in bands])
+		]
+
+def past_stints_curve(entry):
+		# Stored wear curve laid over the current stint, cached until the store changes
+		simulator = entry.simulator
+		if history_store is None:
+				return [], []
+		wet = simulator.weather == "Wet"
+		key = (simulator.tyre_compound, wet, history_store.version)
+		cached = entry.views.get('past_stints')
+		if cached is None or cached[0] != key:
+				curve = history_store.wear_curve(simulator.tyre_compound, wet, max_age=simulator.total_laps)
+				cached = (key, [age for age, _, _, _ in curve], [wear for _, wear, _, _ in curve])
+				entry.views['past_stints'] = cached
+		_, ages, wear = cached
+		stint_start = simulator.lap - simulator.tyre_age
+		return [stint_start + age for age in ages], wear
+
+def build_chart_figures(simulator, bands, series, past_stints=([], [])):
+		# Full redraw of both charts
+		lap_times_layout, tyre_wear_layout, tyre_wear_critical_layout = chart_layouts()
+		if not simulator.history:
+				return {'data': [], 'layout': lap_times_layout}, {'data': [], 'layout': tyre_wear_layout}
+
+		history = simulator.history
+		actual, tail = actual_traces(history, 'lap_time', LAP_TIME_TRACE, series['lap_time'])
+		lap_times_fig = {
+				'data': [actual] + prediction_traces(bands, 'time', 'PREDICTION') + [tail],
+				'layout': lap_times_layout
+		}
+
+		actual, tail = actual_traces(history, 'wear', WEAR_TRACE, series['wear'])
+		tyre_wear_fig = {
+				'data': [actual] + prediction_traces(bands, 'wear', 'PREDICTED') + [tail,
+								 dict(PAST_STINTS_TRACE, x=past_stints[0], y=past_stints[1])],
+				'layout': tyre_wear_critical_layout
+		}
+		return lap_times_fig, tyre_wear_fig
+
+def patch_chart_figures(simulator, bands, series, cursor, past_stints=([], [])):
+		# Append newly closed points to the actual series, replace the open tail
+		# and swap in fresh predictions
+		from dash import Patch
+		lap_times_patch = Patch()
+		tyre_wear_patch = Patch()
+		history = simulator.history
+		laps = history.lap
+		for patch, name in ((lap_times_patch, 'lap_time'), (tyre_wear_patch, 'wear')):
+				decimator = series[name]
+				values = history.column(name)
+				closed = decimator.closed()
+				new = closed[closed >= cursor['closed'][name]]
+				if len(new):
+						patch['data'][ACTUAL_SLOT]['x'].extend(laps[new].tolist())
+						patch['data'][ACTUAL_SLOT]['y'].extend(values[new].tolist())
+				tail = decimator.tail(values)
+				patch['data'][TAIL_SLOT]['x'] = laps[tail].tolist()
+				patch['data'][TAIL_SLOT]['y'] = values[tail].tolist()
+
+		for patch, key in ((lap_times_patch, 'time'), (tyre_wear_patch, 'wear')):
+				pred_laps = [p['lap'] for p in bands]
+				for slot, band in ((BAND_LOW_SLOT, 'p10'), (BAND_HIGH_SLOT, 'p90'), (PREDICTION_SLOT, 'p50')):
+						patch['data'][slot]['x'] = pred_laps
+						patch['data'][slot]['y'] = [p[f'{key}_{band}'] for p in bands]
+		tyre_wear_patch['data'][PAST_STINTS_SLOT]['x'] = past_stints[0]
+		tyre_wear_patch['data'][PAST_STINTS_SLOT]['y'] = past_stints[1]
+		return lap_times_patch, tyre_wear_patch
+
+def chart_cursor(entry, series):
+		simulator = entry.simulator
+		return {'session_id': entry.session_id, 'generation': entry.generation,
+						'lap': simulator.lap, 'pit_stops': simulator.pit_stops,
+						'widths': {name: decimator.width for name, decimator in series.items()},
+						'closed': {name: decimator.closed_end for name, decimator in series.items()}}
+
+# Laps a client may fall behind (e.g. a fast server clock) and still be patched
+MAX_PATCH_LAPS = 25
+
+def patch_base(entry, series, cursor):
+		# What a client's chart update depends on: None for a full redraw, else
+		# where its closed buckets end. Patches go to clients holding a recent lap
+		# of the same stint at the same decimation; a reset, a pit stop, a long
+		# gap or a change of bucket width redraws.
+		simulator = entry.simulator
+		incremental = (
+				cursor is not None
+				and cursor['session_id'] == entry.session_id
+				and cursor['generation'] == entry.generation
+				and cursor['pit_stops'] == simulator.pit_stops
+				and cursor['lap'] > 0
+				and 0 <= simulator.lap - cursor['lap'] <= MAX_PATCH_LAPS
+				and cursor.get('widths') == {name: decimator.width for name, decimator in series.items()}
+		)
+		return tuple(cursor['closed'][name] for name in series) if incremental else None
+
+def render_charts(entry, bands, cursor):
+		simulator = entry.simulator
+		series = chart_series(entry)
+		past_stints = past_stints_curve(entry)
+		if patch_base(entry, series, cursor) is not None:
+				figures = patch_chart_figures(simulator, bands, series, cursor, past_stints)
+		else:
+				figures = build_chart_figures(simulator, bands, series, past_stints)
+		return figures + (chart_cursor(entry, series),)
+
+# Styles shared across the layout, built once at import
+MONO = {'fontFamily': 'Consolas, monospace'}
+BOLD = dict(MONO, fontWeight='bold')
+CARD_HEADER = dict(BOLD, backgroundColor=colors['bg_tertiary'], color=colors['text_primary'], border='none')
+CARD_BODY = {'backgroundColor': colors['bg_tertiary']}
+CARD = {'backgroundColor': colors['bg_tertiary'], 'border': 'none'}
+CARD_SPACED = dict(CARD, marginBottom='20px')
+CONTROL_LABEL = dict(BOLD, fontSize='11px', color=colors['text_secondary'])
+RULE = {'borderColor': colors['text_secondary']}
+PROGRESS = {'height': '20px', 'marginBottom': '5px'}
+CHAT_MESSAGE = {'marginBottom': '8px', 'wordWrap': 'break-word'}
+# Chat message style by role; alerts are posted by assets/panels.js too
+CHAT_STYLES = {'alert': dict(CHAT_MESSAGE, color=colors['chart_warn'])}
+
+def chat_message(msg):
+		from dash import html
+		return html.P(msg['message'], style=CHAT_STYLES.get(msg['role'], CHAT_MESSAGE))
+
+# Panel skeletons, sent once with the layout; values come from panel-state
+PANEL_TEXT = dict(MONO, textAlign='center')
+PANEL_LEVEL = dict(PANEL_TEXT, fontWeight='bold')
+
+def telemetry_panel():
+		from dash import html
+		import dash_bootstrap_components as dbc
+		return html.Div([
+				html.H3(id='telemetry-lap', style=dict(PANEL_TEXT, color=colors['chart_line'], marginBottom='10px')),
+				html.H3(id='telemetry-position', style=dict(PANEL_TEXT, color=colors['accent_gold'], marginBottom='2px')),
+				html.P(id='telemetry-gaps', style=dict(PANEL_TEXT, fontSize='12px', color=colors['text_secondary'],
+																							 marginBottom='10px')),
+				html.H5(id='telemetry-speed', style=dict(PANEL_TEXT, color=colors['text_primary'], marginBottom='10px')),
+				html.H5(id='telemetry-tyre', style=dict(PANEL_TEXT, color=colors['accent_silver'], marginBottom='20px')),
+
+				html.Label("BATTERY:", style=CONTROL_LABEL),
+				dbc.Progress(id='battery-bar', value=100, color='info', style=PROGRESS),
+				html.P(id='battery-text', style=dict(PANEL_LEVEL, marginBottom='15px')),
+
+				html.Label("TYRE WEAR:", style=CONTROL_LABEL),
+				dbc.Progress(id='wear-bar', value=0, color='info', style=PROGRESS),
+				html.P(id='wear-text', style=PANEL_LEVEL)
+		], id='telemetry-display')
+
+def strategy_panel():
+		from dash import html
+		return html.Div([
+				html.H4(id='strategy-recommendation',
+								style=dict(BOLD, color=colors['text_primary'], marginBottom='10px')),
+				html.P(id='strategy-confidence',
+							 style=dict(MONO, fontSize='14px', color=colors['text_primary'], marginBottom='10px')),
+				html.P(id='strategy-reasoning',
+							 style=dict(MONO, fontSize='13px', color=colors['text_secondary'])),
+				html.P(id='strategy-alerts',
+							 style=dict(BOLD, fontSize='12px', color=colors['chart_warn'], whiteSpace='pre-line', marginBottom='0'))
+		], id='strategy-display')
+
+def card(title, body, header=CARD_HEADER, body_style=CARD_BODY, style=CARD):
+		import dash_bootstrap_components as dbc
+		children = [dbc.CardHeader(title, style=header)] if title else []
+		return dbc.Card(children + [dbc.CardBody(body, style=body_style)], style=style)
+
+# Dashboard Layout, built once per app; serve_layout only adds the session store
+def build_layout(owner=True):
+		# The page of the session's owner, or of a viewer watching it with every
+		# race control disabled
+		from dash import dcc, html
+		import dash_bootstrap_components as dbc
+		viewer = not owner
+		return dbc.Container([
+				dcc.Store(id='chart-cursor', data=None),
+				dcc.Store(id='panel-state', data=None),
+				# Text colour for each progress bar level
+				dcc.Store(id='panel-levels', data={'info': colors['chart_line'], 'warning': colors['chart_warn'],
+																					 'danger': colors['chart_danger']}),
+				dcc.Store(id='chat-history', data=[{"role": "ai", "message": "AI ENGINEER: Ready to assist! Ask me anything about race strategy."}]),
+				dcc.Store(id='chat-styles', data=dict(CHAT_STYLES, message=CHAT_MESSAGE)),
+				# Keys of the active alerts already posted to the chat
+				dcc.Store(id='alerts-posted', data=[]),
+
+				# Auto-run is driven by the server clock; the browser only follows its stream
+				dcc.Store(id='clock-running', data=False),
+				dcc.Store(id='clock-stream', data=None),
+				# Lap picked on the scrubber, set clientside
+				dcc.Store(id='seek-target', data=None),
+
+				# Header
+				dbc.Row([
+						dbc.Col([
+								html.Div([
+										html.H1("APEXMIND", style=dict(BOLD, fontSize='48px', color=colors['accent_red'],
+																								 textAlign='center', marginBottom='5px', letterSpacing='3px')),
+										html.P("AI RACE ENGINEER | HAAS F1 × MPHASIS TRACKSHIFT",
+													 style=dict(MONO, fontSize='12px', color=colors['text_secondary'],
+																			textAlign='center', marginBottom='0'))
+								], style={
+										'backgroundColor': colors['bg_secondary'],
+										'padding': '20px',
+										'borderRadius': '5px',
+										'marginBottom': '20px'
+								})
+						], width=12)
+				]),
+
+				# Main Content
+				dbc.Row([
+						# Left Panel - Controls & Telemetry
+						dbc.Col([
+								# Race Control
+								card(" RACE CONTROL", [
 										dbc.Row([
 												dbc.Col([
-														dbc.Button("▶ NEXT LAP", id="next-lap-btn", color="dark", 
-																			className="w-100 mb-2",
-																			style={'fontFamily': 'Consolas, monospace', 'fontWeight': 'bold'})
+														dbc.Button("▶ NEXT LAP", id="next-lap-btn", color="dark", disabled=viewer,
+																			 className="w-100 mb-2", style=BOLD)
 												], width=6),
 												dbc.Col([
-														dbc.Button(" AUTO RUN", id="auto-run-btn", color="dark",
-																			className="w-100 mb-2",
-																			style={'fontFamily': 'Consolas, monospace', 'fontWeight': 'bold',
-																							'color': colors['accent_silver']})
+														dbc.Button(" AUTO RUN", id="auto-run-btn", color="dark", disabled=viewer,
+																			 className="w-100 mb-2", style=dict(BOLD, color=colors['accent_silver']))
 												], width=6),
 										]),
 										dbc.Row([
 												dbc.Col([
-														dbc.Button("🔄 RESET", id="reset-btn", color="dark",
-																			className="w-100 mb-2",
-																			style={'fontFamily': 'Consolas, monospace', 'fontWeight': 'bold',
-																							'color': colors['accent_gold']})
+														dbc.Button("🔄 RESET", id="reset-btn", color="dark", disabled=viewer,
+																			 className="w-100 mb-2", style=dict(BOLD, color=colors['accent_gold']))
 												], width=6),
 												dbc.Col([
-														dbc.Button("🔧 PIT STOP", id="pit-btn", 
-																			className="w-100 mb-2",
-																			style={'fontFamily': 'Consolas, monospace', 'fontWeight': 'bold',
-																							'backgroundColor': colors['accent_red'],
-																							'color': colors['text_primary'],
-																							'border': 'none'})
+														dbc.Button("🔧 PIT STOP", id="pit-btn", className="w-100 mb-2", disabled=viewer,
+																			 style=dict(BOLD, backgroundColor=colors['accent_red'],
+																									color=colors['text_primary'], border='none'))
 												], width=6),
 										]),
-										html.Hr(style={'borderColor': colors['text_secondary']}),
-										html.Label("WEATHER:", style={
-												'fontFamily': 'Consolas, monospace',
-												'fontSize': '11px',
-												'color': colors['text_secondary'],
-												'fontWeight': 'bold'
-										}),
+										html.Hr(style=RULE),
+										html.Label("WEATHER:", style=CONTROL_LABEL),
 										dcc.Dropdown(
 												id='weather-dropdown',
 												options=[
@@ -290,344 +544,528 @@ app.layout = dbc.Container([
 												],
 												value='Dry',
 												clearable=False,
-												style={'marginBottom': '10px', 'fontFamily': 'Consolas, monospace'}
+												disabled=viewer,
+												style=dict(MONO, marginBottom='10px')
 										),
-										html.Label("SAFETY CAR:", style={
-												'fontFamily': 'Consolas, monospace',
-												'fontSize': '11px',
-												'color': colors['text_secondary'],
-												'fontWeight': 'bold'
-										}),
+										html.Label("SAFETY CAR:", style=CONTROL_LABEL),
 										dbc.Checklist(
 												id='safety-car-switch',
-												options=[{'label': ' Active', 'value': 1}],
+												options=[{'label': ' Active', 'value': 1, 'disabled': viewer}],
 												value=[],
 												switch=True,
-												style={'fontFamily': 'Consolas, monospace'}
-										)
-								], style={'backgroundColor': colors['bg_tertiary']})
-						], style={'backgroundColor': colors['bg_tertiary'], 'border': 'none', 'marginBottom': '20px'}),
-					
-						# Telemetry
-						dbc.Card([
-								dbc.CardHeader("TELEMETRY", style={
-										'fontFamily': 'Consolas, monospace',
-										'fontWeight': 'bold',
-										'backgroundColor': colors['bg_tertiary'],
-										'color': colors['text_primary'],
-										'border': 'none'
-								}),
-								dbc.CardBody([
-										html.Div(id='telemetry-display')
-								], style={'backgroundColor': colors['bg_tertiary']})
-						], style={'backgroundColor': colors['bg_tertiary'], 'border': 'none'})
-				], width=12, lg=4),
-			
-				# Right Panel - Strategy & Charts
-				dbc.Col([
-						# AI Strategy
-						dbc.Card([
-								dbc.CardHeader(" AI STRATEGY", style={
-										'fontFamily': 'Consolas, monospace',
-										'fontWeight': 'bold',
-										'backgroundColor': colors['bg_secondary'],
-										'color': colors['accent_red'],
-										'border': 'none'
-								}),
-								dbc.CardBody([
-										html.Div(id='strategy-display')
-								], style={'backgroundColor': colors['bg_secondary'], 'minHeight': '120px'})
-						], style={'backgroundColor': colors['bg_secondary'], 'border': 'none', 'marginBottom': '20px'}),
-					
-						# Charts
-						dbc.Card([
-								dbc.CardBody([
+												style=MONO
+										),
+										html.Hr(style=RULE),
+										# Drag back to rewind, forward to fast-forward; the
+										# value follows the race through panel-state
+										html.Label("LAP:", style=CONTROL_LABEL),
+										dcc.Slider(id='lap-scrubber', min=0, max=50, step=1, value=0, marks=None,
+															 tooltip={'placement': 'bottom'}, disabled=viewer),
+										dbc.Button("🏁 TO FLAG", id='flag-btn', color="dark", className="w-100 mt-2", disabled=viewer,
+															 style=dict(BOLD, color=colors['accent_silver'])),
+										html.Hr(style=RULE),
+										# Anyone opening the link watches this race live
+										html.A("📡 WATCHING (READ ONLY)" if viewer else "📡 VIEWER LINK", id='viewer-link',
+													 target='_blank', style=CONTROL_LABEL)
+								], style=CARD_SPACED),
+
+								# Telemetry
+								card("TELEMETRY", [telemetry_panel()])
+						], width=12, lg=4),
+
+						# Right Panel - Strategy & Charts
+						dbc.Col([
+								# AI Strategy
+								card(" AI STRATEGY", [strategy_panel()],
+										 header=dict(CARD_HEADER, backgroundColor=colors['bg_secondary'], color=colors['accent_red']),
+										 body_style={'backgroundColor': colors['bg_secondary'], 'minHeight': '120px'},
+										 style=dict(CARD_SPACED, backgroundColor=colors['bg_secondary'])),
+
+								# Charts
+								card(None, [
 										dcc.Graph(id='lap-times-chart', config={'displayModeBar': False},
 															style={'height': '300px', 'marginBottom': '10px'}),
 										dcc.Graph(id='tyre-wear-chart', config={'displayModeBar': False},
 															style={'height': '300px'})
-								], style={'backgroundColor': colors['bg_tertiary'], 'padding': '10px'})
-						], style={'backgroundColor': colors['bg_tertiary'], 'border': 'none', 'marginBottom': '20px'}),
-					
-						# Chatbot
-						dbc.Card([
-								dbc.CardHeader(" PIT CREW ASSISTANT", style={
-										'fontFamily': 'Consolas, monospace',
-										'fontWeight': 'bold',
-										'backgroundColor': colors['bg_tertiary'],
-										'color': colors['text_primary'],
-										'border': 'none'
-								}),
-								dbc.CardBody([
-										html.Div(id='chat-display', style={
-												'height': '150px',
-												'overflowY': 'auto',
-												'backgroundColor': colors['bg_primary'],
-												'padding': '10px',
-												'borderRadius': '5px',
-												'marginBottom': '10px',
-												'fontFamily': 'Consolas, monospace',
-												'fontSize': '12px',
-												'color': colors['text_primary']
-										}),
+								], body_style=dict(CARD_BODY, padding='10px'), style=CARD_SPACED),
+
+								# Chatbot
+								card(" PIT CREW ASSISTANT", [
+										html.Div(id='chat-display', style=dict(MONO,
+												height='150px',
+												overflowY='auto',
+												backgroundColor=colors['bg_primary'],
+												padding='10px',
+												borderRadius='5px',
+												marginBottom='10px',
+												fontSize='12px',
+												color=colors['text_primary']
+										)),
 										dbc.InputGroup([
 												dbc.Input(id='chat-input', placeholder="Ask about strategy...",
-																	style={'fontFamily': 'Consolas, monospace',
-																				'backgroundColor': colors['bg_primary'],
-																				'color': colors['text_primary'],
-																				'border': 'none'}),
-												dbc.Button("SEND", id='send-btn', 
-																	style={'fontFamily': 'Consolas, monospace',
-																				'fontWeight': 'bold',
-																				'backgroundColor': colors['bg_secondary'],
-																				'border': 'none'})
+																	style=dict(MONO, backgroundColor=colors['bg_primary'],
+																						 color=colors['text_primary'], border='none')),
+												dbc.Button("SEND", id='send-btn',
+																	 style=dict(BOLD, backgroundColor=colors['bg_secondary'], border='none'))
 										])
-								], style={'backgroundColor': colors['bg_tertiary']})
-						], style={'backgroundColor': colors['bg_tertiary'], 'border': 'none'})
-				], width=12, lg=8)
-		])
-], fluid=True, style={'backgroundColor': colors['bg_primary'], 'minHeight': '100vh', 'padding': '20px'})
+								])
+						], width=12, lg=8)
+				])
+		], fluid=True, style={'backgroundColor': colors['bg_primary'], 'minHeight': '100vh', 'padding': '20px'})
 
 # Callbacks
-@app.callback(
-		[Output('simulator-state', 'data'),
-			Output('auto-interval', 'disabled')],
-		[Input('next-lap-btn', 'n_clicks'),
-			Input('auto-run-btn', 'n_clicks'),
-			Input('auto-interval', 'n_intervals'),
-			Input('reset-btn', 'n_clicks'),
-			Input('pit-btn', 'n_clicks'),
-			Input('weather-dropdown', 'value'),
-			Input('safety-car-switch', 'value')],
-		[State('simulator-state', 'data'),
-			State('auto-interval', 'disabled')],
-		prevent_initial_call=True
-)
-def update_simulator(next_clicks, auto_clicks, n_intervals, reset_clicks, pit_clicks,
-										weather, safety_car, sim_data, interval_disabled):
-		ctx = callback_context
-	
+def apply_action(entry, trigger_id, weather, safety_car):
+		# Apply one control action to a session; callable without a Dash request
+		with entry.lock:
+				simulator = entry.simulator
+
+				if trigger_id == 'reset-btn':
+						clocks.stop(entry.session_id)
+						simulator = sessions.reset(entry)
+				elif trigger_id == 'pit-btn':
+						# Fit what the optimizer plans for a stop now, so its next solve
+						# starts from tyres it chose
+						compound = strategy_cache.recommendation(simulator)['pit_compound']
+						with simulator_seconds.time('pit_stop'):
+								simulator.pit_stop(compound)
+						if history_store is not None:
+								history_store.record_pit(simulator)
+				elif trigger_id == 'auto-run-btn':
+						clocks.toggle(entry)
+				elif trigger_id == 'next-lap-btn':
+						if simulator.lap < simulator.total_laps:
+								run_lap(simulator)
+
+				simulator.set_conditions(weather, len(safety_car) > 0)
+				sessions.commit(entry)
+				clocks.publish(entry)
+
+				return sessions.client_state(entry), clocks.is_running(entry.session_id)
+
+def race_timeline(entry):
+		# Checkpointed timeline of the session's current race, caught up to the
+		# live simulator
+		simulator = entry.simulator
+		timeline = entry.timeline
+		if timeline is None or timeline.race != (simulator.seed, simulator.resets):
+				timeline = entry.timeline = RaceTimeline(simulator)
+		timeline.sync(simulator)
+		return timeline
+
+def go_to_lap(entry, lap):
+		# Rewind or fast-forward to `lap` in one call. Laps already run (and any
+		# pit or weather calls made on them) come back from the timeline; laps
+		# past its end are simulated under the current conditions.
+		with entry.lock:
+				simulator = entry.simulator
+				lap = max(0, min(int(lap), simulator.total_laps))
+				timeline = race_timeline(entry)
+				if lap < simulator.lap or simulator.lap < min(lap, timeline.lap):
+						with simulator_seconds.time('seek'):
+								simulator = sessions.replace(entry, timeline.restore(lap))
+				while simulator.lap < lap:
+						run_lap(simulator)
+				sessions.commit(entry)
+				clocks.publish(entry)
+
+				return sessions.client_state(entry), clocks.is_running(entry.session_id)
+
+def update_simulator(next_clicks, auto_clicks, reset_clicks, pit_clicks, flag_clicks,
+										weather, safety_car, seek, sim_data, running, owner_key):
+		from dash import callback_context as ctx, no_update
+		from dash.exceptions import PreventUpdate
+
 		if not ctx.triggered:
-				return sim_data, interval_disabled
-	
+				return sim_data, running, no_update, no_update
+
 		trigger_id = ctx.triggered[0]['prop_id'].split('.')[0]
-	
-		simulator = RaceSimulator.from_dict(sim_data)
-	
-		if trigger_id == 'reset-btn':
-				simulator = RaceSimulator()
-				interval_disabled = True
-		elif trigger_id == 'pit-btn':
-				simulator.pit_stop()
-		elif trigger_id == 'auto-run-btn':
-				interval_disabled = not interval_disabled
-		elif trigger_id in ['next-lap-btn', 'auto-interval']:
-				if simulator.lap < simulator.total_laps:
-						simulator.simulate_lap()
-					
-		simulator.weather = weather
-		simulator.safety_car = len(safety_car) > 0
-	
-		return simulator.to_dict(), interval_disabled
-
-@app.callback(
-		[Output('telemetry-display', 'children'),
-			Output('strategy-display', 'children'),
-			Output('lap-times-chart', 'figure'),
-			Output('tyre-wear-chart', 'figure'),
-			Output('auto-run-btn', 'children')],
-		[Input('simulator-state', 'data'),
-			Input('auto-interval', 'disabled')]
-)
-def update_displays(sim_data, interval_disabled):
-		simulator = RaceSimulator.from_dict(sim_data)
-		strategy = simulator.ai_strategy_recommendation()
-	
-		# Telemetry Display
-		telemetry = html.Div([
-				html.H3(f"LAP: {simulator.lap}/{simulator.total_laps}",
-								style={'fontFamily': 'Consolas, monospace', 'color': colors['chart_line'],
-											'textAlign': 'center', 'marginBottom': '10px'}),
-				html.H3(f"POSITION: P{simulator.position}",
-								style={'fontFamily': 'Consolas, monospace', 'color': colors['accent_gold'],
-											'textAlign': 'center', 'marginBottom': '10px'}),
-				html.H5(f"SPEED: {simulator.speed:.0f} KM/H",
-								style={'fontFamily': 'Consolas, monospace', 'color': colors['text_primary'],
-											'textAlign': 'center', 'marginBottom': '10px'}),
-				html.H5(f"TYRE: {simulator.tyre_compound[0]} ({simulator.tyre_age} LAPS)",
-								style={'fontFamily': 'Consolas, monospace', 'color': colors['accent_silver'],
-											'textAlign': 'center', 'marginBottom': '20px'}),
-			
-				html.Label("BATTERY:", style={'fontFamily': 'Consolas, monospace', 'fontSize': '11px',
-																			'color': colors['text_secondary'], 'fontWeight': 'bold'}),
-				dbc.Progress(value=simulator.battery, 
-										color='info' if simulator.battery > 50 else 'warning' if simulator.battery > 20 else 'danger',
-										style={'height': '20px', 'marginBottom': '5px'}),
-				html.P(f"{simulator.battery:.1f}%", 
-							style={'fontFamily': 'Consolas, monospace', 'textAlign': 'center',
-										'color': colors['chart_line'] if simulator.battery > 50 else colors['chart_warn'] if simulator.battery > 20 else colors['chart_danger'],
-										'fontWeight': 'bold', 'marginBottom': '15px'}),
-			
-				html.Label("TYRE WEAR:", style={'fontFamily': 'Consolas, monospace', 'fontSize': '11px',
-																				'color': colors['text_secondary'], 'fontWeight': 'bold'}),
-				dbc.Progress(value=simulator.tyre_wear,
-										color='info' if simulator.tyre_wear < 40 else 'warning' if simulator.tyre_wear < 70 else 'danger',
-										style={'height': '20px', 'marginBottom': '5px'}),
-				html.P(f"{simulator.tyre_wear:.1f}%",
-							style={'fontFamily': 'Consolas, monospace', 'textAlign': 'center',
-										'color': colors['chart_line'] if simulator.tyre_wear < 40 else colors['chart_warn'] if simulator.tyre_wear < 70 else colors['chart_danger'],
-										'fontWeight': 'bold'})
-		])
-	
-		# Strategy Display
-		strategy_display = html.Div([
-				html.H4(strategy['recommendation'],
-								style={'fontFamily': 'Consolas, monospace', 'fontWeight': 'bold',
-											'color': colors['text_primary'], 'marginBottom': '10px'}),
-				html.P(f"CONFIDENCE: {strategy['confidence']}%",
-							style={'fontFamily': 'Consolas, monospace', 'fontSize': '14px',
-										'color': colors['text_primary'], 'marginBottom': '10px'}),
-				html.P(strategy['reasoning'],
-							style={'fontFamily': 'Consolas, monospace', 'fontSize': '13px',
-										'color': colors['text_secondary']})
-		])
-	
-		# Lap Times Chart
-		lap_times_fig = go.Figure()
-		lap_times_fig.update_layout(
-				template='plotly_dark',
-				paper_bgcolor=colors['bg_tertiary'],
-				plot_bgcolor=colors['bg_primary'],
-				font=dict(family='Consolas, monospace', color=colors['text_secondary']),
-				title={'text': 'LAP TIMES & PREDICTIONS', 'font': {'size': 14, 'color': colors['text_primary']}},
-				xaxis_title="Lap",
-				yaxis_title="Time (s)",
-				margin=dict(l=50, r=20, t=40, b=40),
-				showlegend=True,
-				legend=dict(orientation='h', yanchor='top', y=1.1, xanchor='left', x=0)
-		)
-	
-		if simulator.lap_times:
-				laps = list(range(1, len(simulator.lap_times) + 1))
-				lap_times_fig.add_trace(go.Scatter(
-						x=laps, y=simulator.lap_times,
-						mode='lines+markers',
-						name='ACTUAL',
-						line=dict(color=colors['chart_line'], width=3),
-						marker=dict(size=6)
-				))
-			
-				if strategy['predictions']:
-						pred_laps = [p['lap'] for p in strategy['predictions']]
-						pred_times = [p['predicted_time'] for p in strategy['predictions']]
-						lap_times_fig.add_trace(go.Scatter(
-								x=pred_laps, y=pred_times,
-								mode='lines+markers',
-								name='PREDICTION',
-								line=dict(color=colors['chart_warn'], width=2, dash='dash'),
-								marker=dict(size=5, symbol='square')
-						))
-					
-		# Tyre Wear Chart
-		tyre_wear_fig = go.Figure()
-		tyre_wear_fig.update_layout(
-				template='plotly_dark',
-				paper_bgcolor=colors['bg_tertiary'],
-				plot_bgcolor=colors['bg_primary'],
-				font=dict(family='Consolas, monospace', color=colors['text_secondary']),
-				title={'text': 'TYRE DEGRADATION ANALYSIS', 'font': {'size': 14, 'color': colors['text_primary']}},
-				xaxis_title="Lap",
-				yaxis_title="Wear (%)",
-				yaxis=dict(range=[0, 105]),
-				margin=dict(l=50, r=20, t=40, b=40),
-				showlegend=True,
-				legend=dict(orientation='h', yanchor='top', y=1.1, xanchor='left', x=0)
-		)
-	
-		if simulator.historical_degradation:
-				laps = [d['lap'] for d in simulator.historical_degradation]
-				wear = [d['wear'] for d in simulator.historical_degradation]
-				tyre_wear_fig.add_trace(go.Scatter(
-						x=laps, y=wear,
-						mode='lines+markers',
-						name='ACTUAL WEAR',
-						fill='tozeroy',
-						line=dict(color=colors['chart_danger'], width=3),
-						marker=dict(size=6),
-						fillcolor=f"rgba({int(colors['chart_danger'][1:3], 16)}, {int(colors['chart_danger'][3:5], 16)}, {int(colors['chart_danger'][5:7], 16)}, 0.2)"
-				))
-			
-				if strategy['predictions']:
-						pred_laps = [p['lap'] for p in strategy['predictions']]
-						pred_wear = [p['predicted_wear'] for p in strategy['predictions']]
-						tyre_wear_fig.add_trace(go.Scatter(
-								x=pred_laps, y=pred_wear,
-								mode='lines+markers',
-								name='PREDICTED',
-								line=dict(color=colors['chart_warn'], width=2, dash='dash'),
-								marker=dict(size=5, symbol='square')
-						))
-					
-				# Critical zone
-				tyre_wear_fig.add_hrect(y0=70, y1=100, fillcolor=colors['chart_danger'], opacity=0.15,
-																line_width=0, annotation_text="CRITICAL ZONE",
-																annotation_position="top right")
-			
-		auto_btn_text = "⏸ PAUSE" if not interval_disabled else "⚡ AUTO RUN"
-	
-		return telemetry, strategy_display, lap_times_fig, tyre_wear_fig, auto_btn_text
-
-@app.callback(
-		[Output('chat-display', 'children'),
-			Output('chat-history', 'data'),
-			Output('chat-input', 'value')],
-		[Input('send-btn', 'n_clicks')],
-		[State('chat-input', 'value'),
-			State('chat-history', 'data'),
-			State('simulator-state', 'data')],
-		prevent_initial_call=True
-)
+
+		# Unknown or expired ids get no session of their own; the page must reload
+		entry = sessions.lookup(sim_data['session_id'])
+		if entry is None or not sessions.authorize(entry, owner_key):
+				raise PreventUpdate
+		if trigger_id in ('flag-btn', 'seek-target'):
+				lap = entry.simulator.total_laps if trigger_id == 'flag-btn' else seek['lap']
+				state, running = go_to_lap(entry, lap)
+				# The controls follow the conditions of the lap seeked to
+				with entry.lock:
+						simulator = entry.simulator
+						return state, running, simulator.weather, [1] if simulator.safety_car else []
+		return apply_action(entry, trigger_id, weather, safety_car) + (no_update, no_update)
+
+# Session versions whose renders are kept; everyone watching a session asks for the latest
+RENDER_CACHE_SIZE = int(os.environ.get('APEXMIND_RENDER_CACHE_SIZE', 8))
+
+def update_displays(sim_data, cursor):
+		# Strategy, prediction bands and the panels are worked out once per
+		# session version and shared by every viewer. Chart updates are kept per
+		# patch base under that version, so viewers a lap or two behind only
+		# cost a patch from their own base and never a second strategy pass.
+		from dash.exceptions import PreventUpdate
+
+		entry = sessions.lookup(sim_data['session_id'])
+		if entry is None:
+				raise PreventUpdate
+		with entry.lock:
+				renders = entry.views.get('renders')
+				if renders is None:
+						renders = entry.views['renders'] = OrderedDict()
+				render = renders.get(entry.version)
+				if render is None:
+						simulator = entry.simulator
+						with simulator_seconds.time('strategy'):
+								strategy = strategy_cache.recommendation(simulator)
+						with simulator_seconds.time('prediction_bands'):
+								bands = strategy_cache.bands(simulator, predictor, laps_ahead=10) if simulator.lap_times else []
+						render = renders[entry.version] = {'state': panel_state(simulator, strategy), 'bands': bands, 'charts': {}}
+						while len(renders) > RENDER_CACHE_SIZE:
+								renders.popitem(last=False)
+				else:
+						renders.move_to_end(entry.version)
+
+				base = patch_base(entry, chart_series(entry), cursor)
+				charts = render['charts'].get(base)
+				if charts is None:
+						render_cache.inc('miss')
+						with simulator_seconds.time('charts'):
+								charts = render['charts'][base] = render_charts(entry, render['bands'], cursor)
+				else:
+						render_cache.inc('hit')
+				return (render['state'],) + charts
+
+def lap_stats(entry):
+		# Per-session rolling statistics, caught up to the lap history
+		stats = entry.views.get('stats')
+		if stats is None:
+				stats = entry.views['stats'] = RollingStats()
+		stats.update(entry.simulator.history)
+		return stats
+
+def stats_response(entry, query):
+		# Answer a parsed aggregate question, naming the laps it covers
+		simulator = entry.simulator
+		stats = lap_stats(entry)
+		if query['scope'] == 'stint':
+				scope = "since the pit stop" if simulator.pit_stops else "this stint"
+		elif query['scope'] == 'compound':
+				scope = f"on the {query['compound']}"
+		else:
+				scope = "this race"
+		summary = stats.query(query['metric'], query['scope'], query['laps'], query['compound'])
+		if summary is None:
+				return f"AI ENGINEER: No laps {scope} yet."
+		if query['laps'] and query['scope'] == 'race':
+				scope = f"over the last {summary['laps']} laps"
+		window = f"laps {summary['first_lap']}-{summary['last_lap']}, {summary['laps']} laps"
+
+		if query['stat'] == 'min':
+				answer = f"Best lap {scope} was {summary['min']:.3f}s on lap {summary['min_lap']}"
+		elif query['stat'] == 'max':
+				answer = f"Slowest lap {scope} was {summary['max']:.3f}s on lap {summary['max_lap']}"
+		elif query['stat'] == 'slope':
+				pace = stats.query('lap_time', query['scope'], query['laps'], query['compound'])
+				answer = (f"Degradation {scope} is {summary['slope']:+.2f}% wear and "
+									f"{pace['slope']:+.3f}s per lap")
+		else:
+				answer = f"Average pace {scope} is {summary['mean']:.2f}s"
+		return f"AI ENGINEER: {answer} ({window})."
+
 def update_chat(n_clicks, user_msg, chat_history, sim_data):
+		from dash.exceptions import PreventUpdate
+
 		if not user_msg or not user_msg.strip():
-				return [html.P(msg['message'], style={'marginBottom': '5px'}) for msg in chat_history], chat_history, ""
-	
-		simulator = RaceSimulator.from_dict(sim_data)
+				return [chat_message(msg) for msg in chat_history], chat_history, ""
+
+		entry = sessions.lookup(sim_data['session_id'])
+		if entry is None:
+				raise PreventUpdate
 		user_msg_lower = user_msg.lower()
-	
+
 		# Add user message
 		chat_history.append({"role": "user", "message": f"YOU: {user_msg}"})
-	
-		# Generate AI response
-		if 'pit' in user_msg_lower or 'stop' in user_msg_lower:
-				strategy = simulator.ai_strategy_recommendation()
-				response = f"AI ENGINEER: {strategy['recommendation']} - {strategy['reasoning']}"
-		elif 'tyre' in user_msg_lower or 'tire' in user_msg_lower:
-				response = f"AI ENGINEER: Current tyre wear is {simulator.tyre_wear:.1f}%. {simulator.tyre_compound} compound with {simulator.tyre_age} laps of age."
-		elif 'lap time' in user_msg_lower or 'pace' in user_msg_lower:
-				if simulator.lap_times:
-						avg = np.mean(simulator.lap_times[-3:])
-						response = f"AI ENGINEER: Current pace is {avg:.2f}s. Optimal is 82.5s. Degradation: {(avg-82.5):.2f}s."
+
+		with entry.lock:
+				simulator = entry.simulator
+
+				# Generate AI response
+				query = parse_stats_query(user_msg)
+				if query:
+						response = stats_response(entry, query)
+				elif any(word in user_msg_lower for word in ('alert', 'anomal', 'unusual', 'spike')):
+						alerts = race_alerts(simulator, laps=simulator.lap)
+						if alerts:
+								latest = "; ".join(alert['message'] for alert in alerts[-3:])
+								noun = "anomaly" if len(alerts) == 1 else "anomalies"
+								response = f"AI ENGINEER: {len(alerts)} {noun} this race. Latest: {latest}."
+						else:
+								response = "AI ENGINEER: No anomalies in lap time, tyre temp, battery or fuel so far."
+				elif 'pit' in user_msg_lower or 'stop' in user_msg_lower:
+						strategy = strategy_cache.recommendation(simulator)
+						response = f"AI ENGINEER: {strategy['recommendation']} - {strategy['reasoning']}"
+				elif 'tyre' in user_msg_lower or 'tire' in user_msg_lower:
+						response = f"AI ENGINEER: Current tyre wear is {simulator.tyre_wear:.1f}%. {simulator.tyre_compound} compound with {simulator.tyre_age} laps of age."
+						if simulator.tyres:
+								corners = ", ".join(f"{tyre} {wear:.0f}% {temp:.0f}°C"
+																		for tyre, (wear, temp) in simulator.tyres.corners().items())
+								response += f" By corner: {corners}."
+				elif 'lap time' in user_msg_lower or 'pace' in user_msg_lower:
+						pace = lap_stats(entry).query('lap_time', laps=3)
+						if pace:
+								avg = pace['mean']
+								response = f"AI ENGINEER: Current pace is {avg:.2f}s. Optimal is 82.5s. Degradation: {(avg-82.5):.2f}s."
+						else:
+								response = "AI ENGINEER: No lap data yet. Complete some laps first!"
+				elif 'strategy' in user_msg_lower:
+						response = f"AI ENGINEER: We're on a {simulator.pit_stops + 1}-stop strategy. {simulator.total_laps - simulator.lap} laps remaining."
+				elif history_store is not None and ('history' in user_msg_lower or 'past' in user_msg_lower):
+						wet = simulator.weather == "Wet"
+						summary = history_store.stint_summary(simulator.tyre_compound, wet)
+						conditions = "wet" if wet else "dry"
+						if summary['stints']:
+								response = (f"AI ENGINEER: {summary['stints']} past {simulator.tyre_compound} stints in {conditions} "
+														f"conditions: {summary['laps']:.0f} laps on average, ending at {summary['wear']:.0f}% wear "
+														f"with a {summary['lap_time']:.2f}s average lap.")
+						else:
+								response = f"AI ENGINEER: No past {simulator.tyre_compound} stints in {conditions} conditions yet."
+				elif 'position' in user_msg_lower:
+						gaps = gap_text(simulator)
+						gaps = f" Gaps: {gaps}." if gaps else ""
+						response = f"AI ENGINEER: Currently P{simulator.position}.{gaps} Push to gain positions or manage tyres strategically."
 				else:
-						response = "AI ENGINEER: No lap data yet. Complete some laps first!"
-		elif 'strategy' in user_msg_lower:
-				response = f"AI ENGINEER: We're on a {simulator.pit_stops + 1}-stop strategy. {simulator.total_laps - simulator.lap} laps remaining."
-		elif 'position' in user_msg_lower:
-				response = f"AI ENGINEER: Currently P{simulator.position}. Push to gain positions or manage tyres strategically."
-		else:
-				response = "AI ENGINEER: I can help with pit strategy, tyre analysis, lap times, and race positions. What would you like to know?"
-			
+						response = "AI ENGINEER: I can help with pit strategy, tyre analysis, lap times, and race positions. What would you like to know?"
+
 		chat_history.append({"role": "ai", "message": response})
-	
+
 		# Keep only last 10 messages
 		if len(chat_history) > 10:
 				chat_history = chat_history[-10:]
-			
-		chat_display = [html.P(msg['message'], style={'marginBottom': '8px', 'wordWrap': 'break-word'}) 
-										for msg in chat_history]
-	
+
+		chat_display = [chat_message(msg) for msg in chat_history]
+
 		return chat_display, chat_history, ""
 
-if __name__ == '__main__':
-		app.run (debug=True, port=8050)
+# Optional in-dashboard view of the same metrics
+DEBUG_PANEL = bool(os.environ.get('APEXMIND_DEBUG_PANEL'))
+
+def debug_panel():
+		from dash import dcc, html
+		import dash_bootstrap_components as dbc
+		return dbc.Row([
+				dbc.Col([
+						card("DEBUG", [
+								html.Pre(id='debug-metrics',
+												 style=dict(MONO, fontSize='11px', color=colors['text_secondary'], marginBottom='0')),
+								dcc.Interval(id='debug-interval', interval=5000)
+						], style=dict(CARD, marginTop='20px'))
+				], width=12)
+		])
+
+def update_debug_panel(n_intervals):
+		lines = []
+		for label, histogram, names in (
+				("callback", callback_seconds, ('update_simulator', 'update_displays', 'update_chat')),
+				("simulator", simulator_seconds, ('simulate_lap', 'pit_stop', 'seek', 'strategy', 'prediction_bands',
+																					'charts'))
+		):
+				for name in names:
+						summary = histogram.summary(name)
+						lines.append(f"{label:<10} {name:<18} {summary['count']:>7} calls  mean {summary['mean'] * 1000:8.2f} ms"
+												 f"  p50 <= {summary['p50'] * 1000:g} ms  p99 <= {summary['p99'] * 1000:g} ms")
+		for name in ('update_simulator', 'update_displays', 'update_chat'):
+				response = callback_response_bytes.summary(name)
+				lines.append(f"payload    {name:<18} mean {response['mean'] / 1024:8.1f} KiB  "
+										 f"errors {callback_errors.value(name)}")
+		cache = strategy_cache.stats()
+		hits, misses = render_cache.value('hit'), render_cache.value('miss')
+		lines.append(f"sessions   {len(sessions)} live, {sessions.total_bytes / 1024 / 1024:.1f} MiB, "
+								 f"{len(clocks)} on auto-run, {clocks.subscriber_count()} streams; "
+								 f"strategy cache hit rate {cache['hit_rate']:.0%}, "
+								 f"render cache hit rate {hits / max(hits + misses, 1):.0%}")
+		return "\n".join(lines)
+
+def create_app():
+		# The Dash app with its layout, callbacks and routes. Workers that only
+		# need the simulator never call this and never load Dash or Plotly.
+		import dash
+		import flask
+		from dash import dcc, html, Input, Output, State, ClientsideFunction
+		import dash_bootstrap_components as dbc
+
+		app = dash.Dash(__name__, external_stylesheets=[dbc.themes.BOOTSTRAP])
+		app.title = "ApexMind - F1 Race Engineer"
+
+		owner_layout = build_layout()
+		viewer_layout = build_layout(owner=False)
+		if DEBUG_PANEL:
+				owner_layout.children.append(debug_panel())
+				viewer_layout.children.append(debug_panel())
+		# Expanding the chart template is the slowest part of the first render
+		chart_layouts()
+
+		def serve_layout():
+				# Each page load gets its own server-side session, except ?watch=<id>,
+				# which follows a live session read-only
+				watch = flask.request.args.get('watch') if flask.has_request_context() else None
+				entry = sessions.lookup(watch) if watch else None
+				if entry is not None:
+						owner_key, layout = None, viewer_layout
+				else:
+						entry = sessions.get(sessions.create())
+						owner_key, layout = entry.owner_key, owner_layout
+				return html.Div([
+						dcc.Store(id='simulator-state', data=sessions.client_state(entry)),
+						dcc.Store(id='session-key', data=owner_key),
+						layout
+				])
+
+		app.layout = serve_layout
+
+		app.callback(
+				[Output('simulator-state', 'data'),
+					Output('clock-running', 'data'),
+					Output('weather-dropdown', 'value'),
+					Output('safety-car-switch', 'value')],
+				[Input('next-lap-btn', 'n_clicks'),
+					Input('auto-run-btn', 'n_clicks'),
+					Input('reset-btn', 'n_clicks'),
+					Input('pit-btn', 'n_clicks'),
+					Input('flag-btn', 'n_clicks'),
+					Input('weather-dropdown', 'value'),
+					Input('safety-car-switch', 'value'),
+					Input('seek-target', 'data')],
+				[State('simulator-state', 'data'),
+					State('clock-running', 'data'),
+					State('session-key', 'data')],
+				prevent_initial_call=True
+		)(callback_metrics('update_simulator')(update_simulator))
+
+		# Follow the server clock's event stream while auto-run is on, and all
+		# the time on a viewer's page
+		app.clientside_callback(
+				ClientsideFunction(namespace='race_clock', function_name='follow'),
+				Output('clock-stream', 'data'),
+				[Input('clock-running', 'data')],
+				[State('simulator-state', 'data'),
+					State('session-key', 'data')]
+		)
 
-	
\ No newline at end of file
+		app.clientside_callback(
+				ClientsideFunction(namespace='race_clock', function_name='viewer_link'),
+				Output('viewer-link', 'href'),
+				[Input('simulator-state', 'data')]
+		)
+
+		app.callback(
+				[Output('panel-state', 'data'),
+					Output('lap-times-chart', 'figure'),
+					Output('tyre-wear-chart', 'figure'),
+					Output('chart-cursor', 'data')],
+				[Input('simulator-state', 'data')],
+				[State('chart-cursor', 'data')]
+		)(callback_metrics('update_displays')(update_displays))
+
+		app.clientside_callback(
+				ClientsideFunction(namespace='panels', function_name='telemetry'),
+				[Output('telemetry-lap', 'children'),
+					Output('telemetry-position', 'children'),
+					Output('telemetry-gaps', 'children'),
+					Output('telemetry-speed', 'children'),
+					Output('telemetry-tyre', 'children'),
+					Output('battery-bar', 'value'),
+					Output('battery-bar', 'color'),
+					Output('battery-text', 'children'),
+					Output('battery-text', 'style'),
+					Output('wear-bar', 'value'),
+					Output('wear-bar', 'color'),
+					Output('wear-text', 'children'),
+					Output('wear-text', 'style')],
+				[Input('panel-state', 'data')],
+				[State('panel-levels', 'data'),
+					State('battery-text', 'style'),
+					State('wear-text', 'style')]
+		)
+
+		app.clientside_callback(
+				ClientsideFunction(namespace='panels', function_name='strategy'),
+				[Output('strategy-recommendation', 'children'),
+					Output('strategy-confidence', 'children'),
+					Output('strategy-reasoning', 'children'),
+					Output('strategy-alerts', 'children')],
+				[Input('panel-state', 'data')]
+		)
+
+		# New alerts are posted to the pit crew chat as they arrive
+		app.clientside_callback(
+				ClientsideFunction(namespace='panels', function_name='alert_chat'),
+				[Output('chat-display', 'children', allow_duplicate=True),
+					Output('chat-history', 'data', allow_duplicate=True),
+					Output('alerts-posted', 'data')],
+				[Input('panel-state', 'data')],
+				[State('chat-history', 'data'),
+					State('alerts-posted', 'data'),
+					State('chat-styles', 'data')],
+				prevent_initial_call=True
+		)
+
+		# The scrubber follows the race; only moves made by hand set seek-target
+		app.clientside_callback(
+				ClientsideFunction(namespace='panels', function_name='scrubber'),
+				Input('panel-state', 'data')
+		)
+
+		app.clientside_callback(
+				ClientsideFunction(namespace='panels', function_name='seek'),
+				Output('seek-target', 'data'),
+				[Input('lap-scrubber', 'value')],
+				prevent_initial_call=True
+		)
+
+		app.clientside_callback(
+				ClientsideFunction(namespace='panels', function_name='auto_run_label'),
+				Output('auto-run-btn', 'children'),
+				[Input('clock-running', 'data')]
+		)
+
+		app.callback(
+				[Output('chat-display', 'children'),
+					Output('chat-history', 'data'),
+					Output('chat-input', 'value')],
+				[Input('send-btn', 'n_clicks')],
+				[State('chat-input', 'value'),
+					State('chat-history', 'data'),
+					State('simulator-state', 'data')],
+				prevent_initial_call=True
+		)(callback_metrics('update_chat')(update_chat))
+
+		if DEBUG_PANEL:
+				app.callback(Output('debug-metrics', 'children'),
+										 [Input('debug-interval', 'n_intervals')])(update_debug_panel)
+
+		@app.server.route('/stream/<session_id>')
+		def stream_session(session_id):
+				# Only live sessions stream; an unknown id must not start a race
+				if session_id not in sessions:
+						flask.abort(404)
+				return flask.Response(clocks.stream(session_id), mimetype='text/event-stream',
+															headers={'Cache-Control': 'no-cache', 'X-Accel-Buffering': 'no'})
+
+		@app.server.after_request
+		def record_payload_sizes(response):
+				name = flask.g.get('callback')
+				if name is not None:
+						callback_request_bytes.observe(name, value=flask.request.content_length or 0)
+						if not response.direct_passthrough:
+								callback_response_bytes.observe(name, value=len(response.get_data()))
+				return response
+
+		@app.server.route('/metrics')
+		def metrics_endpoint():
+				return flask.Response(metrics.render(), mimetype='text/plain; version=0.0.4')
+
+		open_history()
+		if telemetry_feed is not None and telemetry_feed.ident is None:
+				telemetry_feed.start()
+		return app
+
+if __name__ == '__main__':
+		create_app().run(debug=True, port=8050)
@@ -0,0 +1,306 @@
+import math
+from collections import deque
+
+import numpy as np
+
+# Each channel is followed by an exponentially weighted level and trend (so
+# steady tyre warm-up and fuel burn are expected, not anomalous) and an EWMA
+# variance of the one-step forecast error. Over the first WARMUP samples the
+# level is the last sample and the trend and variance are those of the steps
+# between samples; nothing is scored until then. A step spans two samples'
+# noise, so its variance is scaled to the forecast error of the smoothed level:
+# var(step) / (2 - level weight).
+WARMUP = 8
+TREND_ALPHA = 0.1
+VARIANCE_ALPHA = 0.1
+# Forecast error, in standard deviations, that makes one sample a spike.
+# Errors are clipped to it before they update the baseline, so one spike does
+# not drag the level or inflate the variance.
+Z_THRESHOLD = 4.0
+# One-sided CUSUM of the clipped z-scores: slack per sample and alarm level. A
+# sustained step of three standard deviations is confirmed on its third sample.
+CUSUM_SLACK = 1.0
+CUSUM_THRESHOLD = 5.0
+
+SPIKE, SHIFT = 'spike', 'shift'
+
+# name -> (side, level weight, std floor, label, unit). `side` is the
+# direction that matters: slow laps and hot tyres, battery and fuel falling
+# faster than their trend. Lap time and tyre temperature scatter around a
+# level, so it is smoothed; battery and fuel levels carry every earlier
+# lap's drain, so the forecast starts from the last reading. The floor keeps
+# a near-constant channel from alarming on noise.
+CHANNELS = {
+		'lap_time': (1.0, 0.2, 0.25, 'LAP TIME', 's'),
+		'tyre_temp': (1.0, 0.2, 1.5, 'TYRE TEMP', '°C'),
+		'battery': (-1.0, 1.0, 0.1, 'BATTERY', '%'),
+		'fuel': (-1.0, 1.0, 0.1, 'FUEL', '%')
+}
+LAP_CHANNELS = ('lap_time', 'tyre_temp', 'battery', 'fuel')
+# Raw samples: speed sweeps with the track layout, so only these are scored
+SAMPLE_CHANNELS = ('tyre_temp', 'battery', 'fuel')
+
+# Alerts kept per simulator and per telemetry car
+ALERT_HISTORY = 20
+
+
+# Level, trend, error variance and CUSUM of one channel, updated once per
+# sample in constant memory and time
+class ChannelDetector:
+		__slots__ = ('side', 'alpha', 'floor', 'count', 'level', 'trend', 'var', 'cusum')
+
+		def __init__(self, side=1.0, alpha=0.2, floor=0.0):
+				self.side = side
+				self.alpha = alpha
+				self.floor = floor
+				self.reset()
+
+		def reset(self):
+				self.count = 0
+				self.level = self.trend = self.var = self.cusum = 0.0
+
+		def update(self, value):
+				# (expected, z, kind) for one sample; kind is None, SPIKE or SHIFT
+				self.count += 1
+				count = self.count
+				if count == 1:
+						self.level = value
+						return value, 0.0, None
+				expected = self.level + self.trend
+				error = value - expected
+				if count <= WARMUP:
+						step = value - self.level
+						self.trend += error / (count - 1)
+						self.var += (error * (step - self.trend) - self.var) / (count - 1)
+						self.level = value
+						if count == WARMUP:
+								steps = WARMUP - 1
+								self.var *= steps / (steps - 1) / (2 - self.alpha)
+						return expected, 0.0, None
+
+				std = max(math.sqrt(self.var), self.floor)
+				z = error / std
+				clipped = min(max(z, -Z_THRESHOLD), Z_THRESHOLD)
+				error = clipped * std
+				self.cusum = max(0.0, self.cusum + self.side * clipped - CUSUM_SLACK)
+				kind = SHIFT if self.cusum > CUSUM_THRESHOLD else SPIKE if self.side * z > Z_THRESHOLD else None
+
+				level = expected + self.alpha * error
+				self.trend += TREND_ALPHA * (level - self.level - self.trend)
+				self.level = level
+				self.var = (1 - VARIANCE_ALPHA) * (self.var + VARIANCE_ALPHA * error * error)
+				if kind == SHIFT:
+						# Follow the new level from here
+						self.level = value
+						self.cusum = 0.0
+				return expected, z, kind
+
+		def to_list(self):
+				return [self.count, self.level, self.trend, self.var, self.cusum]
+
+		def load(self, values):
+				count, self.level, self.trend, self.var, self.cusum = values
+				self.count = int(count)
+				return self
+
+
+# The same detector over many series at once (cars x channels of a telemetry
+# feed). update() takes at most one sample per series; every step is a few
+# array operations, whatever the number of series, and fewer once every
+# series is past its warm-up.
+class DetectorBank:
+		def __init__(self, sides, alphas, floors):
+				self.sides = np.asarray(sides, dtype=float)
+				self.alphas = np.asarray(alphas, dtype=float)
+				self.floors = np.asarray(floors, dtype=float)
+				n = len(self.sides)
+				self.count = np.zeros(n, dtype=np.int64)
+				self.level = np.zeros(n)
+				self.trend = np.zeros(n)
+				self.var = np.zeros(n)
+				self.cusum = np.zeros(n)
+
+		@property
+		def nbytes(self):
+				return sum(array.nbytes for array in (self.count, self.level, self.trend, self.var, self.cusum))
+
+		def reset(self, series=slice(None)):
+				self.count[series] = 0
+				self.level[series] = self.trend[series] = self.var[series] = self.cusum[series] = 0.0
+
+		def update(self, series, values):
+				# series: distinct indices, or None for one sample of every series;
+				# returns (expected, z, spike, shift) per sample
+				if series is None:
+						self.count += 1
+						count, level, trend, var, cusum = self.count, self.level, self.trend, self.var, self.cusum
+						sides, alphas, floors = self.sides, self.alphas, self.floors
+						series = slice(None)
+				else:
+						count = self.count[series] + 1
+						self.count[series] = count
+						level, trend, var, cusum = self.level[series], self.trend[series], self.var[series], self.cusum[series]
+						sides, alphas, floors = self.sides[series], self.alphas[series], self.floors[series]
+				expected = level + trend
+				error = values - expected
+				std = np.maximum(np.sqrt(var), floors)
+				z = error / std
+				clipped = np.minimum(np.maximum(z, -Z_THRESHOLD), Z_THRESHOLD)
+				score = sides * z
+				cusum = np.maximum(cusum + sides * clipped - CUSUM_SLACK, 0.0)
+				clipped *= std
+				smoothed = expected + alphas * clipped
+
+				if count.min() > WARMUP:
+						shift = cusum > CUSUM_THRESHOLD
+						spike = score > Z_THRESHOLD
+						self.trend[series] = trend + TREND_ALPHA * (smoothed - level - trend)
+						self.var[series] = (1 - VARIANCE_ALPHA) * (var + VARIANCE_ALPHA * clipped * clipped)
+						if shift.any():
+								smoothed[shift] = values[shift]
+								cusum[shift] = 0.0
+								spike &= ~shift
+						self.level[series] = smoothed
+						self.cusum[series] = cusum
+						return expected, z, spike, shift
+
+				# Some series still warming up: running mean and variance of their
+				# steps (the first sample has none and is masked out)
+				warm = count > WARMUP
+				z = np.where(warm, z, 0.0)
+				cusum = np.where(warm, cusum, 0.0)
+				shift = cusum > CUSUM_THRESHOLD
+				spike = ~shift & warm & (score > Z_THRESHOLD)
+				steps = np.maximum(count - 1, 1)
+				new_level = np.where(warm, smoothed, values)
+				warm_trend = trend + error / steps
+				new_trend = np.where(warm, trend + TREND_ALPHA * (smoothed - level - trend), warm_trend)
+				warm_var = var + (error * (values - level - warm_trend) - var) / steps
+				warm_var = np.where(count == WARMUP, warm_var * (WARMUP - 1) / (WARMUP - 2) / (2 - alphas), warm_var)
+				new_var = np.where(warm, (1 - VARIANCE_ALPHA) * (var + VARIANCE_ALPHA * clipped * clipped), warm_var)
+				first = count == 1
+				self.level[series] = np.where(shift, values, new_level)
+				self.trend[series] = np.where(first, 0.0, new_trend)
+				self.var[series] = np.where(first, 0.0, new_var)
+				self.cusum[series] = np.where(shift, 0.0, cusum)
+				expected = np.where(first, values, expected)
+				return expected, z, spike, shift
+
+
+def make_alert(lap, channel, kind, value, expected, z):
+		return {'lap': int(lap), 'channel': channel, 'kind': kind, 'value': round(float(value), 3),
+						'expected': round(float(expected), 3), 'z': round(float(z), 1)}
+
+
+def describe(alert):
+		label, unit = CHANNELS[alert['channel']][3:]
+		what = "SPIKE" if alert['kind'] == SPIKE else "SHIFT"
+		return (f"LAP {alert['lap']}: {label} {what} {alert['value']:.2f}{unit} vs "
+						f"{alert['expected']:.2f}{unit} expected ({alert['z']:+.1f}σ)")
+
+
+# RaceSimulator's detector: lap time, tyre temperature, battery and fuel, one
+# sample per lap. Baselines restart with every stint and change of weather,
+# since a new set or a wet track is a new normal rather than an anomaly.
+class LapAnomalies:
+		def __init__(self):
+				self.detectors = [ChannelDetector(*CHANNELS[name][:3]) for name in LAP_CHANNELS]
+				self.regime = None
+				self.alerts = deque(maxlen=ALERT_HISTORY)
+
+		def update(self, lap, values, regime):
+				# values in LAP_CHANNELS order; regime is anything that changes with the baseline
+				if regime != self.regime:
+						self.regime = regime
+						for detector in self.detectors:
+								detector.reset()
+				for name, detector, value in zip(LAP_CHANNELS, self.detectors, values):
+						expected, z, kind = detector.update(value)
+						if kind is not None:
+								self.alerts.append(make_alert(lap, name, kind, value, expected, z))
+
+		def recent(self, lap, laps):
+				# Alerts raised on the last `laps` laps up to `lap`, oldest first
+				return [alert for alert in self.alerts if lap - laps < alert['lap'] <= lap]
+
+		def to_dict(self):
+				return {
+						'detectors': [detector.to_list() for detector in self.detectors],
+						'regime': list(self.regime) if self.regime is not None else None,
+						'alerts': list(self.alerts)
+				}
+
+		@staticmethod
+		def from_dict(data):
+				anomalies = LapAnomalies()
+				for detector, values in zip(anomalies.detectors, data['detectors']):
+						detector.load(values)
+				anomalies.regime = tuple(data['regime']) if data['regime'] is not None else None
+				anomalies.alerts.extend(data['alerts'])
+				return anomalies
+
+
+# Raw telemetry: every SAMPLE_CHANNELS channel of every car, scored sample by
+# sample as chunks arrive. A chunk holds several samples per car, so it is
+# taken in rounds of each car's first, second, ... sample; each round is one
+# DetectorBank update over the cars in it.
+class SampleAnomalies:
+		def __init__(self, n_cars=20, channels=SAMPLE_CHANNELS):
+				self.n_cars = n_cars
+				self.channels = channels
+				# Series car * len(channels) + channel
+				sides, alphas, floors = zip(*[CHANNELS[name][:3] for name in channels * n_cars])
+				self.bank = DetectorBank(sides, alphas, floors)
+				self.alerts = [deque(maxlen=ALERT_HISTORY) for _ in range(n_cars)]
+				self.samples = 0
+
+		@property
+		def nbytes(self):
+				return self.bank.nbytes
+
+		def update(self, cars, laps, values):
+				# cars/laps: (n,) in time order per car; values: (len(channels), n)
+				order = np.argsort(cars, kind='stable')
+				cars, laps = cars[order], laps[order]
+				values = values[:, order].astype(np.float64)
+				counts = np.bincount(cars, minlength=self.n_cars)
+				width = len(self.channels)
+				if len(cars) and counts.min() == counts.max():
+						# The usual feed: as many samples from every car, so round r is
+						# column r of a (cars, samples) layout and needs no indexing
+						per_car = int(counts[0])
+						rows = np.ascontiguousarray(values.reshape(width, self.n_cars, per_car).transpose(2, 1, 0))
+						rows = rows.reshape(per_car, -1)
+						laps = laps.reshape(self.n_cars, per_car)
+						for step, samples in enumerate(rows):
+								self._raise(None, laps[:, step], samples, self.bank.update(None, samples))
+				elif len(cars):
+						rank = np.arange(len(cars)) - (np.cumsum(counts) - counts)[cars]
+						# Sample indices grouped by rank, and where each round ends
+						rounds = np.argsort(rank, kind='stable')
+						offsets = np.arange(width)
+						start = 0
+						for end in np.cumsum(np.bincount(rank)).tolist():
+								take = rounds[start:end]
+								start = end
+								series = (cars[take, None] * width + offsets).ravel()
+								samples = values[:, take].T.ravel()
+								self._raise(cars[take], laps[take], samples, self.bank.update(series, samples))
+				self.samples += len(cars)
+
+		def _raise(self, cars, laps, samples, result):
+				# Alerts for the flagged samples of one round; cars and laps per car
+				# in the round, cars None when the round has every car in order
+				expected, z, spike, shift = result
+				flagged = spike | shift
+				if not flagged.any():
+						return
+				width = len(self.channels)
+				for i in np.flatnonzero(flagged).tolist():
+						slot = i // width
+						car = slot if cars is None else int(cars[slot])
+						self.alerts[car].append(make_alert(laps[slot], self.channels[i % width],
+																							 SHIFT if shift[i] else SPIKE, samples[i], expected[i], z[i]))
+
+		def recent(self, car, lap, laps):
+				return [alert for alert in self.alerts[car] if lap - laps < alert['lap'] <= lap]
@@ -0,0 +1,120 @@
+// Renders the telemetry and strategy panels from the numeric panel-state
+// store, so the server only sends values and never the component trees.
+(function () {
+    function level(value, low, high, rising) {
+        // Bootstrap progress colour for a reading; `rising` readings get worse as they grow
+        if (rising) {
+            return value < low ? 'info' : value < high ? 'warning' : 'danger';
+        }
+        return value > high ? 'info' : value > low ? 'warning' : 'danger';
+    }
+
+    function gapText(state) {
+        var parts = [];
+        if (state.gap_ahead !== null && state.gap_ahead !== undefined) {
+            parts.push('+' + state.gap_ahead.toFixed(1) + 's TO P' + (state.position - 1));
+        }
+        if (state.gap_behind !== null && state.gap_behind !== undefined) {
+            parts.push('-' + state.gap_behind.toFixed(1) + 's TO P' + (state.position + 1));
+        }
+        return parts.join(' | ');
+    }
+
+    // Last lap the scrubber was moved to by the race rather than by hand
+    var scrubbed = {lap: null};
+
+    window.dash_clientside = Object.assign({}, window.dash_clientside, {
+        panels: {
+            telemetry: function (state, levelColors, batteryStyle, wearStyle) {
+                if (!state) {
+                    throw window.dash_clientside.PreventUpdate;
+                }
+                var battery = level(state.battery, 20, 50, false);
+                var wear = level(state.tyre_wear, 40, 70, true);
+                return [
+                    'LAP: ' + state.lap + '/' + state.total_laps,
+                    'POSITION: P' + state.position,
+                    gapText(state),
+                    'SPEED: ' + state.speed.toFixed(0) + ' KM/H',
+                    'TYRE: ' + state.tyre_compound.charAt(0) + ' (' + state.tyre_age + ' LAPS)',
+                    state.battery,
+                    battery,
+                    state.battery.toFixed(1) + '%',
+                    Object.assign({}, batteryStyle, {color: levelColors[battery]}),
+                    state.tyre_wear,
+                    wear,
+                    state.tyre_wear.toFixed(1) + '%',
+                    Object.assign({}, wearStyle, {color: levelColors[wear]})
+                ];
+            },
+
+            strategy: function (state) {
+                if (!state) {
+                    throw window.dash_clientside.PreventUpdate;
+                }
+                var alerts = state.alerts.map(function (alert) {
+                    return '⚠ ' + alert.message;
+                });
+                return [state.recommendation, 'CONFIDENCE: ' + state.confidence + '%', state.reasoning,
+                        alerts.join('\n')];
+            },
+
+            alert_chat: function (state, history, postedKeys, styles) {
+                // Appends alerts the chat has not posted yet, keeping the
+                // last 10 messages as the server does. Posted keys are kept
+                // apart from the trimmed history, for as long as the alert
+                // is active, so an alert is posted once however long it lasts.
+                if (!state) {
+                    throw window.dash_clientside.PreventUpdate;
+                }
+                var posted = {};
+                postedKeys.forEach(function (key) {
+                    posted[key] = true;
+                });
+                var active = state.alerts.map(function (alert) {
+                    return alert.key;
+                });
+                var fresh = state.alerts.filter(function (alert) {
+                    return !posted[alert.key];
+                });
+                if (!fresh.length) {
+                    if (active.length === postedKeys.length) {
+                        throw window.dash_clientside.PreventUpdate;
+                    }
+                    var no_update = window.dash_clientside.no_update;
+                    return [no_update, no_update, active];
+                }
+                history = history.concat(fresh.map(function (alert) {
+                    return {role: 'alert', key: alert.key, message: 'AI ENGINEER: ⚠ ' + alert.message};
+                })).slice(-10);
+                var display = history.map(function (msg) {
+                    return {
+                        type: 'P',
+                        namespace: 'dash_html_components',
+                        props: {children: msg.message, style: styles[msg.role] || styles.message}
+                    };
+                });
+                return [display, history, active];
+            },
+
+            scrubber: function (state) {
+                if (!state) {
+                    return;
+                }
+                scrubbed.lap = state.lap;
+                window.dash_clientside.set_props('lap-scrubber', {value: state.lap, max: state.total_laps});
+            },
+
+            seek: function (lap) {
+                if (lap === null || lap === undefined || lap === scrubbed.lap) {
+                    return window.dash_clientside.no_update;
+                }
+                return {lap: lap};
+            },
+
+            auto_run_label: function (running) {
+                return running ? '⏸ PAUSE' : '⚡ AUTO RUN';
+            }
+        }
+    });
+})();
@@ -0,0 +1,61 @@
+// Follows the server-side race clock over Server-Sent Events. Each event is a
+// state delta; the latest one is flushed into the Dash stores at most once per
+// RENDER_MIN_MS so fast clocks do not flood the server with render callbacks.
+// A viewer's page (no owner key) stays subscribed whether or not the clock runs,
+// so it also follows the owner's manual laps, pit calls and seeks.
+(function () {
+    var RENDER_MIN_MS = 250;
+    var clock = {source: null, pending: null, timer: null, watching: false};
+
+    function flush() {
+        clock.timer = null;
+        var delta = clock.pending;
+        if (!delta) {
+            return;
+        }
+        clock.pending = null;
+        var set_props = window.dash_clientside.set_props;
+        set_props('clock-stream', {data: delta});
+        set_props('simulator-state', {data: {session_id: delta.session_id, version: delta.version}});
+        if (!delta.running || clock.watching) {
+            set_props('clock-running', {data: delta.running});
+        }
+    }
+
+    function close() {
+        if (clock.source) {
+            clock.source.close();
+            clock.source = null;
+        }
+    }
+
+    window.dash_clientside = Object.assign({}, window.dash_clientside, {
+        race_clock: {
+            follow: function (running, simState, ownerKey) {
+                clock.watching = !ownerKey;
+                if ((!running && !clock.watching) || !simState) {
+                    close();
+                    return window.dash_clientside.no_update;
+                }
+                if (!clock.source) {
+                    clock.source = new EventSource('/stream/' + simState.session_id);
+                    clock.source.onmessage = function (event) {
+                        var delta = JSON.parse(event.data);
+                        clock.pending = Object.assign({}, clock.pending || {}, delta);
+                        if (!delta.running && !clock.watching) {
+                            close();
+                            flush();
+                        } else if (!clock.timer) {
+                            clock.timer = setTimeout(flush, RENDER_MIN_MS);
+                        }
+                    };
+                }
+                return window.dash_clientside.no_update;
+            },
+
+            viewer_link: function (simState) {
+                return simState ? '?watch=' + simState.session_id : window.dash_clientside.no_update;
+            }
+        }
+    });
+})();
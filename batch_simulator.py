@@ -0,0 +1,166 @@
+import numpy as np
+
+from race_simulator import (
+		COMPOUNDS, BASE_DEGRADATION, DEGRADATION_AGE_SCALE, DEGRADATION_EXPONENT,
+		WET_WEAR_PENALTY, WET_SPEED_LOSS, WET_MIN_SPEED, BASE_SPEED, BASE_TYRE_TEMP,
+		BASE_LAP_TIME, WEAR_TIME_PENALTY, PIT_LOSS, PIT_POSITION_LOSS,
+		COMPOUND_WEAR_RATE, COMPOUND_DRY_PACE, COMPOUND_WET_PENALTY,
+		LAP_NOISE_LOW, LAP_NOISE_SPAN, RaceSimulator
+)
+
+WEAR_RATE_BY_CODE = np.array(COMPOUND_WEAR_RATE)
+DRY_PACE_BY_CODE = np.array(COMPOUND_DRY_PACE)
+WET_PENALTY_BY_CODE = np.array(COMPOUND_WET_PENALTY)
+
+
+# N independent races advanced in lockstep, one NumPy step per lap
+class BatchRaceSimulator:
+		def __init__(self, n_races, total_laps=50, seed=None, start_lap=0, horizon=None):
+				self.n_races = n_races
+				self.total_laps = total_laps
+				self.rng = np.random.default_rng(seed)
+				self.lap = start_lap
+				self.start_lap = start_lap
+				self.speed = np.full(n_races, float(BASE_SPEED))
+				self.battery = np.full(n_races, 100.0)
+				self.tyre_wear = np.zeros(n_races)
+				self.tyre_temp = np.full(n_races, float(BASE_TYRE_TEMP))
+				self.fuel = np.full(n_races, 100.0)
+				self.position = np.full(n_races, 3, dtype=np.int16)
+				self.compound = np.full(n_races, COMPOUNDS.index("Medium"), dtype=np.int8)
+				self.wet = np.zeros(n_races, dtype=bool)
+				self.safety_car = np.zeros(n_races, dtype=bool)
+				self.tyre_age = np.zeros(n_races, dtype=np.int32)
+				self.pit_stops = np.zeros(n_races, dtype=np.int32)
+				# Per-race multiplier on the degradation rate (1.0 = RaceSimulator model)
+				self.wear_rate = np.ones(n_races)
+				# Learned per-lap wear in place of the fixed model: (intercept, slope)
+				# indexed by [compound code, wet], set by use_degradation
+				self.wear_coefficients = None
+				self._allocate_history(horizon)
+
+		def _allocate_history(self, horizon=None):
+				laps = self.total_laps - self.start_lap
+				if horizon is not None:
+						laps = min(laps, horizon)
+				self.end_lap = self.start_lap + laps
+				self.lap_times = np.empty((self.n_races, laps))
+				self.wear_history = np.empty((self.n_races, laps))
+
+		@staticmethod
+		def from_simulator(sim, n_races, seed=None, horizon=None):
+				# Clone one scalar race into n_races identical starting states,
+				# keeping lap history for at most `horizon` laps
+				batch = BatchRaceSimulator(n_races, total_laps=sim.total_laps, seed=seed,
+																	 start_lap=sim.lap, horizon=horizon)
+				batch.speed[:] = sim.speed
+				batch.battery[:] = sim.battery
+				batch.tyre_wear[:] = sim.tyre_wear
+				batch.tyre_temp[:] = sim.tyre_temp
+				batch.fuel[:] = sim.fuel
+				batch.position[:] = sim.position
+				batch.compound[:] = COMPOUNDS.index(sim.tyre_compound)
+				batch.wet[:] = sim.weather == "Wet"
+				batch.safety_car[:] = sim.safety_car
+				batch.tyre_age[:] = sim.tyre_age
+				batch.pit_stops[:] = sim.pit_stops
+				batch.use_degradation(sim.degradation)
+				return batch
+
+		def use_degradation(self, model):
+				# Wear each lap from a DegradationModel's current fit, so rollouts
+				# follow the same rates as the model's own projections
+				self.wear_coefficients = np.array([[model.coefficients(compound, wet) for wet in (False, True)]
+																					 for compound in COMPOUNDS])
+				self.wear_age_scale = model.age_scale
+				self.wear_exponent = model.exponent
+
+		def to_simulator(self, i):
+				# Scalar view of race i; lap history only covers laps run by the batch
+				sim = RaceSimulator()
+				sim.lap = self.lap
+				sim.total_laps = self.total_laps
+				sim.speed = float(self.speed[i])
+				sim.battery = float(self.battery[i])
+				sim.tyre_wear = float(self.tyre_wear[i])
+				sim.tyre_temp = float(self.tyre_temp[i])
+				sim.fuel = float(self.fuel[i])
+				sim.position = int(self.position[i])
+				sim.tyre_compound = COMPOUNDS[self.compound[i]]
+				sim.weather = "Wet" if self.wet[i] else "Dry"
+				sim.safety_car = bool(self.safety_car[i])
+				sim.tyre_age = int(self.tyre_age[i])
+				sim.pit_stops = int(self.pit_stops[i])
+				done = self.lap - self.start_lap
+				sim.lap_times = self.lap_times[i, :done].tolist()
+				return sim
+
+		@property
+		def laps_run(self):
+				return self.lap - self.start_lap
+
+		def set_weather(self, weather, races=None):
+				if races is None:
+						self.wet[:] = weather == "Wet"
+				else:
+						self.wet[races] = weather == "Wet"
+
+		def simulate_lap(self):
+				# Same model as RaceSimulator.simulate_lap, applied to every race at once
+				if self.lap >= self.end_lap:
+						return None
+
+				self.lap += 1
+				self.tyre_age += 1
+				noise = LAP_NOISE_LOW + LAP_NOISE_SPAN * self.rng.random((self.n_races, 5))
+				wet = self.wet
+				compound = self.compound
+
+				if self.wear_coefficients is None:
+						degradation_factor = 1 + (self.tyre_age / DEGRADATION_AGE_SCALE) ** DEGRADATION_EXPONENT
+						wear_rate = self.wear_rate * WEAR_RATE_BY_CODE[compound]
+						wear = np.minimum(100, self.tyre_wear + BASE_DEGRADATION * wear_rate * degradation_factor)
+						wear += wet * WET_WEAR_PENALTY
+				else:
+						# Same form as DegradationModel.project, wet penalty included in the fit
+						coefficients = self.wear_coefficients[compound, wet.astype(np.intp)]
+						feature = (self.tyre_age / self.wear_age_scale) ** self.wear_exponent
+						lap_wear = coefficients[:, 0] + coefficients[:, 1] * feature
+						wear = np.minimum(100, self.tyre_wear + self.wear_rate * lap_wear)
+				self.tyre_wear = wear
+
+				dry_speed = BASE_SPEED - wear * 0.4 + noise[:, 0]
+				wet_speed = np.maximum(WET_MIN_SPEED, self.speed - WET_SPEED_LOSS)
+				self.speed = np.where(wet, wet_speed, dry_speed)
+
+				temp = BASE_TYRE_TEMP + self.tyre_age * 1.5 - wear * 0.2 + noise[:, 1]
+				self.tyre_temp = np.clip(temp, 60, 110)
+
+				self.battery = np.maximum(0, self.battery - noise[:, 2])
+				self.fuel = np.maximum(0, self.fuel - noise[:, 3])
+
+				compound_penalty = np.where(wet, WET_PENALTY_BY_CODE[compound], DRY_PACE_BY_CODE[compound])
+				lap_time = BASE_LAP_TIME + (wear / 100) * WEAR_TIME_PENALTY + compound_penalty + noise[:, 4]
+
+				column = self.lap - self.start_lap - 1
+				self.lap_times[:, column] = lap_time
+				self.wear_history[:, column] = wear
+				return lap_time
+
+		def run(self, laps=None):
+				# Advance up to `laps` laps (default: to the flag)
+				target = self.end_lap if laps is None else min(self.end_lap, self.lap + laps)
+				while self.lap < target:
+						self.simulate_lap()
+				return self
+
+		def pit_stop(self, races=None, new_compound="Medium"):
+				if races is None:
+						races = slice(None)
+				self.tyre_wear[races] = 0
+				self.tyre_age[races] = 0
+				self.compound[races] = COMPOUNDS.index(new_compound)
+				self.pit_stops[races] += 1
+				self.position[races] = np.minimum(20, self.position[races] + PIT_POSITION_LOSS)
+				return PIT_LOSS
+
@@ -0,0 +1,32 @@
+import importlib.util
+import os
+import sys
+import tempfile
+from contextlib import contextmanager
+
+REPO_ROOT = os.path.dirname(os.path.dirname(os.path.abspath(__file__)))
+DASHBOARD_PATH = os.path.join(REPO_ROOT, 'FInal Dashboard.py')
+
+
+def load_dashboard():
+		# The dashboard file name is not importable, so load it by path
+		module = sys.modules.get('dashboard')
+		if module is None:
+				spec = importlib.util.spec_from_file_location('dashboard', DASHBOARD_PATH)
+				module = importlib.util.module_from_spec(spec)
+				sys.modules['dashboard'] = module
+				spec.loader.exec_module(module)
+		return module
+
+
+@contextmanager
+def temporary_history(dashboard):
+		# The dashboard's race history on a throwaway file, so benchmark laps
+		# never land in the real database
+		with tempfile.TemporaryDirectory() as directory:
+				store = dashboard.open_history(os.path.join(directory, 'history.sqlite'))
+				try:
+						yield store
+				finally:
+						store.close()
+						dashboard.history_store = None
@@ -0,0 +1,132 @@
+"""Streaming anomaly detection cost: the four-channel check every simulated lap
+runs, and the per-sample check of a telemetry feed at high rates.
+
+		python -m benchmarks.anomaly [--cars 20] [--hz 100 1000 5000] [--seconds 20] [--chunk-ms 50]
+
+Each recording gets two faults: a tyre temperature spike on one car and a
+step in battery drain on another. Fails if either is missed, if anything else
+raises an alert, if the vectorized bank disagrees with one ChannelDetector per
+series, or if a sample costs TARGET_US or more at the highest rate.
+"""
+import argparse
+import time
+
+import numpy as np
+
+from anomaly_detector import CHANNELS, SAMPLE_CHANNELS, ChannelDetector, LapAnomalies, SampleAnomalies
+from benchmarks.telemetry import synthetic_recording
+from race_simulator import BASE_LAP_TIME, RaceSimulator
+from telemetry_ingest import TelemetryIngest
+
+TARGET_US = 3.0
+# Cars and size of the injected faults
+SPIKE_CAR, SPIKE_DEGREES, SPIKE_SECONDS = 3, 15.0, 0.2
+DRAIN_CAR, DRAIN_STEP = 7, 5.0
+
+
+def lap_costs(laps):
+		# Per-lap values of a simulated race, run through the lap detector
+		sim = RaceSimulator(seed=1)
+		sim.total_laps = laps
+		values = []
+		while sim.lap < laps:
+				if sim.lap and sim.lap % 25 == 0:
+						sim.pit_stop("Medium")
+				lap_time = sim.simulate_lap()
+				values.append(((lap_time, sim.tyre_temp, sim.battery, sim.fuel), (sim.pit_stops, sim.weather)))
+		anomalies = LapAnomalies()
+		start = time.perf_counter()
+		for lap, (sample, regime) in enumerate(values, 1):
+				anomalies.update(lap, sample, regime)
+		return (time.perf_counter() - start) / laps
+
+
+def faulty_recording(cars, hz, seconds):
+		recording = synthetic_recording(cars, hz, seconds / BASE_LAP_TIME)
+		times = recording['time']
+		spike = ((recording['car'] == SPIKE_CAR) & (times >= 0.6 * seconds)
+						 & (times < 0.6 * seconds + SPIKE_SECONDS))
+		recording['tyre_temp'][spike] += SPIKE_DEGREES
+		drain = (recording['car'] == DRAIN_CAR) & (times >= 0.7 * seconds)
+		recording['battery'][drain] -= DRAIN_STEP
+		return recording
+
+
+def split(recording):
+		cars = recording['car'].astype(np.intp)
+		laps = recording['lap'].astype(np.int64)
+		values = np.stack([recording[name] for name in SAMPLE_CHANNELS])
+		return cars, laps, values
+
+
+def loop_check(recording, n_cars, chunk, n):
+		# The first n samples through the bank and through one ChannelDetector
+		# per series, which must agree; returns the loop's seconds per sample
+		detector = SampleAnomalies(n_cars)
+		for offset in range(0, n, chunk):
+				detector.update(*split(recording[offset:min(offset + chunk, n)]))
+		cars, _, values = split(recording[:n])
+		series = [ChannelDetector(*CHANNELS[name][:3]) for _ in range(n_cars) for name in SAMPLE_CHANNELS]
+		width = len(SAMPLE_CHANNELS)
+		start = time.perf_counter()
+		for i, car in enumerate(cars.tolist()):
+				for channel in range(width):
+						series[car * width + channel].update(float(values[channel, i]))
+		elapsed = time.perf_counter() - start
+		bank = detector.bank
+		for index, channel_detector in enumerate(series):
+				state = [bank.count[index], bank.level[index], bank.trend[index], bank.var[index], bank.cusum[index]]
+				assert np.allclose(channel_detector.to_list(), state), index
+		return elapsed / n
+
+
+def main():
+		parser = argparse.ArgumentParser(description=__doc__, formatter_class=argparse.RawDescriptionHelpFormatter)
+		parser.add_argument('--cars', type=int, default=20)
+		parser.add_argument('--hz', type=float, nargs='+', default=[100, 1000, 5000])
+		parser.add_argument('--seconds', type=float, default=20)
+		parser.add_argument('--chunk-ms', type=float, default=50)
+		args = parser.parse_args()
+
+		print(f"lap detector: {lap_costs(20000) * 1e6:.2f} us/lap for {len(LapAnomalies().detectors)} channels")
+		per_sample = None
+		for hz in args.hz:
+				recording = faulty_recording(args.cars, hz, args.seconds)
+				chunk = max(1, int(args.cars * hz * args.chunk_ms / 1000))
+				detector = SampleAnomalies(args.cars)
+				elapsed = 0.0
+				for offset in range(0, len(recording), chunk):
+						cars, laps, values = split(recording[offset:offset + chunk])
+						start = time.perf_counter()
+						detector.update(cars, laps, values)
+						elapsed += time.perf_counter() - start
+				per_sample = elapsed / len(recording)
+
+				ingest_seconds = []
+				for detect in (False, True):
+						ingest = TelemetryIngest(n_cars=args.cars, detect_anomalies=detect)
+						start = time.perf_counter()
+						for offset in range(0, len(recording), chunk):
+								ingest.ingest(recording[offset:offset + chunk])
+						ingest_seconds.append(time.perf_counter() - start)
+
+				flagged = {car: {(alert['channel'], alert['kind']) for alert in alerts}
+									 for car, alerts in enumerate(detector.alerts) if alerts}
+				assert ('tyre_temp', 'spike') in flagged.pop(SPIKE_CAR, ()), f"{hz:g} Hz: tyre temp spike missed"
+				assert any(channel == 'battery' for channel, _ in flagged.pop(DRAIN_CAR, ())), \
+						f"{hz:g} Hz: battery drain step missed"
+				assert not flagged, f"{hz:g} Hz: false alerts {flagged}"
+
+				loop = loop_check(recording, args.cars, chunk, min(len(recording), 20000))
+				print(f"{hz:>6g} Hz x {args.cars} cars  {per_sample * 1e6:6.3f} us/sample "
+							f"({args.cars * hz * per_sample:6.1%} of a core; Python loop {loop * 1e6:.2f} us)  "
+							f"ingest {ingest_seconds[0] / len(recording) * 1e6:.3f} -> "
+							f"{ingest_seconds[1] / len(recording) * 1e6:.3f} us/sample")
+		print("injected faults flagged, no false alerts; the bank matches per-series detectors")
+		if per_sample is not None:
+				assert per_sample * 1e6 < TARGET_US, f"{per_sample * 1e6:.3f} us/sample at {args.hz[-1]:g} Hz"
+				print(f"under {TARGET_US:g} us/sample at {args.hz[-1]:g} Hz")
+
+
+if __name__ == '__main__':
+		main()
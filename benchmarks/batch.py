@@ -0,0 +1,67 @@
+"""Races-per-second of BatchRaceSimulator against the scalar RaceSimulator.
+
+    python -m benchmarks.batch [--races 10000] [--laps 50]
+"""
+import argparse
+import time
+
+import numpy as np
+
+from race_simulator import RaceSimulator
+from batch_simulator import BatchRaceSimulator
+
+
+def bench_scalar(n_races, laps):
+		start = time.perf_counter()
+		for _ in range(n_races):
+				sim = RaceSimulator()
+				sim.total_laps = laps
+				while sim.lap < sim.total_laps:
+						sim.simulate_lap()
+		return n_races / (time.perf_counter() - start)
+
+
+def bench_batch(n_races, laps, seed=0):
+		start = time.perf_counter()
+		BatchRaceSimulator(n_races, total_laps=laps, seed=seed).run()
+		return n_races / (time.perf_counter() - start)
+
+
+def check_model(laps, n_races=20000, seed=0):
+		# Mean end-of-race state must agree between the two engines
+		batch = BatchRaceSimulator(n_races, total_laps=laps, seed=seed).run()
+		scalar = []
+		for _ in range(500):
+				sim = RaceSimulator()
+				sim.total_laps = laps
+				while sim.lap < sim.total_laps:
+						sim.simulate_lap()
+				scalar.append((sim.tyre_wear, sim.battery, sim.fuel, sum(sim.lap_times)))
+		scalar = np.mean(scalar, axis=0)
+		batch_means = (batch.tyre_wear.mean(), batch.battery.mean(), batch.fuel.mean(),
+								   batch.lap_times.sum(axis=1).mean())
+		return scalar, batch_means
+
+
+def main():
+		parser = argparse.ArgumentParser(description=__doc__)
+		parser.add_argument('--races', type=int, default=10000)
+		parser.add_argument('--scalar-races', type=int, default=200)
+		parser.add_argument('--laps', type=int, default=50)
+		args = parser.parse_args()
+
+		scalar_rate = bench_scalar(args.scalar_races, args.laps)
+		batch_rate = bench_batch(args.races, args.laps)
+		print(f"laps per race:      {args.laps}")
+		print(f"scalar RaceSimulator: {scalar_rate:12,.0f} races/s")
+		print(f"BatchRaceSimulator:   {batch_rate:12,.0f} races/s  ({args.races} races per batch)")
+		print(f"speed-up:             {batch_rate / scalar_rate:12,.1f}x")
+
+		scalar, batch = check_model(args.laps)
+		labels = ('wear', 'battery', 'fuel', 'race time')
+		for label, a, b in zip(labels, scalar, batch):
+				print(f"  mean {label:<10} scalar {a:9.2f}  batch {b:9.2f}")
+
+
+if __name__ == '__main__':
+		main()
@@ -0,0 +1,66 @@
+"""Broadcast fan-out: display render time per lap as the number of viewers grows,
+with renders shared through the per-session cache and recomputed per viewer.
+
+		python -m benchmarks.broadcast [--viewers 1 4 12 48] [--laps 30] [--field 20]
+
+Each viewer follows the owner's session and keeps its own chart cursor, as a
+browser does. Viewers refresh every one, two or three laps, so their cursors
+lag the race by different amounts. The owner's simulation time is not counted.
+The shared column's cache hit rate is reported alongside.
+"""
+import argparse
+import time
+
+from benchmarks import load_dashboard, temporary_history
+from race_simulator import RaceSimulator
+
+
+def run(dashboard, viewers, laps, field_size, shared):
+		sessions = dashboard.sessions
+		entry = sessions.get(sessions.create(RaceSimulator(seed=7, field_size=field_size)))
+		# Same seed every run, so start both variants without memoized strategy
+		dashboard.strategy_cache.clear()
+		cursors = [None] * viewers
+		outputs = None
+		elapsed = 0.0
+		for lap in range(1, laps + 1):
+				dashboard.apply_action(entry, 'next-lap-btn', 'Dry', [])
+				state = sessions.client_state(entry)
+				start = time.perf_counter()
+				for viewer in range(viewers):
+						if lap % (1 + viewer % 3):
+								continue
+						if not shared:
+								entry.views.pop('renders', None)
+						outputs = dashboard.update_displays(state, cursors[viewer])
+						cursors[viewer] = outputs[3]
+				elapsed += time.perf_counter() - start
+		sessions.discard(entry.session_id)
+		return elapsed / laps, outputs
+
+
+def main():
+		parser = argparse.ArgumentParser(description=__doc__)
+		parser.add_argument('--viewers', type=int, nargs='+', default=[1, 4, 12, 48])
+		parser.add_argument('--laps', type=int, default=30)
+		parser.add_argument('--field', type=int, default=20)
+		args = parser.parse_args()
+
+		dashboard = load_dashboard()
+		with temporary_history(dashboard):
+				# Warm-up: chart templates and first-call imports
+				run(dashboard, 1, 3, args.field or None, shared=True)
+				print(f"{'viewers':>8} {'per viewer':>14} {'shared':>14} {'speedup':>8} {'hit rate':>9}")
+				for viewers in args.viewers:
+						separate, separate_outputs = run(dashboard, viewers, args.laps, args.field or None, shared=False)
+						hits, misses = dashboard.render_cache.value('hit'), dashboard.render_cache.value('miss')
+						shared, shared_outputs = run(dashboard, viewers, args.laps, args.field or None, shared=True)
+						hits = dashboard.render_cache.value('hit') - hits
+						misses = dashboard.render_cache.value('miss') - misses
+						assert shared_outputs[0] == separate_outputs[0]
+						print(f"{viewers:>8} {separate * 1e3:>11.2f} ms {shared * 1e3:>11.2f} ms {separate / shared:>7.1f}x "
+									f"{hits / max(hits + misses, 1):>8.0%}")
+
+
+if __name__ == '__main__':
+		main()
@@ -0,0 +1,61 @@
+"""Chart payload bytes per update: full figure rebuild (every point and
+decimated) vs incremental Patch.
+
+		python -m benchmarks.chart_payload [--laps 50 500 5000]
+"""
+import argparse
+
+import numpy as np
+from plotly.io.json import to_json_plotly
+
+from benchmarks import load_dashboard, temporary_history
+from downsample import MinMaxDecimator
+
+
+def payload_bytes(figures):
+		return sum(len(to_json_plotly(fig)) for fig in figures)
+
+
+def measure(dashboard, laps):
+		session_id = dashboard.sessions.create()
+		entry = dashboard.sessions.get(session_id)
+		entry.simulator.total_laps = laps
+		predictor = dashboard.MonteCarloPredictor(n_rollouts=500, seed=0)
+
+		# A decimator that never merges buckets sends every point
+		every_point = {name: MinMaxDecimator(10 ** 9) for name, _ in dashboard.CHART_SERIES}
+		raw, full, incremental = [], [], []
+		cursor = None
+		while entry.simulator.lap < laps:
+				entry.simulator.simulate_lap()
+				if entry.simulator.lap % 20 == 0:
+						entry.simulator.pit_stop("Medium")
+				bands = predictor.predict(entry.simulator)
+				history = entry.simulator.history
+				for name, decimator in every_point.items():
+						decimator.update(history.column(name), history.tyre_age <= 1)
+				raw.append(payload_bytes(dashboard.build_chart_figures(entry.simulator, bands, every_point)))
+				series = dashboard.chart_series(entry)
+				full.append(payload_bytes(dashboard.build_chart_figures(entry.simulator, bands, series)))
+				*figures, cursor = dashboard.render_charts(entry, bands, cursor)
+				incremental.append(payload_bytes(figures))
+		dashboard.sessions.discard(session_id)
+		return np.array(raw), np.array(full), np.array(incremental)
+
+
+def main():
+		parser = argparse.ArgumentParser(description=__doc__)
+		parser.add_argument('--laps', type=int, nargs='+', default=[50, 500, 5000])
+		args = parser.parse_args()
+
+		dashboard = load_dashboard()
+		print(f"{'laps':>6} {'raw last':>12} {'full mean':>12} {'full last':>12} {'patch mean':>12} {'patch last':>12}")
+		with temporary_history(dashboard):
+				for laps in args.laps:
+						raw, full, incremental = measure(dashboard, laps)
+						print(f"{laps:>6} {raw[-1]:>12,} {full.mean():>12,.0f} {full[-1]:>12,} "
+								  f"{incremental.mean():>12,.0f} {incremental[-1]:>12,}")
+
+
+if __name__ == '__main__':
+		main()
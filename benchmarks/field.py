@@ -0,0 +1,73 @@
+"""Cost of a 20-car field lap against a single scalar lap.
+
+    python -m benchmarks.field [--cars 20] [--races 200] [--laps 50]
+"""
+import argparse
+import time
+
+from race_simulator import RaceSimulator
+
+
+def bench(field_size, n_races, laps):
+		# Microseconds per simulate_lap call; race set-up is timed separately
+		sim = RaceSimulator(seed=0, field_size=field_size)
+		sim.total_laps = laps
+		lap_time = setup_time = 0.0
+		for _ in range(n_races):
+				start = time.perf_counter()
+				sim.reset()
+				setup_time += time.perf_counter() - start
+				start = time.perf_counter()
+				for _ in range(laps):
+						sim.simulate_lap()
+				lap_time += time.perf_counter() - start
+		return lap_time / (n_races * laps) * 1e6, setup_time / n_races * 1e6
+
+
+def bench_events(field_size, n_races, laps):
+		# Same race with a pit stop, a wet spell and a safety car, which re-plan the field
+		sim = RaceSimulator(seed=0, field_size=field_size)
+		sim.total_laps = laps
+		start = time.perf_counter()
+		for _ in range(n_races):
+				sim.reset()
+				for lap in range(laps):
+						if lap == laps // 3:
+								sim.set_conditions("Wet", False)
+						elif lap == laps // 2:
+								sim.set_conditions("Dry", True)
+								sim.pit_stop("Medium")
+						elif lap == laps // 2 + 3:
+								sim.set_conditions("Dry", False)
+						sim.simulate_lap()
+		return (time.perf_counter() - start) / (n_races * laps) * 1e6
+
+
+def main():
+		parser = argparse.ArgumentParser(description=__doc__)
+		parser.add_argument('--cars', type=int, default=20)
+		parser.add_argument('--races', type=int, default=200)
+		parser.add_argument('--laps', type=int, default=50)
+		args = parser.parse_args()
+
+		scalar, scalar_setup = bench(None, args.races, args.laps)
+		field, field_setup = bench(args.cars, args.races, args.laps)
+		print(f"scalar lap:            {scalar:8.1f} us/lap  (reset {scalar_setup:7.1f} us)")
+		print(f"{args.cars}-car field lap:     {field:8.1f} us/lap  (reset {field_setup:7.1f} us)")
+		print(f"field overhead:        {field - scalar:8.1f} us/lap")
+		print(f"with weather/SC/pit:   {bench_events(args.cars, args.races, args.laps):8.1f} us/lap (incl. reset)")
+
+		sim = RaceSimulator(seed=0, field_size=args.cars)
+		sim.total_laps = args.laps
+		while sim.lap < sim.total_laps:
+				sim.simulate_lap()
+		print("\nfinal standings (seed 0):")
+		for row in sim.field.standings()[:5]:
+				marker = " <- player" if row['player'] else ""
+				print(f"  P{row['position']:<3} car {row['car']:>2}  +{row['gap']:6.2f}s  {row['compound']:<12} "
+							f"{row['pit_stops']} stops{marker}")
+		print(f"  player: P{sim.position}")
+
+
+if __name__ == '__main__':
+		main()
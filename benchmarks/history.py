@@ -0,0 +1,83 @@
+"""Race history store: batched append rate and query latency over many stints.
+
+    python -m benchmarks.history [--races 2000] [--laps 50] [--batch 64]
+"""
+import argparse
+import os
+import tempfile
+import time
+
+import numpy as np
+
+from race_history import RaceHistoryStore, lap_row
+from race_simulator import COMPOUNDS, RaceSimulator
+
+
+def race_rows(seed, laps):
+		# One race of lap rows, pitting onto a random compound every 12-25 laps
+		sim = RaceSimulator(seed=seed)
+		sim.total_laps = laps
+		rng = np.random.default_rng(seed)
+		next_stop = rng.integers(12, 26)
+		rows = []
+		for _ in range(laps):
+				sim.simulate_lap()
+				rows.append(lap_row(sim))
+				if sim.tyre_age >= next_stop:
+						sim.pit_stop(COMPOUNDS[rng.integers(3)])
+						next_stop = rng.integers(12, 26)
+				if sim.lap == laps // 2:
+						sim.set_conditions("Wet" if rng.random() < 0.2 else "Dry", False)
+		return rows
+
+
+def timed(func, calls=200):
+		samples = []
+		for _ in range(calls):
+				start = time.perf_counter()
+				func()
+				samples.append(time.perf_counter() - start)
+		return np.percentile(np.array(samples) * 1000, [50, 99])
+
+
+def main():
+		parser = argparse.ArgumentParser(description=__doc__)
+		parser.add_argument('--races', type=int, default=2000)
+		parser.add_argument('--laps', type=int, default=50)
+		parser.add_argument('--batch', type=int, default=64)
+		args = parser.parse_args()
+
+		races = [race_rows(seed, args.laps) for seed in range(args.races)]
+		with tempfile.TemporaryDirectory() as directory:
+				path = os.path.join(directory, 'history.sqlite')
+				store = RaceHistoryStore(path, batch_size=args.batch)
+				start = time.perf_counter()
+				for rows in races:
+						for row in rows:
+								store.record_laps([row])
+				store.flush()
+				elapsed = time.perf_counter() - start
+
+				counts = store.counts()
+				print(f"stored:        {counts['laps']:,} laps in {counts['stints']:,} stints "
+							f"({os.path.getsize(path) / 1024 / 1024:.1f} MiB)")
+				print(f"append rate:   {counts['laps'] / elapsed:,.0f} laps/s (batches of {args.batch})")
+				queries = (
+						('wear_curve', lambda: store.wear_curve("Medium", False)),
+						('stint_summary', lambda: store.stint_summary("Soft", False)),
+						('bucket_laps', lambda: store.bucket_laps("Hard", False, 12, limit=200)),
+				)
+				for name, query in queries:
+						p50, p99 = timed(query)
+						print(f"{name:<14} p50 {p50:.3f} ms  p99 {p99:.3f} ms")
+
+				curve = store.wear_curve("Medium", False)
+				age, wear, _, laps = curve[10]
+				mine = [row[9] for rows in races for row in rows if row[4] == 1 and not row[5] and row[7] == age]
+				assert laps == len(mine) and np.isclose(wear, np.mean(mine))
+				print("wear curve matches the raw laps")
+				store.close()
+
+
+if __name__ == '__main__':
+		main()
@@ -0,0 +1,331 @@
+"""Load test: N simulated pit-wall clients against a local dashboard server,
+through the same _dash-update-component requests a browser sends.
+
+		python -m benchmarks.load [--clients 1 4 16 64] [--laps 50 500 2000] [--duration 10]
+														  [--think 0.25] [--output bench_load.json]
+														  [--compare previous.json] [--threshold 0.2]
+
+For each race length a fresh server is started in a subprocess: threaded
+Werkzeug, a temporary history database, no telemetry feed, and every new session
+already that many laps in. Each client loads the page, then repeats a weighted
+mix of actions (MIX) with exponential think time. Laps stand for both NEXT LAP
+clicks and auto-run ticks. Every update_simulator action is followed by the
+update_displays request the browser chains, sent with the client's own chart
+cursor.
+
+Reports requests/sec and per-callback p50/p95/p99 latency for every race length
+and client count, and writes them to --output. With --compare, rows whose p95
+grew by more than --threshold are flagged and the exit status is 1.
+"""
+import argparse
+import http.client
+import json
+import os
+import platform
+import subprocess
+import sys
+import tempfile
+import threading
+import time
+
+import numpy as np
+
+from benchmarks import REPO_ROOT
+from benchmarks.suite import git_revision
+
+CALLBACKS = ('update_simulator', 'update_displays', 'update_chat')
+
+# Output that identifies each callback in /_dash-dependencies
+CALLBACK_OUTPUTS = {
+		'update_simulator': 'simulator-state.data',
+		'update_displays': 'panel-state.data',
+		'update_chat': 'chat-display.children'
+}
+
+# Client actions and their relative frequency
+MIX = (('lap', 60), ('chat', 20), ('pit', 5), ('weather', 5), ('safety_car', 5), ('seek', 5))
+
+CHAT_QUESTIONS = ("pit or stay out?", "how are the tyres?", "what's our pace?",
+									"average lap time over the last 10 laps", "what position are we in?",
+									"any past stints history?")
+
+# Laps of room left after the pre-run laps, so no client reaches the flag
+RACE_ROOM_LAPS = 100000
+
+# Runs in the server subprocess: prints the port, then serves until killed
+SERVER = """
+import logging, sys
+from werkzeug.serving import WSGIRequestHandler, make_server
+from benchmarks import load_dashboard
+
+start_laps = int(sys.argv[1])
+dashboard = load_dashboard()
+base = dashboard.sessions.factory
+
+def factory():
+		sim = base()
+		sim.total_laps = start_laps + %d
+		for _ in range(start_laps):
+				sim.simulate_lap()
+		return sim
+
+dashboard.sessions.factory = factory
+app = dashboard.create_app()
+
+class Handler(WSGIRequestHandler):
+		protocol_version = 'HTTP/1.1'
+
+logging.getLogger('werkzeug').setLevel(logging.ERROR)
+server = make_server('127.0.0.1', 0, app.server, threaded=True, request_handler=Handler)
+print(server.port, flush=True)
+server.serve_forever()
+""" % RACE_ROOM_LAPS
+
+
+def start_server(laps, directory):
+		env = dict(os.environ, APEXMIND_HISTORY_DB=os.path.join(directory, f'history-{laps}.sqlite'),
+							 APEXMIND_MAX_SESSIONS='100000')
+		env.pop('APEXMIND_TELEMETRY_SOURCE', None)
+		process = subprocess.Popen([sys.executable, '-c', SERVER, str(laps)], cwd=REPO_ROOT, env=env,
+															 stdout=subprocess.PIPE, text=True)
+		port = int(process.stdout.readline())
+		return process, port
+
+
+def find_stores(layout, found=None):
+		# id -> data of every dcc.Store in a serialized layout
+		found = {} if found is None else found
+		if isinstance(layout, dict):
+				props = layout.get('props', {})
+				if layout.get('type') == 'Store':
+						found[props.get('id')] = props.get('data')
+				for value in props.values():
+						find_stores(value, found)
+		elif isinstance(layout, list):
+				for item in layout:
+						find_stores(item, found)
+		return found
+
+
+def split_prop(name):
+		component, prop = name.rsplit('.', 1)
+		return {'id': component, 'property': prop}
+
+
+def callback_body(dependency, values, changed):
+		# The request body the renderer sends for `dependency`, with every input
+		# and state taken from `values` ('id.prop' -> value)
+		outputs = dependency['output'].strip('.').split('...')
+		return {
+				'output': dependency['output'],
+				'outputs': [split_prop(name) for name in outputs],
+				'inputs': [dict(item, value=values.get(f"{item['id']}.{item['property']}"))
+									 for item in dependency['inputs']],
+				'state': [dict(item, value=values.get(f"{item['id']}.{item['property']}"))
+									for item in dependency['state']],
+				'changedPropIds': [changed]
+		}
+
+
+# One browser: its own connection, session and store values
+class Client:
+		def __init__(self, port, dependencies, seed):
+				self.connection = http.client.HTTPConnection('127.0.0.1', port, timeout=120)
+				self.dependencies = dependencies
+				self.rng = np.random.default_rng(seed)
+				self.values = {}
+				self.clicks = 0
+				self.lap = 0
+				self.samples = []
+				self.errors = 0
+
+		def request(self, method, path, body=None):
+				headers = {'Content-Type': 'application/json'} if body is not None else {}
+				self.connection.request(method, path, body=body, headers=headers)
+				response = self.connection.getresponse()
+				return response.status, response.read()
+
+		def load_page(self):
+				status, payload = self.request('GET', '/_dash-layout')
+				assert status == 200, status
+				stores = find_stores(json.loads(payload))
+				self.values = {f'{name}.data': data for name, data in stores.items()}
+				self.values.update({'weather-dropdown.value': 'Dry', 'safety-car-switch.value': []})
+				self.display()
+
+		def callback(self, name, changed):
+				body = json.dumps(callback_body(self.dependencies[name], self.values, changed))
+				start = time.perf_counter()
+				status, payload = self.request('POST', '/_dash-update-component', body)
+				self.samples.append((name, time.perf_counter() - start))
+				if status not in (200, 204):
+						self.errors += 1
+						return {}
+				if status == 204:
+						return {}
+				# Carry the stores the response updates into the next request
+				response = json.loads(payload)['response']
+				for component, props in response.items():
+						for prop, value in props.items():
+								if not (isinstance(value, dict) and '__dash_patch_update' in value):
+										self.values[f'{component}.{prop}'] = value
+				return response
+
+		def display(self):
+				response = self.callback('update_displays', 'simulator-state.data')
+				self.lap = response.get('panel-state', {}).get('data', {}).get('lap', self.lap)
+
+		def simulate(self, changed, value=None):
+				# An update_simulator request for a click or a changed control value
+				# ('id.prop'), then the display render it triggers
+				self.clicks += 1
+				self.values[changed] = self.clicks if changed.endswith('.n_clicks') else value
+				self.callback('update_simulator', changed)
+				self.display()
+
+		def act(self, action):
+				if action == 'lap':
+						self.simulate('next-lap-btn.n_clicks')
+				elif action == 'pit':
+						self.simulate('pit-btn.n_clicks')
+				elif action == 'weather':
+						wet = self.values['weather-dropdown.value'] == 'Wet'
+						self.simulate('weather-dropdown.value', 'Dry' if wet else 'Wet')
+				elif action == 'safety_car':
+						self.simulate('safety-car-switch.value', [] if self.values['safety-car-switch.value'] else [1])
+				elif action == 'seek':
+						self.simulate('seek-target.data', {'lap': max(self.lap - int(self.rng.integers(1, 6)), 0)})
+				elif action == 'chat':
+						self.clicks += 1
+						self.values['send-btn.n_clicks'] = self.clicks
+						self.values['chat-input.value'] = CHAT_QUESTIONS[self.rng.integers(len(CHAT_QUESTIONS))]
+						self.callback('update_chat', 'send-btn.n_clicks')
+
+		def run(self, start, deadline, think):
+				names = [name for name, _ in MIX]
+				weights = np.array([weight for _, weight in MIX], dtype=float)
+				weights /= weights.sum()
+				start.wait()
+				while time.perf_counter() < deadline:
+						time.sleep(self.rng.exponential(think))
+						self.act(names[self.rng.choice(len(names), p=weights)])
+
+
+def summarize(samples):
+		latencies = np.array(samples) * 1000
+		p50, p95, p99 = np.percentile(latencies, [50, 95, 99])
+		return {'count': len(latencies), 'p50_ms': p50, 'p95_ms': p95, 'p99_ms': p99}
+
+
+def run_load(port, dependencies, laps, clients, duration, think):
+		group = [Client(port, dependencies, seed=index) for index in range(clients)]
+		for client in group:
+				client.load_page()
+				client.samples.clear()
+		start = threading.Event()
+		began = time.perf_counter()
+		threads = [threading.Thread(target=client.run, args=(start, began + duration, think), daemon=True)
+							 for client in group]
+		for thread in threads:
+				thread.start()
+		start.set()
+		for thread in threads:
+				thread.join()
+		elapsed = time.perf_counter() - began
+
+		samples = [sample for client in group for sample in client.samples]
+		errors = sum(client.errors for client in group)
+		results = []
+		for name in CALLBACKS + ('all',):
+				latencies = [seconds for callback, seconds in samples if name in ('all', callback)]
+				if not latencies:
+						continue
+				result = {'laps': laps, 'clients': clients, 'callback': name,
+									'requests_per_sec': len(latencies) / elapsed}
+				result.update(summarize(latencies))
+				if name == 'all':
+						result['errors'] = errors
+				results.append(result)
+				print(f"{laps:>6} laps {clients:>4} clients  {name:<17} {result['requests_per_sec']:>8.1f} req/s  "
+							f"p50 {result['p50_ms']:>8.1f} ms  p95 {result['p95_ms']:>8.1f} ms  p99 {result['p99_ms']:>8.1f} ms"
+							+ (f"  errors {errors}" if name == 'all' else ''))
+		for client in group:
+				client.connection.close()
+		return results
+
+
+def compare(results, baseline, threshold):
+		# Rows whose p95 latency grew by more than `threshold` (fraction)
+		previous = {(r['callback'], r['laps'], r['clients']): r for r in baseline['results']}
+		regressions = []
+		for result in results:
+				old = previous.get((result['callback'], result['laps'], result['clients']))
+				if old is None:
+						continue
+				change = result['p95_ms'] / old['p95_ms'] - 1
+				if change > threshold:
+						regressions.append((result, old['p95_ms'], change))
+		return regressions
+
+
+def main():
+		parser = argparse.ArgumentParser(description=__doc__, formatter_class=argparse.RawDescriptionHelpFormatter)
+		parser.add_argument('--clients', type=int, nargs='+', default=[1, 4, 16, 64])
+		parser.add_argument('--laps', type=int, nargs='+', default=[50, 500, 2000])
+		parser.add_argument('--duration', type=float, default=10.0)
+		parser.add_argument('--think', type=float, default=0.25, help="mean seconds between a client's actions")
+		parser.add_argument('--output', default='bench_load.json')
+		parser.add_argument('--compare')
+		parser.add_argument('--threshold', type=float, default=0.2)
+		args = parser.parse_args()
+
+		results = []
+		with tempfile.TemporaryDirectory() as directory:
+				for laps in args.laps:
+						process, port = start_server(laps, directory)
+						try:
+								connection = http.client.HTTPConnection('127.0.0.1', port, timeout=120)
+								connection.request('GET', '/_dash-dependencies')
+								dependencies = {}
+								for dependency in json.loads(connection.getresponse().read()):
+										outputs = dependency['output'].strip('.').split('...')
+										for name, output in CALLBACK_OUTPUTS.items():
+												if output in outputs:
+														dependencies[name] = dependency
+								connection.close()
+								for clients in args.clients:
+										results.extend(run_load(port, dependencies, laps, clients, args.duration, args.think))
+						finally:
+								process.terminate()
+								process.wait()
+
+		report = {
+				'meta': {
+						'timestamp': time.strftime('%Y-%m-%dT%H:%M:%S'),
+						'revision': git_revision(),
+						'python': platform.python_version(),
+						'machine': platform.machine(),
+						'cpus': os.cpu_count(),
+						'duration': args.duration,
+						'think': args.think
+				},
+				'results': results
+		}
+		with open(args.output, 'w') as f:
+				json.dump(report, f, indent=2)
+		print(f"results written to {args.output}")
+
+		if args.compare:
+				with open(args.compare) as f:
+						baseline = json.load(f)
+				regressions = compare(results, baseline, args.threshold)
+				for result, old, change in regressions:
+						print(f"REGRESSION {result['callback']} @ {result['laps']} laps, {result['clients']} clients: "
+									f"p95 {old:.1f} -> {result['p95_ms']:.1f} ms (+{change:.0%})")
+				if regressions:
+						sys.exit(1)
+				print(f"no regressions over {args.threshold:.0%} against {args.compare}")
+
+
+if __name__ == '__main__':
+		main()
@@ -0,0 +1,41 @@
+"""Latency of MonteCarloPredictor.predict against its budget.
+
+		python -m benchmarks.prediction [--rollouts 5000] [--laps-ahead 10] [--budget-ms 20]
+"""
+import argparse
+import time
+
+import numpy as np
+
+from race_simulator import RaceSimulator
+from prediction import MonteCarloPredictor
+
+
+def main():
+		parser = argparse.ArgumentParser(description=__doc__)
+		parser.add_argument('--rollouts', type=int, default=5000)
+		parser.add_argument('--laps-ahead', type=int, default=10)
+		parser.add_argument('--budget-ms', type=float, default=20.0)
+		parser.add_argument('--calls', type=int, default=200)
+		args = parser.parse_args()
+
+		sim = RaceSimulator()
+		for _ in range(12):
+				sim.simulate_lap()
+
+		predictor = MonteCarloPredictor(n_rollouts=args.rollouts, budget_ms=args.budget_ms, seed=0)
+		samples = []
+		for _ in range(args.calls):
+				start = time.perf_counter()
+				predictor.predict(sim, laps_ahead=args.laps_ahead)
+				samples.append((time.perf_counter() - start) * 1000)
+
+		p50, p95, p99 = np.percentile(samples, [50, 95, 99])
+		within = np.mean(np.array(samples) <= args.budget_ms) * 100
+		print(f"{args.rollouts} rollouts x {args.laps_ahead} laps, budget {args.budget_ms:.1f} ms")
+		print(f"latency p50 {p50:.2f} ms  p95 {p95:.2f} ms  p99 {p99:.2f} ms")
+		print(f"calls within budget: {within:.1f}%  settled rollouts: {predictor.n_rollouts}")
+
+
+if __name__ == '__main__':
+		main()
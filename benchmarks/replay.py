@@ -0,0 +1,53 @@
+"""Replay speed: rebuild a recorded session from seed + event log.
+
+		python -m benchmarks.replay [--laps 50] [--repeat 200]
+"""
+import argparse
+import time
+
+import numpy as np
+
+from race_simulator import RaceSimulator
+
+
+def record_session(laps, seed=42):
+		# A typical session: a weather change, a safety car and two stops
+		sim = RaceSimulator(seed=seed)
+		sim.total_laps = laps
+		while sim.lap < laps:
+				if sim.lap == laps // 3:
+						sim.set_conditions("Wet", sim.safety_car)
+						sim.pit_stop("Intermediate")
+				if sim.lap == laps // 2:
+						sim.set_conditions("Dry", True)
+				if sim.lap == laps // 2 + 2:
+						sim.set_conditions(sim.weather, False)
+						sim.pit_stop("Hard")
+				sim.simulate_lap()
+		return sim
+
+
+def main():
+		parser = argparse.ArgumentParser(description=__doc__)
+		parser.add_argument('--laps', type=int, default=50)
+		parser.add_argument('--repeat', type=int, default=200)
+		args = parser.parse_args()
+
+		live = record_session(args.laps)
+		samples = []
+		for _ in range(args.repeat):
+				start = time.perf_counter()
+				replayed = RaceSimulator.replay(live.seed, live.events, total_laps=live.total_laps)
+				samples.append((time.perf_counter() - start) * 1e6)
+
+		identical = (replayed.lap_times == live.lap_times
+								 and replayed.events == live.events
+								 and np.array_equal(replayed.history.wear, live.history.wear)
+								 and replayed.battery == live.battery and replayed.fuel == live.fuel)
+		p50, p99 = np.percentile(samples, [50, 99])
+		print(f"{args.laps} laps, {len(live.events)} events ({len(live.events.to_bytes())} bytes)")
+		print(f"replay p50 {p50:.0f} us  p99 {p99:.0f} us  identical to live session: {identical}")
+
+
+if __name__ == '__main__':
+		main()
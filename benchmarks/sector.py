@@ -0,0 +1,98 @@
+"""Per-corner tyre model cost: simulate_lap with the sector model against the
+aggregate tyre, and the vectorized lap against a plain Python segment loop.
+
+		python -m benchmarks.sector [--segments 50 200 1000] [--laps 500] [--field 0]
+
+Fails if a lap at 200 segments takes 1 ms or more (p50), or if the vectorized
+lap disagrees with the loop.
+"""
+import argparse
+import time
+
+import numpy as np
+
+from race_simulator import (
+		BASE_DEGRADATION, COMPOUND_WEAR_RATE, DEGRADATION_AGE_SCALE, DEGRADATION_EXPONENT, RaceSimulator
+)
+from sector_model import (
+		COMPOUND_HEATING, COMPOUND_OPTIMAL_TEMP, HEAT_PER_LAP, TEMP_WEAR, TEMP_WINDOW, TRACK_TEMP, TYRES, SectorTyreModel
+)
+
+# Laps per stint, so wear never sits at the cap
+STINT_LAPS = 25
+TARGET_SEGMENTS = 200
+TARGET_MS = 1.0
+
+
+def loop_lap(model, compound, tyre_age):
+		# One dry lap segment by segment and tyre by tyre, for checking advance()
+		circuit = model.circuit
+		degradation = 1 + (tyre_age / DEGRADATION_AGE_SCALE) ** DEGRADATION_EXPONENT
+		lap_wear = BASE_DEGRADATION * COMPOUND_WEAR_RATE[compound] * degradation
+		gain = HEAT_PER_LAP * COMPOUND_HEATING[compound]
+		wear = model.wear.tolist()
+		temp = model.temp.tolist()
+		for segment in range(circuit.segments):
+				cooling = float(circuit.cooling[segment])
+				for tyre in range(len(TYRES)):
+						temp[tyre] = ((1 - cooling) * temp[tyre] + gain * float(circuit.heating[segment, tyre])
+													+ cooling * TRACK_TEMP)
+						off_window = ((temp[tyre] - COMPOUND_OPTIMAL_TEMP[compound]) / TEMP_WINDOW) ** 2
+						wear[tyre] += lap_wear * float(circuit.work[segment, tyre]) * (1 + TEMP_WEAR * off_window)
+		return np.minimum(100.0, wear), np.array(temp)
+
+
+def time_laps(sim, laps):
+		samples = []
+		for lap in range(laps):
+				if lap and lap % STINT_LAPS == 0:
+						sim.pit_stop("Medium")
+				start = time.perf_counter()
+				sim.simulate_lap()
+				samples.append(time.perf_counter() - start)
+		return np.array(samples) * 1e3
+
+
+def main():
+		parser = argparse.ArgumentParser(description=__doc__)
+		parser.add_argument('--segments', type=int, nargs='+', default=[50, TARGET_SEGMENTS, 1000])
+		parser.add_argument('--laps', type=int, default=500)
+		parser.add_argument('--field', type=int, default=0)
+		args = parser.parse_args()
+		field_size = args.field or None
+
+		def new_sim(segments=None):
+				sim = RaceSimulator(seed=1, field_size=field_size, sector_segments=segments)
+				sim.total_laps = args.laps
+				return sim
+
+		time_laps(new_sim(TARGET_SEGMENTS), 10)
+		aggregate = np.median(time_laps(new_sim(), args.laps))
+		print(f"aggregate tyre   p50 {aggregate:7.3f} ms/lap")
+		target = None
+		for segments in args.segments:
+				samples = time_laps(new_sim(segments), args.laps)
+				p50, p99 = np.percentile(samples, [50, 99])
+				if segments == TARGET_SEGMENTS:
+						target = p50
+
+				model = SectorTyreModel(segments)
+				for age in range(1, 6):
+						model.advance(1, age, False)
+				expected_wear, expected_temp = loop_lap(model, 1, 6)
+				start = time.perf_counter()
+				loop_lap(model, 1, 6)
+				loop_ms = (time.perf_counter() - start) * 1e3
+				model.advance(1, 6, False)
+				assert np.allclose(model.wear, expected_wear) and np.allclose(model.temp, expected_temp), segments
+
+				print(f"{segments:>5} segments   p50 {p50:7.3f} ms/lap  p99 {p99:7.3f} ms/lap  "
+							f"(+{p50 - aggregate:.3f} ms over aggregate; Python loop {loop_ms:.2f} ms)")
+		print("vectorized laps match the segment loop")
+		if target is not None:
+				assert target < TARGET_MS, f"{TARGET_SEGMENTS} segments: {target:.3f} ms/lap"
+				print(f"{TARGET_SEGMENTS} segments under {TARGET_MS:g} ms/lap")
+
+
+if __name__ == '__main__':
+		main()
@@ -0,0 +1,101 @@
+"""Startup cost: simulator core import, dashboard module load, create_app() and the
+first layout and callback requests, each run in a fresh interpreter.
+
+    python -m benchmarks.startup [--runs 5]
+
+Fails if importing the core or the dashboard module loads Dash or Plotly.
+"""
+import argparse
+import json
+import os
+import subprocess
+import sys
+import tempfile
+
+import numpy as np
+
+from benchmarks import REPO_ROOT
+
+# Modules only the web app should need
+HEAVY_MODULES = ('dash', 'plotly', 'dash_bootstrap_components', 'pandas', 'flask')
+
+STAGES = ('core_import', 'module_load', 'create_app', 'first_layout', 'first_callback')
+
+# Runs in the child interpreter and prints one JSON line of stage timings
+CHILD = """
+import json, sys, time
+heavy = %r
+
+def loaded():
+		return sorted(name for name in heavy if name in sys.modules)
+
+timings = {}
+start = time.perf_counter()
+import race_simulator, prediction, session_store, strategy_cache, race_clock, telemetry_ingest
+import downsample, race_history, rolling_stats, metrics, strategy_optimizer
+timings['core_import'] = time.perf_counter() - start
+after_core = loaded()
+
+from benchmarks import load_dashboard
+start = time.perf_counter()
+dashboard = load_dashboard()
+timings['module_load'] = time.perf_counter() - start
+after_module = loaded()
+
+start = time.perf_counter()
+app = dashboard.create_app()
+timings['create_app'] = time.perf_counter() - start
+
+client = app.server.test_client()
+start = time.perf_counter()
+response = client.get('/_dash-layout')
+timings['first_layout'] = time.perf_counter() - start
+assert response.status_code == 200, response.status_code
+
+session_id = dashboard.sessions.create()
+state = dashboard.sessions.client_state(dashboard.sessions.get(session_id))
+outputs = [('panel-state', 'data'), ('lap-times-chart', 'figure'), ('tyre-wear-chart', 'figure'),
+					 ('chart-cursor', 'data')]
+body = {
+		'output': '..' + '...'.join(f'{id}.{prop}' for id, prop in outputs) + '..',
+		'outputs': [{'id': id, 'property': prop} for id, prop in outputs],
+		'inputs': [{'id': 'simulator-state', 'property': 'data', 'value': state}],
+		'state': [{'id': 'chart-cursor', 'property': 'data', 'value': None}],
+		'changedPropIds': ['simulator-state.data']
+}
+start = time.perf_counter()
+response = client.post('/_dash-update-component', json=body)
+timings['first_callback'] = time.perf_counter() - start
+assert response.status_code == 200, response.status_code
+
+print(json.dumps({'timings': timings, 'after_core': after_core, 'after_module': after_module}))
+""" % (HEAVY_MODULES,)
+
+
+def run_child(env):
+		result = subprocess.run([sys.executable, '-c', CHILD], cwd=REPO_ROOT, env=env,
+														capture_output=True, text=True, check=True)
+		return json.loads(result.stdout.strip().splitlines()[-1])
+
+
+def main():
+		parser = argparse.ArgumentParser(description=__doc__)
+		parser.add_argument('--runs', type=int, default=5)
+		args = parser.parse_args()
+
+		with tempfile.TemporaryDirectory() as directory:
+				env = dict(os.environ, APEXMIND_HISTORY_DB=os.path.join(directory, 'history.sqlite'))
+				env.pop('APEXMIND_TELEMETRY_SOURCE', None)
+				runs = [run_child(env) for _ in range(args.runs)]
+
+		for run in runs:
+				assert not run['after_core'], f"core import loaded {run['after_core']}"
+				assert not run['after_module'], f"dashboard module loaded {run['after_module']}"
+		for stage in STAGES:
+				samples = np.array([run['timings'][stage] for run in runs]) * 1000
+				print(f"{stage:<15} median {np.median(samples):8.1f} ms  min {samples.min():8.1f} ms")
+		print(f"core import and dashboard module load without {', '.join(HEAVY_MODULES)}")
+
+
+if __name__ == '__main__':
+		main()
@@ -0,0 +1,82 @@
+"""Pit strategy optimizer: cold solve, per-lap re-solve, and a brute-force check.
+
+    python -m benchmarks.strategy [--laps 50] [--races 20]
+"""
+import argparse
+import time
+
+import numpy as np
+
+from race_simulator import COMPOUNDS, PIT_LOSS, RaceSimulator
+from strategy_optimizer import StrategyOptimizer
+
+# Lap noise at its mean, so a plan's race time is its expected race time
+MEAN_NOISE = [0.0, 0.0, 2.0, 1.8, 0.0]
+
+
+def plan_time(start, stops):
+		# Expected time to the flag with the given {lap: compound} stops
+		sim = RaceSimulator.from_dict(start.to_dict())
+		total = 0.0
+		while sim.lap < sim.total_laps:
+				if sim.lap in stops:
+						sim.pit_stop(stops[sim.lap])
+						total += PIT_LOSS
+				total += sim._advance_lap(MEAN_NOISE)
+		return total
+
+
+def brute_force(start):
+		# Every plan of up to two stops
+		best = plan_time(start, {})
+		laps = range(start.lap, start.total_laps)
+		for first in laps:
+				for first_compound in COMPOUNDS:
+						best = min(best, plan_time(start, {first: first_compound}))
+						for second in range(first + 1, start.total_laps):
+								for second_compound in COMPOUNDS:
+										best = min(best, plan_time(start, {first: first_compound, second: second_compound}))
+		return best
+
+
+def main():
+		parser = argparse.ArgumentParser(description=__doc__)
+		parser.add_argument('--laps', type=int, default=50)
+		parser.add_argument('--races', type=int, default=20)
+		args = parser.parse_args()
+
+		cold, warm = [], []
+		for seed in range(args.races):
+				optimizer = StrategyOptimizer()
+				sim = RaceSimulator(seed=seed)
+				sim.total_laps = args.laps
+				start = time.perf_counter()
+				optimizer.optimize(sim)
+				cold.append(time.perf_counter() - start)
+				while sim.lap < sim.total_laps - 1:
+						sim.simulate_lap()
+						if sim.lap == args.laps // 3:
+								sim.pit_stop("Hard")
+						start = time.perf_counter()
+						optimizer.optimize(sim)
+						warm.append(time.perf_counter() - start)
+		cold_p50, cold_p99 = np.percentile(np.array(cold) * 1000, [50, 99])
+		warm_p50, warm_p99 = np.percentile(np.array(warm) * 1000, [50, 99])
+		print(f"cold solve:     p50 {cold_p50:.3f} ms  p99 {cold_p99:.3f} ms")
+		print(f"per-lap solve:  p50 {warm_p50:.3f} ms  p99 {warm_p99:.3f} ms")
+
+		# Short races keep the exhaustive search quick
+		for seed, laps_run, wet in ((1, 10, False), (2, 20, False), (3, 5, True)):
+				sim = RaceSimulator(seed=seed)
+				sim.total_laps = 30
+				for _ in range(laps_run):
+						sim.simulate_lap()
+				if wet:
+						sim.set_conditions("Wet", False)
+				plan = StrategyOptimizer().optimize(sim)
+				assert np.isclose(plan['expected_time'], brute_force(sim)), seed
+		print("optimal plans match an exhaustive search of two-stop plans")
+
+
+if __name__ == '__main__':
+		main()
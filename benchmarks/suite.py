@@ -0,0 +1,193 @@
+"""Headless micro-benchmarks for the simulator and the Dash callback bodies.
+
+		python -m benchmarks.suite [--laps 50 500 5000] [--output bench_suite.json]
+														   [--compare previous.json] [--threshold 0.2]
+
+Each case runs against a race already advanced to the given length and reports
+ops/sec, p50/p95/p99 latency and peak allocation per call (tracemalloc).
+With --compare, cases whose p50 grew by more than --threshold are flagged and
+the exit status is 1.
+"""
+import argparse
+import json
+import platform
+import subprocess
+import sys
+import time
+import tracemalloc
+
+import numpy as np
+
+from benchmarks import REPO_ROOT, load_dashboard, temporary_history
+from race_simulator import RaceSimulator
+
+RACE_LENGTHS = (50, 500, 5000)
+
+
+def prepare(dashboard, laps):
+		# A session that has already run `laps` laps, with room to keep going
+		session_id = dashboard.sessions.create(dashboard.sessions.factory(seed=laps))
+		entry = dashboard.sessions.get(session_id)
+		sim = entry.simulator
+		sim.total_laps = laps * 100
+		for lap in range(laps):
+				if lap and lap % 25 == 0:
+						sim.pit_stop("Hard")
+				sim.simulate_lap()
+		return entry
+
+
+def bench_update_displays(dashboard, entry):
+		client_state = dashboard.sessions.client_state(entry)
+
+		def update_displays():
+				# Fresh state every tick in real use, so measure uncached
+				dashboard.strategy_cache.clear()
+				dashboard.update_displays(client_state, None)
+
+		return update_displays
+
+
+def bench_from_dict(dashboard, entry):
+		snapshot = entry.simulator.to_dict()
+		return lambda: RaceSimulator.from_dict(snapshot)
+
+
+def bench_update_simulator(dashboard, entry):
+		return lambda: dashboard.apply_action(entry, 'next-lap-btn', 'Dry', [])
+
+
+def bench_update_chat(dashboard, entry):
+		client_state = dashboard.sessions.client_state(entry)
+		return lambda: dashboard.update_chat(1, 'pit or stay out? pace?', [], client_state)
+
+
+# name, whether each call adds a lap, builder(dashboard, entry) -> callable
+CASES = (
+		('simulate_lap', True, lambda dashboard, entry: entry.simulator.simulate_lap),
+		('predict_future_performance', False, lambda dashboard, entry: entry.simulator.predict_future_performance),
+		('ai_strategy_recommendation', False, lambda dashboard, entry: entry.simulator.ai_strategy_recommendation),
+		('to_dict', False, lambda dashboard, entry: entry.simulator.to_dict),
+		('from_dict', False, bench_from_dict),
+		('update_simulator', True, bench_update_simulator),
+		('update_displays', False, bench_update_displays),
+		('update_chat', False, bench_update_chat),
+)
+
+
+def time_case(func, min_time=0.3, min_calls=20, max_calls=20000):
+		func()
+		samples = []
+		deadline = time.perf_counter() + min_time
+		while len(samples) < max_calls and (len(samples) < min_calls or time.perf_counter() < deadline):
+				start = time.perf_counter_ns()
+				func()
+				samples.append(time.perf_counter_ns() - start)
+		samples = np.array(samples) / 1000.0
+		p50, p95, p99 = np.percentile(samples, [50, 95, 99])
+		return {
+				'calls': len(samples),
+				'ops_per_sec': len(samples) / (samples.sum() / 1e6),
+				'p50_us': p50,
+				'p95_us': p95,
+				'p99_us': p99
+		}
+
+
+def peak_alloc(func, calls=5):
+		tracemalloc.start()
+		try:
+				peaks = []
+				for _ in range(calls):
+						tracemalloc.reset_peak()
+						base = tracemalloc.get_traced_memory()[0]
+						func()
+						peaks.append(tracemalloc.get_traced_memory()[1] - base)
+		finally:
+				tracemalloc.stop()
+		return max(peaks) / 1024
+
+
+def run_suite(race_lengths):
+		dashboard = load_dashboard()
+		with temporary_history(dashboard):
+				return run_cases(dashboard, race_lengths)
+
+
+def run_cases(dashboard, race_lengths):
+		results = []
+		for laps in race_lengths:
+				for name, adds_laps, builder in CASES:
+						# Each case gets its own race; cases that add laps are capped so the
+						# race stays close to the requested length
+						entry = prepare(dashboard, laps)
+						func = builder(dashboard, entry)
+						result = {'case': name, 'laps': laps}
+						result.update(time_case(func, max_calls=max(100, laps // 5) if adds_laps else 20000))
+						result['peak_alloc_kib'] = peak_alloc(func)
+						results.append(result)
+						dashboard.sessions.discard(entry.session_id)
+						print(f"{name:<28} {laps:>5} laps  {result['ops_per_sec']:>10,.0f} ops/s  "
+								  f"p50 {result['p50_us']:>9.1f} us  p95 {result['p95_us']:>9.1f} us  "
+								  f"p99 {result['p99_us']:>9.1f} us  alloc {result['peak_alloc_kib']:>8.1f} KiB")
+		return results
+
+
+def git_revision():
+		try:
+				return subprocess.check_output(['git', 'rev-parse', '--short', 'HEAD'], cwd=REPO_ROOT,
+																		   stderr=subprocess.DEVNULL, text=True).strip()
+		except (OSError, subprocess.CalledProcessError):
+				return None
+
+
+def compare(results, baseline, threshold):
+		# Cases whose p50 latency grew by more than `threshold` (fraction)
+		previous = {(r['case'], r['laps']): r for r in baseline['results']}
+		regressions = []
+		for result in results:
+				old = previous.get((result['case'], result['laps']))
+				if old is None:
+						continue
+				change = result['p50_us'] / old['p50_us'] - 1
+				if change > threshold:
+						regressions.append((result['case'], result['laps'], old['p50_us'], result['p50_us'], change))
+		return regressions
+
+
+def main():
+		parser = argparse.ArgumentParser(description=__doc__, formatter_class=argparse.RawDescriptionHelpFormatter)
+		parser.add_argument('--laps', type=int, nargs='+', default=list(RACE_LENGTHS))
+		parser.add_argument('--output', default='bench_suite.json')
+		parser.add_argument('--compare')
+		parser.add_argument('--threshold', type=float, default=0.2)
+		args = parser.parse_args()
+
+		results = run_suite(args.laps)
+		report = {
+				'meta': {
+						'timestamp': time.strftime('%Y-%m-%dT%H:%M:%S'),
+						'revision': git_revision(),
+						'python': platform.python_version(),
+						'numpy': np.__version__,
+						'machine': platform.machine()
+				},
+				'results': results
+		}
+		with open(args.output, 'w') as f:
+				json.dump(report, f, indent=2)
+		print(f"results written to {args.output}")
+
+		if args.compare:
+				with open(args.compare) as f:
+						baseline = json.load(f)
+				regressions = compare(results, baseline, args.threshold)
+				for case, laps, old, new, change in regressions:
+						print(f"REGRESSION {case} @ {laps} laps: p50 {old:.1f} -> {new:.1f} us (+{change:.0%})")
+				if regressions:
+						sys.exit(1)
+				print(f"no regressions over {args.threshold:.0%} against {args.compare}")
+
+
+if __name__ == '__main__':
+		main()
@@ -0,0 +1,47 @@
+"""Scenario sweep throughput: serial against the process pool, then fully cached.
+
+    python -m benchmarks.sweep [--seeds 10] [--laps 50] [--field 20] [--workers N]
+"""
+import argparse
+import os
+import tempfile
+
+from scenario_sweep import ScenarioSweep, SweepCache, scenario_grid
+
+
+def main():
+		parser = argparse.ArgumentParser(description=__doc__)
+		parser.add_argument('--seeds', type=int, default=10)
+		parser.add_argument('--laps', type=int, default=50)
+		parser.add_argument('--field', type=int, default=20)
+		parser.add_argument('--workers', type=int, default=os.cpu_count())
+		args = parser.parse_args()
+
+		scenarios = scenario_grid(rain=[None, (20, 35), (30, args.laps)], safety_car=[None, 10, 20, 30],
+															pit_laps=list(range(15, 36, 5)), compounds=["Medium", "Hard"])
+		seeds = range(args.seeds)
+		field_size = args.field or None
+
+		serial = ScenarioSweep(args.laps, field_size, workers=1)
+		serial_rows = serial.run(scenarios, seeds)
+		with tempfile.TemporaryDirectory() as directory:
+				cache = SweepCache(os.path.join(directory, 'sweep.sqlite'))
+				pooled = ScenarioSweep(args.laps, field_size, workers=args.workers, cache=cache)
+				pooled_rows = pooled.run(scenarios, seeds)
+				first = pooled.last
+				cached_rows = pooled.run(scenarios, seeds)
+				cache.close()
+
+		rollouts = serial.last['rollouts']
+		print(f"{len(scenarios)} scenarios x {args.seeds} seeds = {rollouts} rollouts of {args.laps} laps")
+		print(f"serial:          {serial.last['seconds']:7.2f} s  {rollouts / serial.last['seconds']:8,.0f} rollouts/s")
+		print(f"{f'{args.workers} workers:':<16} {first['seconds']:7.2f} s  "
+					f"{rollouts / first['seconds']:8,.0f} rollouts/s  "
+					f"(x{serial.last['seconds'] / first['seconds']:.1f}, includes cache writes)")
+		print(f"cached:          {pooled.last['seconds']:7.2f} s  {pooled.last['cached']} of {rollouts} from cache")
+		assert pooled_rows == serial_rows == cached_rows
+		print("pooled and cached results match the serial sweep")
+
+
+if __name__ == '__main__':
+		main()
@@ -0,0 +1,78 @@
+"""Telemetry ingest throughput at 100 Hz for a 20-car field.
+
+    python -m benchmarks.telemetry [--cars 20] [--hz 100] [--laps 5] [--chunk-ms 100]
+"""
+import argparse
+import time
+
+import numpy as np
+
+from race_simulator import BASE_LAP_TIME
+from telemetry_ingest import CHANNELS, SAMPLE_DTYPE, TelemetryIngest
+
+
+def synthetic_recording(n_cars, hz, laps, seed=0):
+		# Time-ordered samples for every car; each car laps at its own pace
+		rng = np.random.default_rng(seed)
+		lap_times = BASE_LAP_TIME + rng.normal(0, 0.5, n_cars)
+		duration = laps * lap_times.min()
+		ticks = np.arange(0, duration, 1.0 / hz)
+		samples = np.zeros((len(ticks), n_cars), dtype=SAMPLE_DTYPE)
+		samples['time'] = ticks[:, None]
+		samples['car'] = np.arange(n_cars)
+		samples['lap'] = (ticks[:, None] // lap_times) + 1
+		samples['speed'] = 250 + 40 * np.sin(ticks[:, None] / 3) + rng.normal(0, 2, samples.shape)
+		samples['tyre_temp'] = 90 + rng.normal(0, 1, samples.shape)
+		samples['battery'] = 100 - ticks[:, None] / duration * 60
+		samples['fuel'] = 100 - ticks[:, None] / duration * 80
+		return samples.ravel()
+
+
+def check(ingest, recording, car, lap):
+		# Aggregates must match a direct computation over the raw samples
+		mine = recording[(recording['car'] == car) & (recording['lap'] == lap)]
+		record = ingest.lap(car, lap)
+		assert record is not None and record['samples'] == len(mine)
+		for name in CHANNELS:
+				assert np.isclose(record[name], mine[name].astype(np.float64).mean(), rtol=1e-5)
+		assert np.isclose(record['speed_max'], mine['speed'].max())
+		assert np.isclose(record['fuel_end'], mine['fuel'][-1])
+
+
+def main():
+		parser = argparse.ArgumentParser(description=__doc__)
+		parser.add_argument('--cars', type=int, default=20)
+		parser.add_argument('--hz', type=float, default=100)
+		parser.add_argument('--laps', type=int, default=5)
+		parser.add_argument('--chunk-ms', type=float, default=100)
+		args = parser.parse_args()
+
+		recording = synthetic_recording(args.cars, args.hz, args.laps)
+		chunk = max(1, int(args.cars * args.hz * args.chunk_ms / 1000))
+		ingest = TelemetryIngest(n_cars=args.cars)
+		size_before = ingest.nbytes
+
+		latencies = []
+		start = time.perf_counter()
+		for offset in range(0, len(recording), chunk):
+				t0 = time.perf_counter()
+				ingest.ingest(recording[offset:offset + chunk])
+				latencies.append(time.perf_counter() - t0)
+		elapsed = time.perf_counter() - start
+
+		rate = len(recording) / elapsed
+		needed = args.cars * args.hz
+		p50, p99 = np.percentile(np.array(latencies) * 1000, [50, 99])
+		print(f"samples:        {len(recording):,} ({args.cars} cars x {args.hz:g} Hz, {args.laps} laps)")
+		print(f"chunk:          {chunk} samples ({args.chunk_ms:g} ms of data)")
+		print(f"ingest rate:    {rate:,.0f} samples/s  ({rate / needed:,.0f}x the {needed:,.0f}/s needed)")
+		print(f"chunk latency:  p50 {p50:.3f} ms  p99 {p99:.3f} ms")
+		print(f"memory:         {size_before / 1024:,.0f} KiB before, {ingest.nbytes / 1024:,.0f} KiB after")
+		for car in range(args.cars):
+				for lap in range(1, args.laps):
+						check(ingest, recording, car, lap)
+		print("lap aggregates match the raw samples")
+
+
+if __name__ == '__main__':
+		main()
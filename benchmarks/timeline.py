@@ -0,0 +1,100 @@
+"""Timeline seeks: restoring a lap from the nearest checkpoint against replaying
+the whole event log, and fast-forwarding to the flag.
+
+		python -m benchmarks.timeline [--laps 50] [--field 20] [--interval 5] [--repeat 20]
+
+Every restored lap is checked against the state the live session had on it.
+"""
+import argparse
+import json
+import time
+
+import numpy as np
+
+from event_log import EventLog
+from race_simulator import RaceSimulator
+from race_timeline import CHECKPOINT_LAPS, RaceTimeline
+
+
+def state(sim):
+		# Comparable form of a session. The field's wear anchors are left out: the
+		# player's row is only re-tabulated on restore, and the player's wear
+		# always comes from its own RaceSimulator
+		data = sim.to_dict()
+		if data.get('field'):
+				data['field'] = dict(data['field'], anchor_wear=None)
+		return json.dumps(data, default=str, sort_keys=True)
+
+
+def record_session(laps, field_size, seed=42):
+		# The replay benchmark's session (a weather change, a safety car and two
+		# stops), keeping the state at the start of every lap
+		sim = RaceSimulator(seed=seed, field_size=field_size)
+		sim.total_laps = laps
+		states = []
+		while sim.lap < laps:
+				if sim.lap == laps // 3:
+						sim.set_conditions("Wet", sim.safety_car)
+						sim.pit_stop("Intermediate")
+				if sim.lap == laps // 2:
+						sim.set_conditions("Dry", True)
+				if sim.lap == laps // 2 + 2:
+						sim.set_conditions(sim.weather, False)
+						sim.pit_stop("Hard")
+				states.append(state(sim))
+				sim.simulate_lap()
+		states.append(state(sim))
+		return sim, states
+
+
+def main():
+		parser = argparse.ArgumentParser(description=__doc__)
+		parser.add_argument('--laps', type=int, default=50)
+		parser.add_argument('--field', type=int, default=20)
+		parser.add_argument('--interval', type=int, default=CHECKPOINT_LAPS)
+		parser.add_argument('--repeat', type=int, default=20)
+		args = parser.parse_args()
+		field_size = args.field or None
+
+		live, states = record_session(args.laps, field_size)
+		start = time.perf_counter()
+		timeline = RaceTimeline(live, args.interval)
+		timeline.sync(live)
+		build = time.perf_counter() - start
+
+		mismatched = [lap for lap in range(args.laps + 1) if state(timeline.restore(lap)) != states[lap]]
+
+		seeks, replays = [], []
+		for _ in range(args.repeat):
+				for lap in range(args.laps + 1):
+						start = time.perf_counter()
+						timeline.restore(lap)
+						seeks.append(time.perf_counter() - start)
+				data = live.events.to_bytes()
+				start = time.perf_counter()
+				RaceSimulator.replay(live.seed, EventLog(data), live.total_laps, field_size)
+				replays.append(time.perf_counter() - start)
+
+		forwards = []
+		for _ in range(args.repeat):
+				sim = RaceSimulator(seed=live.seed, field_size=field_size)
+				sim.total_laps = args.laps
+				start = time.perf_counter()
+				while sim.lap < sim.total_laps:
+						sim.simulate_lap()
+				forwards.append(time.perf_counter() - start)
+
+		seek_p50, seek_p99 = np.percentile(seeks, [50, 99]) * 1e3
+		replay_p50 = np.median(replays) * 1e3
+		print(f"{args.laps} laps, field {args.field}, checkpoint every {args.interval} laps: "
+					f"{len(timeline.checkpoints)} checkpoints, {timeline.nbytes / 1024:.1f} KiB "
+					f"(built in {build * 1e3:.1f} ms)")
+		print(f"seek to any lap  p50 {seek_p50:7.2f} ms  p99 {seek_p99:7.2f} ms")
+		print(f"full replay      p50 {replay_p50:7.2f} ms  (x{replay_p50 / seek_p50:.1f} the p50 seek)")
+		print(f"lap 0 to flag    p50 {np.median(forwards) * 1e3:7.2f} ms")
+		assert not mismatched, f"restored laps differ from the live session: {mismatched}"
+		print(f"all {args.laps + 1} restored laps match the live session")
+
+
+if __name__ == '__main__':
+		main()
@@ -0,0 +1,130 @@
+# Online estimate of per-lap tyre wear for each (compound, weather), fitted as
+#
+#     wear added on a lap = intercept + slope * (tyre_age / age_scale) ** exponent
+#
+# by recursive least squares with exponential forgetting. Each lap is an O(1)
+# update of a 2x2 problem, so the model is never refitted from history.
+
+PRIOR_VARIANCE = 1.0
+# Coefficients are rounded to this in fit_key, for caches shared between sessions
+COEFFICIENT_STEP = 0.01
+
+
+class RecursiveLeastSquares:
+		__slots__ = ('intercept', 'slope', 'p00', 'p01', 'p11', 'forgetting', 'updates')
+
+		def __init__(self, intercept, slope, variance=PRIOR_VARIANCE, forgetting=0.99):
+				self.intercept = intercept
+				self.slope = slope
+				# Covariance of (intercept, slope), symmetric
+				self.p00 = variance
+				self.p01 = 0.0
+				self.p11 = variance
+				self.forgetting = forgetting
+				self.updates = 0
+
+		def predict(self, feature):
+				return self.intercept + self.slope * feature
+
+		def update(self, feature, target):
+				# Features are (1, feature); plain floats are much cheaper than numpy at 2x2
+				p0 = self.p00 + self.p01 * feature
+				p1 = self.p01 + self.p11 * feature
+				gain_denominator = self.forgetting + p0 + p1 * feature
+				k0 = p0 / gain_denominator
+				k1 = p1 / gain_denominator
+				error = target - (self.intercept + self.slope * feature)
+				self.intercept += k0 * error
+				self.slope += k1 * error
+				scale = 1.0 / self.forgetting
+				self.p00 = (self.p00 - k0 * p0) * scale
+				self.p01 = (self.p01 - k0 * p1) * scale
+				self.p11 = (self.p11 - k1 * p1) * scale
+				self.updates += 1
+
+		def to_list(self):
+				return [self.intercept, self.slope, self.p00, self.p01, self.p11, self.updates]
+
+		@staticmethod
+		def from_list(values, forgetting):
+				rls = RecursiveLeastSquares(values[0], values[1], forgetting=forgetting)
+				rls.p00, rls.p01, rls.p11, updates = values[2:]
+				rls.updates = int(updates)
+				return rls
+
+
+# One estimator per (compound, wet), created on first use from `prior(compound,
+# wet)` -> (intercept, slope). `version` counts updates so callers can key
+# caches on it; caches shared between sessions key on fit_key instead, since
+# two sessions can reach the same count with different fits.
+class DegradationModel:
+		def __init__(self, prior, age_scale=15, exponent=1.5, forgetting=0.99):
+				self.prior = prior
+				self.age_scale = age_scale
+				self.exponent = exponent
+				self.forgetting = forgetting
+				self.estimators = {}
+				self.version = 0
+
+		def feature(self, tyre_age):
+				return (tyre_age / self.age_scale) ** self.exponent
+
+		def estimator(self, compound, wet):
+				key = (compound, bool(wet))
+				estimator = self.estimators.get(key)
+				if estimator is None:
+						estimator = RecursiveLeastSquares(*self.prior(compound, wet), forgetting=self.forgetting)
+						self.estimators[key] = estimator
+				return estimator
+
+		def coefficients(self, compound, wet):
+				# (intercept, slope) without creating an estimator for an unseen key
+				estimator = self.estimators.get((compound, bool(wet)))
+				if estimator is None:
+						return self.prior(compound, wet)
+				return estimator.intercept, estimator.slope
+
+		def fit_key(self, compounds, wet):
+				# The fits for `compounds` in the given weather, rounded to COEFFICIENT_STEP
+				return tuple(round(value / COEFFICIENT_STEP) for compound in compounds
+										 for value in self.coefficients(compound, wet))
+
+		def update(self, compound, wet, tyre_age, wear_added):
+				self.estimator(compound, wet).update(self.feature(tyre_age), wear_added)
+				self.version += 1
+
+		def wear_rate(self, compound, wet, tyre_age):
+				return self.estimator(compound, wet).predict(self.feature(tyre_age))
+
+		def project(self, wear, tyre_age, compound, wet, laps):
+				# Expected wear after each of the next `laps` laps
+				estimator = self.estimator(compound, wet)
+				path = []
+				for i in range(1, laps + 1):
+						wear = min(100.0, wear + estimator.predict(self.feature(tyre_age + i)))
+						path.append(wear)
+				return path
+
+		def laps_until(self, wear, tyre_age, compound, wet, threshold, limit=100):
+				# Laps until wear reaches threshold, capped at limit
+				estimator = self.estimator(compound, wet)
+				for i in range(1, limit + 1):
+						wear += estimator.predict(self.feature(tyre_age + i))
+						if wear >= threshold:
+								return i
+				return limit
+
+		def to_dict(self):
+				return {
+						'version': self.version,
+						'estimators': [[compound, wet] + estimator.to_list()
+													 for (compound, wet), estimator in self.estimators.items()]
+				}
+
+		def load(self, data):
+				self.version = data['version']
+				self.estimators = {
+						(row[0], bool(row[1])): RecursiveLeastSquares.from_list(row[2:], self.forgetting)
+						for row in data['estimators']
+				}
+				return self
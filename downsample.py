@@ -0,0 +1,84 @@
+import numpy as np
+
+
+# Incremental min/max decimation of one growing series. Points are grouped
+# into fixed-width buckets and each closed bucket keeps its minimum and
+# maximum, so spikes survive; `forced` points (e.g. stint boundaries) and the
+# first point are always kept. When the closed buckets outgrow max_points the
+# bucket width doubles and the buckets are rebuilt, so the output stays within
+# about max_points however long the series gets.
+#
+# Output is split into the closed part, which only grows while the width is
+# unchanged, and the tail: the open bucket plus the last closed point, which
+# changes every update.
+class MinMaxDecimator:
+		def __init__(self, max_points=800):
+				self.max_buckets = max(1, max_points // 2)
+				self.reset()
+
+		def reset(self):
+				self.width = 1
+				self.seen = 0
+				self.closed_end = 0
+				self.min_index = np.empty(0, dtype=np.int64)
+				self.max_index = np.empty(0, dtype=np.int64)
+				self.forced = np.empty(0, dtype=np.int64)
+				self._closed = None
+
+		def update(self, values, forced=None):
+				# values is the whole series so far; only points after the last call are read
+				n = len(values)
+				if n < self.seen:
+						# The series was cut back; start over
+						self.reset()
+				if forced is not None and n > self.seen:
+						new = np.flatnonzero(forced[self.seen:n]) + self.seen
+						if len(new):
+								# Keep the point before each break as well as the break itself
+								new = np.unique(np.concatenate([np.maximum(new - 1, 0), new]))
+								self.forced = np.union1d(self.forced, new)
+								self._closed = None
+				self.seen = n
+
+				closed_end = n // self.width * self.width
+				if closed_end > self.closed_end:
+						self._add_buckets(values, self.closed_end, closed_end)
+				while len(self.min_index) > self.max_buckets:
+						self.width *= 2
+						self.closed_end = 0
+						self.min_index = self.max_index = np.empty(0, dtype=np.int64)
+						self._add_buckets(values, 0, n // self.width * self.width)
+
+		def _add_buckets(self, values, start, end):
+				buckets = np.asarray(values[start:end]).reshape(-1, self.width)
+				offsets = start + np.arange(len(buckets)) * self.width
+				self.min_index = np.concatenate([self.min_index, offsets + buckets.argmin(axis=1)])
+				self.max_index = np.concatenate([self.max_index, offsets + buckets.argmax(axis=1)])
+				self.closed_end = end
+				self._closed = None
+
+		def closed(self):
+				# Sorted indices kept from the closed buckets
+				if self._closed is None:
+						forced = self.forced[self.forced < self.closed_end]
+						first = [0] if self.closed_end else []
+						self._closed = np.unique(np.concatenate([first, self.min_index, self.max_index, forced]))
+				return self._closed
+
+		def tail(self, values):
+				# Indices for the open bucket, joined to the last closed point
+				n = self.seen
+				if n == self.closed_end:
+						return self.closed()[-1:] if n else np.empty(0, dtype=np.int64)
+				start = self.closed_end
+				open_part = np.asarray(values[start:n])
+				kept = [start + open_part.argmin(), start + open_part.argmax(), n - 1]
+				kept.extend(self.forced[self.forced >= start].tolist())
+				if start:
+						kept.append(self.closed()[-1])
+				else:
+						kept.append(0)
+				return np.unique(np.array(kept, dtype=np.int64))
+
+		def indices(self, values):
+				return np.union1d(self.closed(), self.tail(values))
@@ -0,0 +1,42 @@
+# Compact append-only log of race actions: two bytes per event (opcode, argument)
+LAP = 0
+PIT = 1           # argument: compound code
+WEATHER = 2       # argument: 1 wet, 0 dry
+SAFETY_CAR = 3    # argument: 1 deployed, 0 clear
+RESET = 4
+
+EVENT_NAMES = ('LAP', 'PIT', 'WEATHER', 'SAFETY_CAR', 'RESET')
+
+
+class EventLog:
+		__slots__ = ('_data',)
+
+		def __init__(self, data=b''):
+				self._data = bytearray(data)
+
+		def __len__(self):
+				return len(self._data) // 2
+
+		def __iter__(self):
+				data = self._data
+				return zip(data[0::2], data[1::2])
+
+		def __eq__(self, other):
+				return isinstance(other, EventLog) and self._data == other._data
+
+		def append(self, op, arg=0):
+				self._data.append(op)
+				self._data.append(arg)
+
+		def truncate(self, length):
+				del self._data[length * 2:]
+
+		def to_bytes(self):
+				return bytes(self._data)
+
+		@staticmethod
+		def from_bytes(data):
+				return EventLog(data)
+
+		def describe(self):
+				return [(EVENT_NAMES[op], arg) for op, arg in self]
@@ -0,0 +1,308 @@
+import numpy as np
+
+from race_simulator import (
+		COMPOUNDS, COMPOUND_CODES, BASE_DEGRADATION, DEGRADATION_AGE_SCALE, DEGRADATION_EXPONENT,
+		WET_WEAR_PENALTY, BASE_LAP_TIME, WEAR_TIME_PENALTY, PIT_LOSS, LAP_NOISE_LOW, LAP_NOISE_SPAN,
+		SAFETY_CAR_GAP_FACTOR
+)
+from batch_simulator import WEAR_RATE_BY_CODE, DRY_PACE_BY_CODE, WET_PENALTY_BY_CODE
+
+FIELD_SIZE = 20
+# Seconds between grid slots when the race starts
+GRID_GAP = 0.25
+# Spread of per-car pace (s/lap) around the baseline car
+DRIVER_PACE_SIGMA = 0.3
+# Stop slots per car; widened if a car stops more often than this
+STOP_SLOTS = 4
+# Laps tabulated ahead at a time
+TABLE_LAPS = 64
+# Rivals bring a planned stop forward by up to this many laps under a safety car
+SAFETY_CAR_WINDOW = 5
+SLICK_BY_CODE = np.array([True, True, True, False, False])
+NO_STOP = np.inf
+
+FIELD_ARRAYS = ('pace', 'race_time', 'last_lap_time', 'stop_laps', 'stint_compounds',
+								'anchor_lap', 'anchor_wear')
+
+
+# Every car in the race advanced together, one NumPy step per lap. The player
+# car (index `player`) takes its lap time and tyres from a RaceSimulator; the
+# rivals run the same lap model with their own pace offset and pit plan.
+# Positions and gaps come from cumulative race time.
+#
+# Each car has a schedule of stop laps (a stop at lap p adds the pit loss after
+# lap p; new tyres from lap p+1) and the compound for every stint. With the
+# schedule and weather fixed, rival wear and lap times are known ahead, so they
+# are tabulated for the next TABLE_LAPS laps (rows) and every car (columns)
+# whenever either changes or the table runs out, and a lap is one table row
+# plus noise. Wear in a stint runs on from an anchor: the
+# stint start, or the lap of the last weather change.
+class FieldSimulator:
+		def __init__(self, n_cars=FIELD_SIZE, total_laps=50, player=2, seed=None):
+				self.n_cars = n_cars
+				self.total_laps = total_laps
+				self.player = player
+				self.rng = np.random.default_rng(seed)
+				self.lap = 0
+				self.wet = False
+				self.cars = np.arange(n_cars)
+
+				# Grid order follows pace; the player's own model sets its pace
+				self.pace = np.sort(self.rng.normal(0.0, DRIVER_PACE_SIGMA, n_cars))
+				self.pace[player] = 0.0
+				self.race_time = self.cars * GRID_GAP
+				self.last_lap_time = np.zeros(n_cars)
+				self.anchor_lap = np.zeros(n_cars, dtype=np.int32)
+				self.anchor_wear = np.zeros(n_cars)
+				self.cumulative_degradation = np.zeros(1)
+				self._plan_strategies()
+				self._tabulate()
+
+		def _plan_strategies(self):
+				# One- or two-stop plans with some spread in the stop laps
+				n = self.n_cars
+				start = self.rng.choice(3, n, p=[0.3, 0.5, 0.2])
+				two_stop = self.rng.random(n) < 0.4
+				one_stop_lap = self.total_laps * 0.5 + self.rng.normal(0, 3, n)
+				self.stop_laps = np.full((n, STOP_SLOTS), NO_STOP)
+				self.stop_laps[:, 0] = np.where(two_stop, self.total_laps / 3 + self.rng.normal(0, 2, n), one_stop_lap)
+				self.stop_laps[two_stop, 1] = self.total_laps * 2 / 3 + self.rng.normal(0, 2, two_stop.sum())
+				self.stop_laps = np.maximum(1, np.round(self.stop_laps))
+
+				hard, medium, soft = COMPOUND_CODES["Hard"], COMPOUND_CODES["Medium"], COMPOUND_CODES["Soft"]
+				self.stint_compounds = np.full((n, STOP_SLOTS + 1), medium, dtype=np.int8)
+				self.stint_compounds[:, 0] = start
+				self.stint_compounds[:, 1] = np.where(two_stop, medium, np.where(start == hard, medium, hard))
+				self.stint_compounds[:, 2] = soft
+
+				self.stop_laps[self.player] = NO_STOP
+				self.stint_compounds[self.player] = medium
+
+		def set_total_laps(self, total_laps):
+				# Stretch the rivals' stops still to come over a new race length,
+				# keeping each car's stops on distinct laps after the current one
+				future = self.stop_laps > self.lap
+				scaled = np.maximum(self.lap + 1, np.round(self.stop_laps * (total_laps / self.total_laps)))
+				stops = np.where(future, scaled, self.stop_laps)
+				slots = np.arange(stops.shape[1])
+				self.stop_laps = np.maximum.accumulate(stops - slots, axis=1) + slots
+				self.total_laps = total_laps
+				self._tabulate()
+
+		def _tabulate(self):
+				# Wear and lap time (pit loss included) from the current lap to
+				# TABLE_LAPS laps ahead under the current schedule and weather
+				self.table_start = self.lap
+				rows = np.arange(self.lap, self.lap + TABLE_LAPS + 1)[:, None]
+				if len(self.cumulative_degradation) <= rows[-1, 0]:
+						# Degradation multiplier summed over the first `age` laps of a stint
+						ages = np.arange(1, 2 * rows[-1, 0] + 1)
+						steps = 1 + (ages / DEGRADATION_AGE_SCALE) ** DEGRADATION_EXPONENT
+						self.cumulative_degradation = np.concatenate([[0.0], np.cumsum(steps)])
+				cars = self.cars[None, :]
+				stops_done = np.count_nonzero(self.stop_laps[None, :, :] < rows[:, :, None], axis=2)
+				starts = np.hstack([np.zeros((self.n_cars, 1)), self.stop_laps])[cars, stops_done]
+				compound = self.stint_compounds[cars, stops_done]
+
+				fresh = starts >= self.anchor_lap
+				anchor_lap = np.where(fresh, starts, self.anchor_lap)
+				anchor_wear = np.where(fresh, 0.0, self.anchor_wear)
+				ages = (rows - starts).astype(np.int64)
+				anchor_ages = (anchor_lap - starts).astype(np.int64)
+				degradation = self.cumulative_degradation[ages] - self.cumulative_degradation[anchor_ages]
+				wear = anchor_wear + BASE_DEGRADATION * WEAR_RATE_BY_CODE[compound] * degradation
+				if self.wet:
+						wear += WET_WEAR_PENALTY * (rows - anchor_lap)
+				np.minimum(wear, 100, out=wear)
+
+				penalty = WET_PENALTY_BY_CODE[compound] if self.wet else DRY_PACE_BY_CODE[compound]
+				pitting = np.count_nonzero(self.stop_laps[None, :, :] == rows[:, :, None], axis=2)
+				times = BASE_LAP_TIME + LAP_NOISE_LOW[4] + self.pace + penalty + wear * (WEAR_TIME_PENALTY / 100)
+				self.wear_table = wear
+				self.time_table = times + PIT_LOSS * pitting
+
+		def stops_done(self, lap=None):
+				lap = self.lap if lap is None else lap
+				return np.count_nonzero(self.stop_laps <= lap, axis=1)
+
+		@property
+		def pit_stops(self):
+				return self.stops_done()
+
+		@property
+		def compound(self):
+				return self.stint_compounds[self.cars, self.stops_done()]
+
+		@property
+		def tyre_age(self):
+				done = self.stops_done()
+				starts = np.where(done > 0, self.stop_laps[self.cars, np.maximum(done - 1, 0)], 0)
+				return (self.lap - starts).astype(np.int32)
+
+		@property
+		def tyre_wear(self):
+				# Wear going into the next lap; zero just after a stop
+				stopped = np.any(self.stop_laps == self.lap, axis=1)
+				return np.where(stopped, 0.0, self.wear_table[self.lap - self.table_start])
+
+		@property
+		def player_position(self):
+				return self.position_of(self.player)
+
+		def position_of(self, car):
+				return int(np.count_nonzero(self.race_time < self.race_time[car])) + 1
+
+		@property
+		def position(self):
+				positions = np.empty(self.n_cars, dtype=np.int16)
+				positions[self.order] = np.arange(1, self.n_cars + 1)
+				return positions
+
+		@property
+		def order(self):
+				return np.argsort(self.race_time, kind='stable')
+
+		@property
+		def nbytes(self):
+				arrays = sum(getattr(self, name).nbytes for name in FIELD_ARRAYS)
+				return arrays + self.wear_table.nbytes + self.time_table.nbytes
+
+		def advance(self, sim, lap_time):
+				# One lap for the whole field; `sim` is the player's RaceSimulator
+				# after its lap. Returns the player's new position.
+				wet = sim.weather == "Wet"
+				if wet != self.wet:
+						self._change_weather(wet)
+				if sim.safety_car:
+						self._safety_car_stops()
+				if self.lap >= self.table_start + TABLE_LAPS:
+						self._tabulate()
+
+				self.lap += 1
+				row = self.time_table[self.lap - self.table_start]
+				times = row + LAP_NOISE_SPAN[4] * self.rng.random(self.n_cars)
+				times[self.player] = lap_time
+				self.last_lap_time = times
+				self.race_time += times
+				if sim.safety_car:
+						# The field bunches up behind the safety car
+						leader = self.race_time.min()
+						self.race_time = leader + (self.race_time - leader) * SAFETY_CAR_GAP_FACTOR
+				return self.player_position
+
+		def _change_weather(self, wet):
+				# Every stint carries on from its current wear under the new conditions;
+				# rivals on the wrong tyres stop at the end of the coming lap
+				self.anchor_wear = self.tyre_wear
+				self.anchor_lap[:] = self.lap
+				stop_lap = self.lap + 1
+				done = self.stops_done()
+				wrong_tyres = SLICK_BY_CODE[self.stint_compounds[self.cars, done]] == wet
+				wrong_tyres[self.player] = False
+				for car in np.flatnonzero(wrong_tyres).tolist():
+						if wet:
+								new_compound = COMPOUND_CODES["Intermediate"]
+						elif self.stop_laps[car, done[car]] != NO_STOP:
+								# Dry again: the compound planned for the next stint
+								new_compound = self.stint_compounds[car, done[car] + 1]
+						else:
+								new_compound = COMPOUND_CODES["Medium"]
+						self._insert_stop(car, stop_lap, new_compound)
+				self.wet = wet
+				self._tabulate()
+
+		def _safety_car_stops(self):
+				# Planned stops due within the window are taken under the safety car
+				done = self.stops_done()
+				upcoming = self.stop_laps[self.cars, np.minimum(done, self.stop_laps.shape[1] - 1)]
+				stop_lap = self.lap + 1
+				bring_forward = (upcoming > stop_lap) & (upcoming <= stop_lap + SAFETY_CAR_WINDOW)
+				bring_forward[self.player] = False
+				if bring_forward.any():
+						cars = np.flatnonzero(bring_forward)
+						self.stop_laps[cars, done[cars]] = stop_lap
+						self._tabulate()
+
+		def _insert_stop(self, car, lap, compound):
+				stops = self.stop_laps[car]
+				slot = int(np.searchsorted(stops, lap))
+				if slot < len(stops) and stops[slot] == lap:
+						self.stint_compounds[car, slot + 1] = compound
+						return
+				if stops[-1] != NO_STOP:
+						self._widen()
+						stops = self.stop_laps[car]
+				stops[slot + 1:] = stops[slot:-1].copy()
+				stops[slot] = lap
+				compounds = self.stint_compounds[car]
+				compounds[slot + 2:] = compounds[slot + 1:-1].copy()
+				compounds[slot + 1] = compound
+
+		def _widen(self):
+				slots = self.stop_laps.shape[1]
+				self.stop_laps = np.hstack([self.stop_laps, np.full((self.n_cars, slots), NO_STOP)])
+				padding = np.full((self.n_cars, slots), COMPOUND_CODES["Medium"], dtype=np.int8)
+				self.stint_compounds = np.hstack([self.stint_compounds, padding])
+
+		def pit_player(self, new_compound, loss=PIT_LOSS):
+				# The player's tyres and the stop's cost come from its RaceSimulator;
+				# the schedule only records the stop for standings
+				self._insert_stop(self.player, self.lap, COMPOUND_CODES[new_compound])
+				self.race_time[self.player] += loss
+				return self.player_position
+
+		def gaps(self, car=None):
+				# (gap to the car ahead, gap to the car behind) in seconds
+				car = self.player if car is None else car
+				order = self.order
+				place = self.position_of(car) - 1
+				time = self.race_time[car]
+				ahead = float(time - self.race_time[order[place - 1]]) if place > 0 else None
+				behind = float(self.race_time[order[place + 1]] - time) if place < self.n_cars - 1 else None
+				return ahead, behind
+
+		def standings(self):
+				order = self.order.tolist()
+				times = self.race_time.tolist()
+				ages = self.tyre_age.tolist()
+				compounds = self.compound.tolist()
+				stops = self.pit_stops.tolist()
+				leader = previous = times[order[0]]
+				rows = []
+				for place, car in enumerate(order):
+						rows.append({
+								'position': place + 1,
+								'car': car,
+								'player': car == self.player,
+								'gap': times[car] - leader,
+								'interval': times[car] - previous,
+								'compound': COMPOUNDS[compounds[car]],
+								'tyre_age': ages[car],
+								'pit_stops': stops[car]
+						})
+						previous = times[car]
+				return rows
+
+		def to_dict(self):
+				data = {name: getattr(self, name).tolist() for name in FIELD_ARRAYS}
+				data.update({
+						'n_cars': self.n_cars,
+						'total_laps': self.total_laps,
+						'player': self.player,
+						'lap': self.lap,
+						'wet': self.wet,
+						'rng_state': self.rng.bit_generator.state
+				})
+				return data
+
+		@staticmethod
+		def from_dict(data):
+				field = FieldSimulator(data['n_cars'], data['total_laps'], player=data['player'])
+				field.rng.bit_generator.state = data['rng_state']
+				for name in FIELD_ARRAYS:
+						current = getattr(field, name)
+						setattr(field, name, np.array(data[name], dtype=current.dtype))
+				field.lap = data['lap']
+				field.wet = data['wet']
+				field._tabulate()
+				return field
@@ -0,0 +1,120 @@
+import numpy as np
+
+# Column name -> dtype, in serialization order
+HISTORY_COLUMNS = (
+		('lap', np.int32),
+		('tyre_age', np.int32),
+		('wear', np.float64),
+		('lap_time', np.float64),
+		('compound', np.int8),
+)
+HEADER_DTYPE = np.dtype('<u4')
+
+
+# Per-lap telemetry stored as growable NumPy columns. Column properties are
+# zero-copy views of the filled part of each array; compounds are stored as
+# indices into `compounds`.
+class LapHistory:
+		__slots__ = ('compounds', '_columns', '_size')
+
+		def __init__(self, compounds, capacity=64):
+				self.compounds = tuple(compounds)
+				self._columns = {name: np.empty(capacity, dtype=dtype) for name, dtype in HISTORY_COLUMNS}
+				self._size = 0
+
+		def __len__(self):
+				return self._size
+
+		def __bool__(self):
+				return self._size > 0
+
+		@property
+		def capacity(self):
+				return len(self._columns['lap'])
+
+		@property
+		def nbytes(self):
+				return sum(column.nbytes for column in self._columns.values())
+
+		def column(self, name):
+				return self._columns[name][:self._size]
+
+		lap = property(lambda self: self.column('lap'))
+		tyre_age = property(lambda self: self.column('tyre_age'))
+		wear = property(lambda self: self.column('wear'))
+		lap_time = property(lambda self: self.column('lap_time'))
+		compound = property(lambda self: self.column('compound'))
+
+		def _grow(self, capacity):
+				for name, column in self._columns.items():
+						grown = np.empty(capacity, dtype=column.dtype)
+						grown[:self._size] = column[:self._size]
+						self._columns[name] = grown
+
+		def append(self, lap, tyre_age, wear, lap_time, compound):
+				if self._size == self.capacity:
+						self._grow(max(64, self.capacity * 2))
+				i = self._size
+				columns = self._columns
+				columns['lap'][i] = lap
+				columns['tyre_age'][i] = tyre_age
+				columns['wear'][i] = wear
+				columns['lap_time'][i] = lap_time
+				columns['compound'][i] = self.compounds.index(compound)
+				self._size += 1
+
+		def truncate(self, size):
+				self._size = min(self._size, size)
+
+		def record(self, i):
+				columns = self._columns
+				return {
+						'lap': int(columns['lap'][i]),
+						'tyre_age': int(columns['tyre_age'][i]),
+						'wear': float(columns['wear'][i]),
+						'lap_time': float(columns['lap_time'][i]),
+						'compound': self.compounds[columns['compound'][i]]
+				}
+
+		def to_records(self):
+				# Legacy list-of-dicts form of RaceSimulator.historical_degradation
+				return [self.record(i) for i in range(self._size)]
+
+		@staticmethod
+		def from_records(records, compounds):
+				history = LapHistory(compounds, capacity=max(64, len(records)))
+				for d in records:
+						history.append(d['lap'], d['tyre_age'], d['wear'], d['lap_time'], d['compound'])
+				return history
+
+		def to_columns(self):
+				# JSON-friendly column lists
+				return {name: self.column(name).tolist() for name, _ in HISTORY_COLUMNS}
+
+		@staticmethod
+		def from_columns(data, compounds):
+				size = len(data['lap'])
+				history = LapHistory(compounds, capacity=max(64, size))
+				for name, dtype in HISTORY_COLUMNS:
+						history._columns[name][:size] = np.asarray(data[name], dtype=dtype)
+				history._size = size
+				return history
+
+		def to_bytes(self):
+				# Row count followed by each column's raw little-endian bytes
+				parts = [np.array([self._size], dtype=HEADER_DTYPE).tobytes()]
+				for name, dtype in HISTORY_COLUMNS:
+						parts.append(self.column(name).astype(np.dtype(dtype).newbyteorder('<'), copy=False).tobytes())
+				return b''.join(parts)
+
+		@staticmethod
+		def from_bytes(data, compounds):
+				size = int(np.frombuffer(data, dtype=HEADER_DTYPE, count=1)[0])
+				history = LapHistory(compounds, capacity=max(64, size))
+				offset = HEADER_DTYPE.itemsize
+				for name, dtype in HISTORY_COLUMNS:
+						dtype = np.dtype(dtype).newbyteorder('<')
+						history._columns[name][:size] = np.frombuffer(data, dtype=dtype, count=size, offset=offset)
+						offset += dtype.itemsize * size
+				history._size = size
+				return history
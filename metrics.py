@@ -0,0 +1,200 @@
+import bisect
+import functools
+import threading
+import time
+
+# Latency buckets in seconds, from 100 us to 10 s
+LATENCY_BUCKETS = (0.0001, 0.00025, 0.0005, 0.001, 0.0025, 0.005, 0.01, 0.025, 0.05, 0.1, 0.25, 0.5,
+									 1.0, 2.5, 5.0, 10.0)
+# Payload buckets in bytes, from 100 B to 10 MB
+SIZE_BUCKETS = (100, 300, 1000, 3000, 10000, 30000, 100000, 300000, 1000000, 3000000, 10000000)
+
+
+def format_labels(names, values, extra=()):
+		pairs = list(zip(names, values)) + list(extra)
+		if not pairs:
+				return ""
+		escaped = (str(value).replace('\\', '\\\\').replace('"', '\\"').replace('\n', '\\n') for _, value in pairs)
+		return "{" + ",".join(f'{name}="{value}"' for (name, _), value in zip(pairs, escaped)) + "}"
+
+
+def format_value(value):
+		if value == float('inf'):
+				return "+Inf"
+		return repr(float(value)) if isinstance(value, float) else str(value)
+
+
+# Metric families keyed by label values. Children are created on first use
+# and updated under one lock per family; an update costs about a
+# microsecond, cheap enough to leave on for every callback. Families given
+# `collect`, a function returning {label values: value}, are instead set from
+# it at scrape time.
+class Metric:
+		kind = None
+
+		def __init__(self, name, documentation, labels=(), collect=None):
+				self.name = name
+				self.documentation = documentation
+				self.label_names = tuple(labels)
+				self.collect = collect
+				self._children = {}
+				self._lock = threading.Lock()
+
+		def labels(self, *values):
+				child = self._children.get(values)
+				if child is None:
+						with self._lock:
+								child = self._children.setdefault(values, self._new_child())
+				return child
+
+		def render(self):
+				if self.collect is not None:
+						with self._lock:
+								self._children = {values: [value] for values, value in self.collect().items()}
+				lines = [f"# HELP {self.name} {self.documentation}", f"# TYPE {self.name} {self.kind}"]
+				with self._lock:
+						children = list(self._children.items())
+				for values, child in sorted(children):
+						lines.extend(self._render_child(values, child))
+				return lines
+
+
+class Counter(Metric):
+		kind = 'counter'
+
+		def _new_child(self):
+				return [0]
+
+		def inc(self, *values, amount=1):
+				child = self.labels(*values)
+				with self._lock:
+						child[0] += amount
+
+		def value(self, *values):
+				return self.labels(*values)[0]
+
+		def _render_child(self, values, child):
+				yield f"{self.name}{format_labels(self.label_names, values)} {format_value(child[0])}"
+
+
+class Gauge(Metric):
+		kind = 'gauge'
+
+		def _new_child(self):
+				return [0]
+
+		def set(self, *values, value):
+				self.labels(*values)[0] = value
+
+		def _render_child(self, values, child):
+				yield f"{self.name}{format_labels(self.label_names, values)} {format_value(child[0])}"
+
+
+class HistogramChild:
+		__slots__ = ('counts', 'sum', 'count')
+
+		def __init__(self, buckets):
+				self.counts = [0] * (len(buckets) + 1)
+				self.sum = 0.0
+				self.count = 0
+
+
+class Histogram(Metric):
+		kind = 'histogram'
+
+		def __init__(self, name, documentation, labels=(), buckets=LATENCY_BUCKETS):
+				super().__init__(name, documentation, labels)
+				self.buckets = tuple(buckets)
+
+		def _new_child(self):
+				return HistogramChild(self.buckets)
+
+		def observe(self, *values, value):
+				child = self.labels(*values)
+				slot = bisect.bisect_left(self.buckets, value)
+				with self._lock:
+						child.counts[slot] += 1
+						child.sum += value
+						child.count += 1
+
+		def time(self, *values):
+				return Timer(self, values)
+
+		def summary(self, *values):
+				# count, mean and approximate (bucket upper bound) p50/p99
+				child = self.labels(*values)
+				with self._lock:
+						counts, total, count = list(child.counts), child.sum, child.count
+				if not count:
+						return {'count': 0, 'mean': 0.0, 'p50': 0.0, 'p99': 0.0}
+				bounds = self.buckets + (float('inf'),)
+				cumulative = 0
+				quantiles = {}
+				for bound, bucket_count in zip(bounds, counts):
+						cumulative += bucket_count
+						for name, q in (('p50', 0.5), ('p99', 0.99)):
+								if name not in quantiles and cumulative >= q * count:
+										quantiles[name] = bound
+				return dict(count=count, mean=total / count, **quantiles)
+
+		def _render_child(self, values, child):
+				labels = self.label_names
+				with self._lock:
+						counts, total, count = list(child.counts), child.sum, child.count
+				cumulative = 0
+				for bound, bucket_count in zip(self.buckets + (float('inf'),), counts):
+						cumulative += bucket_count
+						le = format_labels(labels, values, [('le', format_value(float(bound)))])
+						yield f"{self.name}_bucket{le} {cumulative}"
+				yield f"{self.name}_sum{format_labels(labels, values)} {format_value(total)}"
+				yield f"{self.name}_count{format_labels(labels, values)} {count}"
+
+
+class Timer:
+		__slots__ = ('histogram', 'values', 'start')
+
+		def __init__(self, histogram, values):
+				self.histogram = histogram
+				self.values = values
+
+		def __enter__(self):
+				self.start = time.perf_counter()
+				return self
+
+		def __exit__(self, *exc):
+				self.histogram.observe(*self.values, value=time.perf_counter() - self.start)
+
+
+class Registry:
+		def __init__(self):
+				self.metrics = []
+
+		def register(self, metric):
+				self.metrics.append(metric)
+				return metric
+
+		def render(self):
+				lines = []
+				for metric in self.metrics:
+						lines.extend(metric.render())
+				return "\n".join(lines) + "\n"
+
+
+def instrument(name, latency, errors, ignore=()):
+		# Decorator timing every call of a callback under `name` and counting
+		# exceptions other than `ignore` (e.g. PreventUpdate)
+		def decorate(func):
+				@functools.wraps(func)
+				def wrapper(*args, **kwargs):
+						start = time.perf_counter()
+						try:
+								return func(*args, **kwargs)
+						except ignore:
+								raise
+						except Exception:
+								errors.inc(name)
+								raise
+						finally:
+								latency.observe(name, value=time.perf_counter() - start)
+				return wrapper
+		return decorate
@@ -0,0 +1,72 @@
+import threading
+import time
+
+import numpy as np
+
+from batch_simulator import BatchRaceSimulator
+
+BAND_PERCENTILES = (10, 50, 90)
+
+
+# Monte Carlo wear / lap-time bands from many rollouts of the current state.
+# Rollouts wear tyres at the race's learned rates, the same ones its point
+# forecast projects, and each draws a log-normal multiplier on them
+# (wear_sigma) to express model error. The rollout count adapts between calls
+# so one prediction stays inside budget_ms, starting from (and never
+# exceeding) n_rollouts; one predictor is shared by every session.
+class MonteCarloPredictor:
+		def __init__(self, n_rollouts=5000, budget_ms=20.0, min_rollouts=250, wear_sigma=0.1, seed=None):
+				self.max_rollouts = n_rollouts
+				self.n_rollouts = n_rollouts
+				self.min_rollouts = min(min_rollouts, n_rollouts)
+				self.budget_ms = budget_ms
+				self.wear_sigma = wear_sigma
+				self.rng = np.random.default_rng(seed)
+				self.last_ms = 0.0
+				self._lock = threading.Lock()
+
+		def predict(self, sim, laps_ahead=10, rng=None):
+				laps = min(laps_ahead, sim.total_laps - sim.lap)
+				if laps <= 0:
+						return []
+
+				start = time.perf_counter()
+				rng = self.rng if rng is None else rng
+				with self._lock:
+						n_rollouts = self.n_rollouts
+				batch = BatchRaceSimulator.from_simulator(sim, n_rollouts, seed=rng, horizon=laps)
+				if self.wear_sigma:
+						batch.wear_rate = rng.lognormal(0.0, self.wear_sigma, n_rollouts)
+				batch.run()
+				wear = np.percentile(batch.wear_history, BAND_PERCENTILES, axis=0)
+				times = np.percentile(batch.lap_times, BAND_PERCENTILES, axis=0)
+
+				predictions = []
+				for i in range(laps):
+						predictions.append({
+								'lap': sim.lap + i + 1,
+								'tyre_age': sim.tyre_age + i + 1,
+								'wear_p10': float(wear[0, i]),
+								'wear_p50': float(wear[1, i]),
+								'wear_p90': float(wear[2, i]),
+								'time_p10': float(times[0, i]),
+								'time_p50': float(times[1, i]),
+								'time_p90': float(times[2, i]),
+								# Median doubles as the point prediction used elsewhere
+								'predicted_wear': float(wear[1, i]),
+								'predicted_time': float(times[1, i])
+						})
+
+				elapsed_ms = (time.perf_counter() - start) * 1000
+				with self._lock:
+						self.last_ms = elapsed_ms
+						self._adapt(elapsed_ms)
+				return predictions
+
+		def _adapt(self, elapsed_ms):
+				# Called with the lock held
+				if elapsed_ms > self.budget_ms:
+						scaled = int(self.n_rollouts * self.budget_ms / elapsed_ms * 0.9)
+						self.n_rollouts = max(self.min_rollouts, scaled)
+				elif elapsed_ms < self.budget_ms * 0.5 and self.n_rollouts < self.max_rollouts:
+						self.n_rollouts = min(self.max_rollouts, int(self.n_rollouts * 1.25) + 1)
@@ -0,0 +1,152 @@
+import json
+import queue
+import threading
+
+# Scalar fields pushed to clients; each event only carries the ones that changed
+CLOCK_FIELDS = ('lap', 'total_laps', 'speed', 'battery', 'tyre_wear', 'tyre_temp', 'fuel',
+								'position', 'tyre_compound', 'tyre_age', 'pit_stops', 'weather', 'safety_car')
+SUBSCRIBER_QUEUE_SIZE = 64
+HEARTBEAT_SECONDS = 15
+
+
+def snapshot(sim):
+		return {field: getattr(sim, field) for field in CLOCK_FIELDS}
+
+
+class SessionClock(threading.Thread):
+		# Advances one session at a fixed rate until stopped or the flag falls
+		def __init__(self, manager, entry, interval):
+				super().__init__(name=f"race-clock-{entry.session_id[:8]}", daemon=True)
+				self.manager = manager
+				self.entry = entry
+				self.interval = interval
+				self.stopped = threading.Event()
+
+		def run(self):
+				entry = self.entry
+				while not self.stopped.wait(self.interval):
+						if entry.session_id not in self.manager.sessions:
+								break
+						with entry.lock:
+								sim = entry.simulator
+								if self.stopped.is_set() or sim.lap >= sim.total_laps:
+										break
+								self.manager.step(sim)
+								self.manager.sessions.commit(entry)
+								self.manager.publish(entry)
+				self.manager._finished(self)
+
+
+# Server-side simulation clocks, one thread per running session, with state
+# deltas fanned out to Server-Sent Events subscribers. `step(sim)` runs one lap.
+class RaceClock:
+		def __init__(self, sessions, interval=1.5, step=None):
+				self.sessions = sessions
+				self.interval = interval
+				self.step = step or (lambda sim: sim.simulate_lap())
+				self._clocks = {}
+				self._subscribers = {}
+				self._last_sent = {}
+				self._lock = threading.Lock()
+
+		def __len__(self):
+				return len(self._clocks)
+
+		def subscriber_count(self):
+				with self._lock:
+						return sum(len(subscribers) for subscribers in self._subscribers.values())
+
+		def is_running(self, session_id):
+				return session_id in self._clocks
+
+		def start(self, entry, interval=None):
+				with self._lock:
+						if entry.session_id in self._clocks:
+								return
+						clock = SessionClock(self, entry, interval or self.interval)
+						self._clocks[entry.session_id] = clock
+				clock.start()
+				self.publish(entry)
+
+		def stop(self, session_id):
+				with self._lock:
+						clock = self._clocks.pop(session_id, None)
+				if clock is not None:
+						clock.stopped.set()
+
+		def toggle(self, entry):
+				if self.is_running(entry.session_id):
+						self.stop(entry.session_id)
+				else:
+						self.start(entry)
+				return self.is_running(entry.session_id)
+
+		def _finished(self, clock):
+				with self._lock:
+						if self._clocks.get(clock.entry.session_id) is clock:
+								del self._clocks[clock.entry.session_id]
+				self.publish(clock.entry)
+
+		def subscribe(self, session_id):
+				subscriber = queue.Queue(maxsize=SUBSCRIBER_QUEUE_SIZE)
+				with self._lock:
+						self._subscribers.setdefault(session_id, []).append(subscriber)
+						# A new subscriber starts from a full snapshot
+						self._last_sent.pop(session_id, None)
+				return subscriber
+
+		def unsubscribe(self, session_id, subscriber):
+				with self._lock:
+						subscribers = self._subscribers.get(session_id, [])
+						if subscriber in subscribers:
+								subscribers.remove(subscriber)
+						if not subscribers:
+								self._subscribers.pop(session_id, None)
+								self._last_sent.pop(session_id, None)
+
+		def publish(self, entry):
+				session_id = entry.session_id
+				with self._lock:
+						subscribers = list(self._subscribers.get(session_id, ()))
+						if not subscribers:
+								return
+						state = snapshot(entry.simulator)
+						previous = self._last_sent.get(session_id, {})
+						self._last_sent[session_id] = state
+				delta = {key: value for key, value in state.items() if previous.get(key) != value}
+				delta.update(session_id=session_id, version=entry.version,
+										 running=self.is_running(session_id))
+				message = json.dumps(delta)
+				for subscriber in subscribers:
+						# Slow clients lose the oldest update rather than block the clock
+						while True:
+								try:
+										subscriber.put_nowait(message)
+										break
+								except queue.Full:
+										try:
+												subscriber.get_nowait()
+										except queue.Empty:
+												pass
+
+		def stream(self, session_id):
+				# text/event-stream body for one client; ends when the session is
+				# unknown or evicted, without creating one
+				entry = self.sessions.lookup(session_id)
+				if entry is None:
+						return
+				subscriber = self.subscribe(session_id)
+				try:
+						with entry.lock:
+								self.publish(entry)
+						while True:
+								try:
+										message = subscriber.get(timeout=HEARTBEAT_SECONDS)
+								except queue.Empty:
+										if session_id not in self.sessions:
+												return
+										yield ": heartbeat\n\n"
+										continue
+								yield f"data: {message}\n\n"
+				finally:
+						self.unsubscribe(session_id, subscriber)
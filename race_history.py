@@ -0,0 +1,252 @@
+import atexit
+import sqlite3
+import threading
+
+from race_simulator import COMPOUNDS, COMPOUND_CODES
+
+# Tyre ages are indexed in buckets of this many laps
+AGE_BUCKET_LAPS = 5
+
+SCHEMA = """
+CREATE TABLE IF NOT EXISTS laps (
+		session INTEGER NOT NULL,
+		race INTEGER NOT NULL,
+		stint INTEGER NOT NULL,
+		lap INTEGER NOT NULL,
+		compound INTEGER NOT NULL,
+		wet INTEGER NOT NULL,
+		safety_car INTEGER NOT NULL,
+		tyre_age INTEGER NOT NULL,
+		age_bucket INTEGER NOT NULL,
+		wear REAL NOT NULL,
+		lap_time REAL NOT NULL
+);
+CREATE INDEX IF NOT EXISTS laps_condition ON laps (compound, wet, age_bucket);
+CREATE INDEX IF NOT EXISTS laps_race ON laps (session, race, lap);
+
+CREATE TABLE IF NOT EXISTS pits (
+		session INTEGER NOT NULL,
+		race INTEGER NOT NULL,
+		lap INTEGER NOT NULL,
+		stint INTEGER NOT NULL,
+		compound INTEGER NOT NULL
+);
+CREATE INDEX IF NOT EXISTS pits_race ON pits (session, race, lap);
+
+-- Running totals kept alongside the laps so chart and chat lookups read a
+-- handful of rows however much history there is
+CREATE TABLE IF NOT EXISTS wear_by_age (
+		compound INTEGER NOT NULL,
+		wet INTEGER NOT NULL,
+		tyre_age INTEGER NOT NULL,
+		laps INTEGER NOT NULL,
+		wear_sum REAL NOT NULL,
+		lap_time_sum REAL NOT NULL,
+		PRIMARY KEY (compound, wet, tyre_age)
+) WITHOUT ROWID;
+
+CREATE TABLE IF NOT EXISTS stints (
+		session INTEGER NOT NULL,
+		race INTEGER NOT NULL,
+		stint INTEGER NOT NULL,
+		compound INTEGER NOT NULL,
+		wet_laps INTEGER NOT NULL,
+		laps INTEGER NOT NULL,
+		tyre_age INTEGER NOT NULL,
+		wear REAL NOT NULL,
+		lap_time_sum REAL NOT NULL,
+		PRIMARY KEY (session, race, stint)
+) WITHOUT ROWID;
+CREATE INDEX IF NOT EXISTS stints_compound ON stints (compound);
+"""
+
+UPDATE_WEAR_BY_AGE = """
+INSERT INTO wear_by_age VALUES (?, ?, ?, 1, ?, ?)
+ON CONFLICT (compound, wet, tyre_age) DO UPDATE SET
+		laps = laps + 1, wear_sum = wear_sum + excluded.wear_sum,
+		lap_time_sum = lap_time_sum + excluded.lap_time_sum
+"""
+
+UPDATE_STINTS = """
+INSERT INTO stints VALUES (?, ?, ?, ?, ?, 1, ?, ?, ?)
+ON CONFLICT (session, race, stint) DO UPDATE SET
+		wet_laps = wet_laps + excluded.wet_laps, laps = laps + 1,
+		tyre_age = max(tyre_age, excluded.tyre_age), wear = max(wear, excluded.wear),
+		lap_time_sum = lap_time_sum + excluded.lap_time_sum
+"""
+
+TAKE_BACK_WEAR_BY_AGE = """
+UPDATE wear_by_age SET laps = laps - 1, wear_sum = wear_sum - ?, lap_time_sum = lap_time_sum - ?
+WHERE compound = ? AND wet = ? AND tyre_age = ?
+"""
+
+RECOUNT_STINTS = """
+INSERT INTO stints
+SELECT session, race, stint, max(compound), sum(wet), count(*), max(tyre_age), max(wear), sum(lap_time)
+FROM laps WHERE session = ? AND race = ? AND stint >= ? GROUP BY stint
+"""
+
+
+def lap_row(sim):
+		# The lap the simulator has just completed, as a laps table row
+		return (sim.seed, sim.resets, sim.pit_stops, sim.lap, COMPOUND_CODES[sim.tyre_compound],
+						int(sim.weather == "Wet"), int(bool(sim.safety_car)), sim.tyre_age,
+						sim.tyre_age // AGE_BUCKET_LAPS, float(sim.tyre_wear), float(sim.lap_times[-1]))
+
+
+# Completed laps and pit stops of every session in one SQLite file. Appends
+# are buffered and written `batch_size` rows per transaction; reads flush the
+# buffer first so they always see every recorded lap. `version` is bumped on
+# every write so callers can cache query results.
+#
+# A race keeps one line of laps: recording a lap (or a stop) of a race at or
+# before laps it already has, as after a rewind, replaces everything it had
+# from there on, running totals included.
+class RaceHistoryStore:
+		def __init__(self, path, batch_size=64):
+				self.path = path
+				self.batch_size = batch_size
+				self.version = 0
+				self._laps = []
+				self._pits = []
+				# (session, race) -> last lap in the buffer
+				self._buffered = {}
+				self._lock = threading.Lock()
+				self._db = sqlite3.connect(path, check_same_thread=False)
+				self._db.execute("PRAGMA journal_mode=WAL")
+				self._db.execute("PRAGMA synchronous=NORMAL")
+				self._db.executescript(SCHEMA)
+				atexit.register(self.close)
+
+		def record_lap(self, sim):
+				self.record_laps([lap_row(sim)])
+
+		def record_laps(self, rows):
+				with self._lock:
+						buffered = self._buffered
+						for row in rows:
+								race, lap = row[:2], row[3]
+								last = buffered.get(race)
+								if last is not None and last >= lap:
+										self._cut_buffer(race, lap)
+								buffered[race] = lap
+								self._laps.append(row)
+						if len(self._laps) >= self.batch_size:
+								self._flush()
+
+		def record_pit(self, sim):
+				# Call after RaceSimulator.pit_stop; the new stint starts on the next lap
+				with self._lock:
+						race = (sim.seed, sim.resets)
+						last = self._buffered.get(race)
+						if last is not None and last > sim.lap:
+								self._cut_buffer(race, sim.lap + 1)
+						self._buffered[race] = sim.lap
+						self._pits.append(race + (sim.lap, sim.pit_stops, COMPOUND_CODES[sim.tyre_compound]))
+
+		def _cut_buffer(self, race, lap):
+				# Drop buffered laps and stops of `race` from `lap` on
+				self._laps = [row for row in self._laps if row[:2] != race or row[3] < lap]
+				self._pits = [row for row in self._pits if row[:2] != race or row[2] < lap]
+
+		def flush(self):
+				with self._lock:
+						self._flush()
+
+		def _flush(self):
+				if not self._laps and not self._pits:
+						return
+				laps, self._laps = self._laps, []
+				pits, self._pits = self._pits, []
+				self._buffered.clear()
+				# First lap each race writes; anything stored from there on is replaced
+				cuts = {}
+				for row in laps:
+						race = row[:2]
+						cuts[race] = min(cuts.get(race, row[3]), row[3])
+				for session, race, lap, _, _ in pits:
+						cuts[session, race] = min(cuts.get((session, race), lap + 1), lap + 1)
+				with self._db:
+						for (session, race), lap in cuts.items():
+								self._truncate(session, race, lap)
+						self._db.executemany("INSERT INTO laps VALUES (?, ?, ?, ?, ?, ?, ?, ?, ?, ?, ?)", laps)
+						self._db.executemany("INSERT INTO pits VALUES (?, ?, ?, ?, ?)", pits)
+						self._db.executemany(UPDATE_WEAR_BY_AGE, [
+								(compound, wet, age, wear, lap_time)
+								for _, _, _, _, compound, wet, _, age, _, wear, lap_time in laps
+						])
+						self._db.executemany(UPDATE_STINTS, [
+								(session, race, stint, compound, wet, age, wear, lap_time)
+								for session, race, stint, _, compound, wet, _, age, _, wear, lap_time in laps
+						])
+				self.version += 1
+
+		def _truncate(self, session, race, lap):
+				# Take back the stored laps and stops of a race from `lap` on, with
+				# their share of the running totals; inside the flush transaction
+				race_from = (session, race, lap)
+				self._db.execute("DELETE FROM pits WHERE session = ? AND race = ? AND lap >= ?", race_from)
+				dropped = self._db.execute(
+						"SELECT stint, compound, wet, tyre_age, wear, lap_time FROM laps "
+						"WHERE session = ? AND race = ? AND lap >= ?", race_from).fetchall()
+				if not dropped:
+						return
+				self._db.execute("DELETE FROM laps WHERE session = ? AND race = ? AND lap >= ?", race_from)
+				self._db.executemany(TAKE_BACK_WEAR_BY_AGE, [
+						(wear, lap_time, compound, wet, age) for _, compound, wet, age, wear, lap_time in dropped
+				])
+				self._db.execute("DELETE FROM wear_by_age WHERE laps <= 0")
+				# Stints the cut ran through are counted again from their remaining laps
+				first_stint = min(row[0] for row in dropped)
+				self._db.execute("DELETE FROM stints WHERE session = ? AND race = ? AND stint >= ?",
+												 (session, race, first_stint))
+				self._db.execute(RECOUNT_STINTS, (session, race, first_stint))
+
+		def _query(self, sql, params=()):
+				with self._lock:
+						self._flush()
+						return self._db.execute(sql, params).fetchall()
+
+		def wear_curve(self, compound, wet, max_age=None):
+				# [(tyre_age, mean wear, mean lap time, laps)] over every stored stint
+				sql = ("SELECT tyre_age, wear_sum / laps, lap_time_sum / laps, laps FROM wear_by_age "
+							 "WHERE compound = ? AND wet = ?")
+				params = [COMPOUND_CODES[compound], int(wet)]
+				if max_age is not None:
+						sql += " AND tyre_age <= ?"
+						params.append(max_age)
+				return self._query(sql + " ORDER BY tyre_age", params)
+
+		def stint_summary(self, compound, wet=None):
+				# Count, mean length, mean final wear and mean lap time of stored stints
+				# on a compound; wet=True/False keeps stints run mostly wet/dry
+				sql = ("SELECT count(*), avg(laps), avg(wear), sum(lap_time_sum) / sum(laps) "
+							 "FROM stints WHERE compound = ?")
+				if wet is not None:
+						sql += " AND wet_laps * 2 > laps" if wet else " AND wet_laps * 2 <= laps"
+				count, laps, wear, lap_time = self._query(sql, (COMPOUND_CODES[compound],))[0]
+				return {'compound': compound, 'stints': count, 'laps': laps, 'wear': wear, 'lap_time': lap_time}
+
+		def bucket_laps(self, compound, wet, tyre_age, limit=1000):
+				# Raw (wear, lap_time) samples from the tyre-age bucket holding tyre_age
+				return self._query(
+						"SELECT wear, lap_time FROM laps WHERE compound = ? AND wet = ? AND age_bucket = ? LIMIT ?",
+						(COMPOUND_CODES[compound], int(wet), tyre_age // AGE_BUCKET_LAPS, limit))
+
+		def pit_stops(self, session, race):
+				return [(lap, stint, COMPOUNDS[compound]) for lap, stint, compound in self._query(
+						"SELECT lap, stint, compound FROM pits WHERE session = ? AND race = ? ORDER BY lap",
+						(session, race))]
+
+		def counts(self):
+				laps, = self._query("SELECT count(*) FROM laps")[0]
+				stints, = self._query("SELECT count(*) FROM stints")[0]
+				return {'laps': laps, 'stints': stints}
+
+		def close(self):
+				with self._lock:
+						if self._db is None:
+								return
+						self._flush()
+						self._db.close()
+						self._db = None
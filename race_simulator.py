@@ -0,0 +1,405 @@
+import base64
+import hashlib
+import secrets
+
+import numpy as np
+
+from anomaly_detector import LapAnomalies
+from degradation_model import DegradationModel
+from event_log import EventLog, LAP, PIT, WEATHER, SAFETY_CAR, RESET
+from lap_history import LapHistory
+
+# Tyre compounds, in the order used for integer compound codes
+COMPOUNDS = ("Soft", "Medium", "Hard", "Intermediate", "Wet")
+COMPOUND_CODES = {name: code for code, name in enumerate(COMPOUNDS)}
+
+# Lap model constants shared by RaceSimulator and BatchRaceSimulator
+BASE_DEGRADATION = 1.2
+DEGRADATION_AGE_SCALE = 15
+DEGRADATION_EXPONENT = 1.5
+WET_WEAR_PENALTY = 0.3
+WET_SPEED_LOSS = 15
+WET_MIN_SPEED = 200
+BASE_SPEED = 280
+BASE_TYRE_TEMP = 85
+BASE_LAP_TIME = 82.5
+WEAR_TIME_PENALTY = 5
+WET_TIME_PENALTY = 8
+PIT_LOSS = 22.5
+PIT_POSITION_LOSS = 2
+# Share of each gap to the leader kept per safety car lap; a stop under the
+# safety car loses the same share of PIT_LOSS
+SAFETY_CAR_GAP_FACTOR = 0.5
+
+# Per-compound behaviour, indexed by compound code. Medium is the baseline:
+# degradation multiplier, dry-track pace delta (s) and wet-track time loss (s)
+COMPOUND_WEAR_RATE = (1.35, 1.0, 0.75, 1.1, 0.9)
+COMPOUND_DRY_PACE = (-0.6, 0.0, 0.5, 1.5, 3.0)
+COMPOUND_WET_PENALTY = (WET_TIME_PENALTY, WET_TIME_PENALTY, WET_TIME_PENALTY, 3.0, 1.5)
+
+# Uniform noise drawn each lap, in order:
+# speed, tyre temp, battery drain, fuel burn, lap time
+LAP_NOISE_LOW = np.array([-5.0, -3.0, 1.5, 1.6, -0.5])
+LAP_NOISE_HIGH = np.array([5.0, 3.0, 2.5, 2.0, 0.5])
+LAP_NOISE_SPAN = LAP_NOISE_HIGH - LAP_NOISE_LOW
+
+def state_seed(key):
+		# Stable (process-independent) RNG seed for a hashable state key
+		digest = hashlib.blake2b(repr(key).encode(), digest_size=8).digest()
+		return int.from_bytes(digest, 'little')
+
+def pit_loss(safety_car):
+		# Time a stop costs; the one rule for the simulator, its field and the planners
+		return PIT_LOSS * SAFETY_CAR_GAP_FACTOR if safety_car else PIT_LOSS
+
+def degradation_prior(compound, wet):
+		# Starting (intercept, slope) of the online wear model: the lap model's own rates
+		rate = BASE_DEGRADATION * COMPOUND_WEAR_RATE[COMPOUND_CODES[compound]]
+		return rate + WET_WEAR_PENALTY * wet, rate
+
+def degradation_model():
+		return DegradationModel(degradation_prior, DEGRADATION_AGE_SCALE, DEGRADATION_EXPONENT)
+
+# Race Simulator Class
+class RaceSimulator:
+		def __init__(self, seed=None, field_size=None, sector_segments=None):
+				self.seed = secrets.randbits(63) if seed is None else seed
+				self.field_size = field_size
+				# Track segments of the per-corner tyre model; None keeps one aggregate tyre
+				self.sector_segments = sector_segments
+				self.resets = 0
+				self.events = EventLog()
+				self.field = None
+				self.total_laps = 50
+				# Learned wear rates outlive stints and resets
+				self.degradation = degradation_model()
+				self._init_state()
+
+		def _init_state(self):
+				# Each reset starts a fresh, reproducible stream derived from the seed
+				self.rng = np.random.default_rng([self.seed, self.resets])
+				self.lap = 0
+				self.speed = BASE_SPEED
+				self.battery = 100
+				self.tyre_wear = 0
+				self.tyre_temp = BASE_TYRE_TEMP
+				self.fuel = 100
+				self.position = 3
+				self.tyre_compound = "Medium"
+				self.weather = "Dry"
+				self.safety_car = False
+				self.lap_times = []
+				self.tyre_age = 0
+				self.pit_stops = 0
+				self.history = LapHistory(COMPOUNDS)
+				self.field = None
+				if self.field_size:
+						self._start_field()
+				self.tyres = None
+				if self.sector_segments:
+						from sector_model import SectorTyreModel
+						self.tyres = SectorTyreModel(self.sector_segments)
+				# Streaming checks on each lap's time, tyre temp, battery and fuel
+				self.anomalies = LapAnomalies()
+
+		def _start_field(self):
+				from field_simulator import FieldSimulator
+				self.field = FieldSimulator(self.field_size, self.total_laps, player=self.position - 1,
+																		seed=[self.seed, self.resets, 1])
+				self.position = self.field.player_position
+
+		@property
+		def total_laps(self):
+				return self._total_laps
+
+		@total_laps.setter
+		def total_laps(self, laps):
+				# Rivals plan their stops over the race length: before the start the
+				# field is planned again, later its remaining stops are stretched
+				self._total_laps = laps
+				if self.field is not None and self.field.total_laps != laps:
+						if self.lap == 0:
+								self._start_field()
+						else:
+								self.field.set_total_laps(laps)
+
+		@property
+		def historical_degradation(self):
+				# Legacy list-of-dicts view of self.history
+				return self.history.to_records()
+
+		@historical_degradation.setter
+		def historical_degradation(self, records):
+				self.history = LapHistory.from_records(records, COMPOUNDS)
+
+		def snapshot(self):
+				# The fixed-size part of to_dict(): everything but the lap history,
+				# lap times and event log
+				return {
+						'lap': self.lap,
+						'total_laps': self.total_laps,
+						'speed': self.speed,
+						'battery': self.battery,
+						'tyre_wear': self.tyre_wear,
+						'tyre_temp': self.tyre_temp,
+						'fuel': self.fuel,
+						'position': self.position,
+						'tyre_compound': self.tyre_compound,
+						'weather': self.weather,
+						'safety_car': self.safety_car,
+						'tyre_age': self.tyre_age,
+						'pit_stops': self.pit_stops,
+						'field': self.field.to_dict() if self.field else None,
+						'tyres': self.tyres.to_dict() if self.tyres else None,
+						'anomalies': self.anomalies.to_dict(),
+						'degradation': self.degradation.to_dict(),
+						'seed': self.seed,
+						'field_size': self.field_size,
+						'sector_segments': self.sector_segments,
+						'resets': self.resets,
+						'rng_state': self.rng.bit_generator.state
+				}
+
+		def to_dict(self):
+				data = self.snapshot()
+				data.update({
+						'lap_times': self.lap_times,
+						'history': self.history.to_columns(),
+						'events': base64.b64encode(self.events.to_bytes()).decode('ascii')
+				})
+				return data
+
+		@staticmethod
+		def from_dict(data):
+				sim = RaceSimulator(seed=data.get('seed'), field_size=data.get('field_size'),
+														sector_segments=data.get('sector_segments'))
+				for key, value in data.items():
+						if key == 'history':
+								value = LapHistory.from_columns(value, COMPOUNDS)
+						elif key == 'field':
+								from field_simulator import FieldSimulator
+								value = FieldSimulator.from_dict(value) if value else None
+						elif key == 'tyres':
+								from sector_model import SectorTyreModel
+								value = SectorTyreModel.from_dict(value) if value else None
+						elif key == 'anomalies':
+								value = LapAnomalies.from_dict(value)
+						elif key == 'degradation':
+								value = degradation_model().load(value)
+						elif key == 'events':
+								value = EventLog.from_bytes(base64.b64decode(value))
+						elif key == 'rng_state':
+								sim.rng.bit_generator.state = value
+								continue
+						setattr(sim, key, value)
+				return sim
+
+		def simulate_lap(self):
+				noise = (LAP_NOISE_LOW + LAP_NOISE_SPAN * self.rng.random(5)).tolist()
+				self.events.append(LAP)
+				return self._advance_lap(noise)
+
+		def _advance_lap(self, noise):
+				speed_noise, temp_noise, battery_drain, fuel_burn, time_noise = noise
+				self.lap += 1
+				self.tyre_age += 1
+				compound = COMPOUND_CODES[self.tyre_compound]
+
+				wear_before = self.tyre_wear
+				if self.tyres:
+						# Per-corner model: the set is as worn as its worst tyre
+						self.tyre_wear = self.tyres.advance(compound, self.tyre_age, self.weather == "Wet", temp_noise)
+						learn = self.tyre_wear < 100
+				else:
+						degradation_factor = 1 + (self.tyre_age / DEGRADATION_AGE_SCALE) ** DEGRADATION_EXPONENT
+						wear_rate = COMPOUND_WEAR_RATE[compound]
+						self.tyre_wear = min(100, self.tyre_wear + BASE_DEGRADATION * wear_rate * degradation_factor)
+						# Laps that hit the wear cap say nothing about the rate
+						learn = self.tyre_wear < 100
+						if self.weather == "Wet":
+								self.tyre_wear += WET_WEAR_PENALTY
+
+				if self.weather == "Wet":
+						self.speed = max(WET_MIN_SPEED, self.speed - WET_SPEED_LOSS)
+				else:
+						self.speed = BASE_SPEED - (self.tyre_wear * 0.4) + speed_noise
+
+				if self.tyres:
+						self.tyre_temp = self.tyres.mean_temp
+				else:
+						self.tyre_temp = BASE_TYRE_TEMP + (self.tyre_age * 1.5) - (self.tyre_wear * 0.2) + temp_noise
+				self.tyre_temp = max(60, min(110, self.tyre_temp))
+
+				self.battery = max(0, self.battery - battery_drain)
+				self.fuel = max(0, self.fuel - fuel_burn)
+
+				if self.tyres:
+						wear_penalty = self.tyres.time_penalty
+				else:
+						wear_penalty = (self.tyre_wear / 100) * WEAR_TIME_PENALTY
+				if self.weather == "Wet":
+						compound_penalty = COMPOUND_WET_PENALTY[compound]
+				else:
+						compound_penalty = COMPOUND_DRY_PACE[compound]
+				lap_time = BASE_LAP_TIME + wear_penalty + compound_penalty + time_noise
+				self.lap_times.append(lap_time)
+
+				self.history.append(self.lap, self.tyre_age, self.tyre_wear, lap_time, self.tyre_compound)
+				self.anomalies.update(self.lap, (lap_time, self.tyre_temp, self.battery, self.fuel),
+															(self.pit_stops, self.weather))
+				if learn:
+						self.degradation.update(self.tyre_compound, self.weather == "Wet", self.tyre_age,
+																		self.tyre_wear - wear_before)
+				if self.field:
+						self.position = self.field.advance(self, lap_time)
+
+				return lap_time
+
+		def strategy_key(self):
+				# Everything ai_strategy_recommendation and its predictions read. The
+				# wear model enters as its rounded fits, not its update count, since
+				# the cache is shared between sessions
+				return (self.lap, self.total_laps, float(self.tyre_wear), self.tyre_age,
+								self.tyre_compound, self.weather, bool(self.safety_car),
+								self.degradation.fit_key(COMPOUNDS, self.weather == "Wet"))
+
+		def predict_future_performance(self, laps_ahead=10, rng=None):
+				# Noise comes from a stream seeded by the state key unless one is given,
+				# so repeated predictions of the same state agree
+				if rng is None:
+						rng = np.random.default_rng(state_seed(self.strategy_key()))
+				wet = self.weather == "Wet"
+				compound = COMPOUND_CODES[self.tyre_compound]
+				compound_penalty = COMPOUND_WET_PENALTY[compound] if wet else COMPOUND_DRY_PACE[compound]
+				wear_path = self.degradation.project(self.tyre_wear, self.tyre_age, self.tyre_compound, wet, laps_ahead)
+				noise = rng.uniform(-0.3, 0.3, laps_ahead).tolist()
+
+				predictions = []
+				for i, future_wear in enumerate(wear_path):
+						predicted_time = (BASE_LAP_TIME + (future_wear / 100) * WEAR_TIME_PENALTY
+															+ compound_penalty + noise[i])
+						predictions.append({
+								'lap': self.lap + i + 1,
+								'predicted_wear': future_wear,
+								'predicted_time': predicted_time,
+								'tyre_age': self.tyre_age + i + 1
+						})
+
+				return predictions
+
+		def ai_strategy_recommendation(self):
+				predictions = self.predict_future_performance(laps_ahead=10)
+				laps_remaining = self.total_laps - self.lap
+				# Laps until the current set reaches critical wear, from the learned rate
+				laps_to_critical = self.degradation.laps_until(self.tyre_wear, self.tyre_age, self.tyre_compound,
+																											 self.weather == "Wet", 75, limit=laps_remaining + 1)
+
+				# Minimum expected race time plan; confidence grows with the time at
+				# stake between pitting now and staying out
+				from strategy_optimizer import optimizer
+				plan = optimizer.optimize(self)
+				stops = plan['stops']
+				margin = abs(plan['stay_out_time'] - plan['pit_now_time'])
+				confidence = int(min(99, 50 + 49 * (1 - np.exp(-margin / 3))))
+				plan_text = ", ".join(f"pit lap {stop['lap']} for {stop['compound']}" for stop in stops)
+
+				if stops and stops[0]['lap'] == self.lap:
+						fit = stops[0]['compound']
+						if self.weather == "Wet" and self.tyre_compound not in ("Intermediate", "Wet"):
+								recommendation = "PIT NOW - WRONG TYRES!"
+								reasoning = f"Wet conditions require {fit} tyres. Pitting now saves {margin:.1f}s."
+						elif self.safety_car:
+								recommendation = "PIT NOW (SAFETY CAR)"
+								reasoning = f"Safety car deployed! Cheap stop for {fit} saves {margin:.1f}s."
+						else:
+								recommendation = f"PIT NOW - {fit.upper()}"
+								reasoning = f"Pitting now saves {margin:.1f}s. Plan: {plan_text}."
+				elif stops:
+						laps_out = stops[0]['lap'] - self.lap
+						recommendation = f"STAY OUT {laps_out} LAP{'S' if laps_out > 1 else ''}"
+						reasoning = f"Plan: {plan_text}. Pitting now would cost {margin:.1f}s."
+				else:
+						recommendation = "STAY OUT"
+						reasoning = f"Tyres will last to the flag. Pitting now would cost {margin:.1f}s."
+
+				return {
+						'recommendation': recommendation,
+						'confidence': confidence,
+						'reasoning': reasoning,
+						'laps_to_critical': laps_to_critical,
+						'plan': stops,
+						'pit_compound': plan['pit_now_compound'],
+						'expected_time': plan['expected_time'],
+						'predictions': predictions
+				}
+	
+		def pit_stop(self, new_compound="Medium"):
+				# Returns the time the stop costs, which the field is charged too
+				self.events.append(PIT, COMPOUNDS.index(new_compound))
+				self.tyre_wear = 0
+				self.tyre_age = 0
+				self.tyre_compound = new_compound
+				self.pit_stops += 1
+				if self.tyres:
+						self.tyres.fit()
+				if self.field:
+						self.position = self.field.pit_player(new_compound, pit_loss(self.safety_car))
+				else:
+						self.position = min(20, self.position + PIT_POSITION_LOSS)
+				return pit_loss(self.safety_car)
+
+		def set_conditions(self, weather, safety_car):
+				# Only changes are logged
+				if weather != self.weather:
+						self.events.append(WEATHER, int(weather == "Wet"))
+						self.weather = weather
+				if safety_car != self.safety_car:
+						self.events.append(SAFETY_CAR, int(safety_car))
+						self.safety_car = safety_car
+
+		def reset(self):
+				# Back to the start of a new race; the event log carries on
+				self.events.append(RESET)
+				self.resets += 1
+				self._init_state()
+
+		def apply_events(self, events, stop_lap=None):
+				# Apply logged events in order, stopping before any lap past stop_lap.
+				# Runs of laps draw all their noise in one call, which yields the same
+				# stream as lap-by-lap draws. Returns the number of events applied.
+				ops = list(events)
+				i = 0
+				while i < len(ops):
+						op, arg = ops[i]
+						if op == LAP:
+								j = i
+								while j < len(ops) and ops[j][0] == LAP:
+										j += 1
+								if stop_lap is not None:
+										j = min(j, i + stop_lap - self.lap)
+								if j <= i:
+										break
+								block = LAP_NOISE_LOW + LAP_NOISE_SPAN * self.rng.random((j - i, 5))
+								for noise in block.tolist():
+										self.events.append(LAP)
+										self._advance_lap(noise)
+								i = j
+								continue
+						if op == PIT:
+								self.pit_stop(COMPOUNDS[arg])
+						elif op == WEATHER:
+								self.set_conditions("Wet" if arg else "Dry", self.safety_car)
+						elif op == SAFETY_CAR:
+								self.set_conditions(self.weather, bool(arg))
+						elif op == RESET:
+								self.reset()
+						i += 1
+				return i
+
+		@staticmethod
+		def replay(seed, events, total_laps=50, field_size=None, sector_segments=None):
+				# Rebuild a session from its seed and event log
+				sim = RaceSimulator(seed=seed, field_size=field_size, sector_segments=sector_segments)
+				sim.total_laps = total_laps
+				sim.apply_events(events)
+				return sim
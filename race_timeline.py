@@ -0,0 +1,107 @@
+import bisect
+import pickle
+
+from event_log import EventLog, RESET
+from lap_history import HISTORY_COLUMNS, LapHistory
+from race_simulator import COMPOUNDS, RaceSimulator
+
+# Laps between checkpoints; a seek replays at most this many laps
+CHECKPOINT_LAPS = 5
+
+
+def common_prefix(a, b):
+		# Length of the longest common prefix of two event logs, in whole events
+		low, high = 0, min(len(a), len(b))
+		while low < high:
+				middle = (low + high + 1) // 2
+				if a[:middle] == b[:middle]:
+						low = middle
+				else:
+						high = middle - 1
+		return low - low % 2
+
+
+def race_start(data):
+		# Offset of the first event of the current race (just after the last reset)
+		for offset in range(len(data) - 2, -1, -2):
+				if data[offset] == RESET:
+						return offset + 2
+		return 0
+
+
+# Every lap of one race so far, for rewinding and scrubbing. The event log is
+# the per-lap delta; every `interval` laps a checkpoint keeps the pickled
+# RaceSimulator.snapshot() (a few KiB, whatever the race length) and its event
+# offset, so restoring any lap is one checkpoint load plus at most `interval`
+# replayed laps. `head` is a replay of the whole timeline; its lap history
+# supplies the history prefix of every restore.
+#
+# sync() follows the live simulator: new events extend the timeline, a
+# rewound simulator (a prefix of the log) leaves the later laps reachable, and
+# an action that diverges from the log cuts the timeline at the branch point.
+class RaceTimeline:
+		def __init__(self, sim, interval=CHECKPOINT_LAPS):
+				self.interval = interval
+				self.race = (sim.seed, sim.resets)
+				data = sim.events.to_bytes()
+				start = race_start(data)
+				self.events = data[:start]
+				self.head = RaceSimulator.replay(sim.seed, EventLog(self.events), sim.total_laps, sim.field_size,
+																				 sim.sector_segments)
+				self.offset = start
+				self.checkpoints = []
+				self._checkpoint()
+
+		@property
+		def lap(self):
+				return self.head.lap
+
+		@property
+		def nbytes(self):
+				field = self.head.field.nbytes if self.head.field else 0
+				return (sum(len(state) for _, _, state in self.checkpoints) + len(self.events)
+								+ self.head.history.nbytes + field)
+
+		def _checkpoint(self):
+				state = pickle.dumps(self.head.snapshot(), pickle.HIGHEST_PROTOCOL)
+				self.checkpoints.append((self.head.lap, self.offset, state))
+
+		def sync(self, sim):
+				live = sim.events.to_bytes()
+				if self.events.startswith(live):
+						return
+				common = len(self.events) if live.startswith(self.events) else common_prefix(self.events, live)
+				if common < self.offset:
+						# Diverged behind the head: keep the checkpoints up to the branch
+						# point and replay forward from the last of them
+						while len(self.checkpoints) > 1 and self.checkpoints[-1][1] > common:
+								self.checkpoints.pop()
+						self.head = self._restore(self.checkpoints[-1])
+						self.offset = self.checkpoints[-1][1]
+				self.events = live
+				while self.offset < len(live):
+						next_lap = (self.head.lap // self.interval + 1) * self.interval
+						applied = self.head.apply_events(EventLog(live[self.offset:]), stop_lap=next_lap)
+						self.offset += 2 * applied
+						if self.head.lap == next_lap:
+								self._checkpoint()
+
+		def _restore(self, checkpoint):
+				lap, offset, state = checkpoint
+				sim = RaceSimulator.from_dict(pickle.loads(state))
+				history = self.head.history
+				sim.history = LapHistory.from_columns({name: history.column(name)[:lap] for name, _ in HISTORY_COLUMNS},
+																							COMPOUNDS)
+				sim.lap_times = history.lap_time[:lap].tolist()
+				sim.events = EventLog(self.events[:offset])
+				return sim
+
+		def restore(self, lap):
+				# A new simulator at `lap` (clamped to the timeline), after every
+				# action taken on that lap
+				lap = max(0, min(lap, self.head.lap))
+				index = bisect.bisect_right([checkpoint[0] for checkpoint in self.checkpoints], lap) - 1
+				checkpoint = self.checkpoints[index]
+				sim = self._restore(checkpoint)
+				sim.apply_events(EventLog(self.events[checkpoint[1]:]), stop_lap=lap)
+				return sim
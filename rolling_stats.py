@@ -0,0 +1,237 @@
+import re
+from collections import deque
+
+# Trailing window lengths (laps) kept for every open series
+WINDOWS = (3, 5, 10, 20, 50)
+METRICS = ('lap_time', 'wear')
+
+
+# Count, mean, min, max and least-squares slope against lap number of every
+# value added, in constant memory
+class RunningStats:
+		__slots__ = ('count', 'sum_x', 'sum_y', 'sum_xx', 'sum_xy', 'min', 'min_lap', 'max', 'max_lap',
+								 'first_lap', 'last_lap')
+
+		def __init__(self):
+				self.count = 0
+				self.sum_x = self.sum_y = self.sum_xx = self.sum_xy = 0.0
+				self.min = self.max = None
+				self.min_lap = self.max_lap = self.first_lap = self.last_lap = None
+
+		def add(self, lap, value):
+				if not self.count:
+						self.first_lap = lap
+				self.count += 1
+				self.sum_x += lap
+				self.sum_y += value
+				self.sum_xx += lap * lap
+				self.sum_xy += lap * value
+				self.last_lap = lap
+				if self.min is None or value < self.min:
+						self.min, self.min_lap = value, lap
+				if self.max is None or value > self.max:
+						self.max, self.max_lap = value, lap
+
+		def summary(self):
+				return summarize(self.count, self.sum_x, self.sum_y, self.sum_xx, self.sum_xy,
+												 (self.min, self.min_lap), (self.max, self.max_lap), self.first_lap, self.last_lap)
+
+
+# The same statistics over the last `size` values. Sums are adjusted as values
+# enter and leave; min and max come from monotonic deques, so every add is
+# amortised O(1).
+class WindowStats:
+		__slots__ = ('size', 'values', 'sum_x', 'sum_y', 'sum_xx', 'sum_xy', 'mins', 'maxes')
+
+		def __init__(self, size):
+				self.size = size
+				self.values = deque()
+				self.sum_x = self.sum_y = self.sum_xx = self.sum_xy = 0.0
+				# (lap, value) candidates, increasing / decreasing by value
+				self.mins = deque()
+				self.maxes = deque()
+
+		def add(self, lap, value):
+				self.values.append((lap, value))
+				self.sum_x += lap
+				self.sum_y += value
+				self.sum_xx += lap * lap
+				self.sum_xy += lap * value
+				while self.mins and self.mins[-1][1] >= value:
+						self.mins.pop()
+				self.mins.append((lap, value))
+				while self.maxes and self.maxes[-1][1] <= value:
+						self.maxes.pop()
+				self.maxes.append((lap, value))
+				if len(self.values) > self.size:
+						old_lap, old_value = self.values.popleft()
+						self.sum_x -= old_lap
+						self.sum_y -= old_value
+						self.sum_xx -= old_lap * old_lap
+						self.sum_xy -= old_lap * old_value
+						if self.mins[0][0] == old_lap:
+								self.mins.popleft()
+						if self.maxes[0][0] == old_lap:
+								self.maxes.popleft()
+
+		def summary(self):
+				lap_min, value_min = self.mins[0]
+				lap_max, value_max = self.maxes[0]
+				return summarize(len(self.values), self.sum_x, self.sum_y, self.sum_xx, self.sum_xy,
+												 (value_min, lap_min), (value_max, lap_max), self.values[0][0], self.values[-1][0])
+
+
+def summarize(count, sum_x, sum_y, sum_xx, sum_xy, low, high, first_lap, last_lap):
+		if not count:
+				return None
+		spread = count * sum_xx - sum_x * sum_x
+		slope = (count * sum_xy - sum_x * sum_y) / spread if count > 1 and spread > 0 else 0.0
+		return {
+				'laps': count,
+				'first_lap': first_lap,
+				'last_lap': last_lap,
+				'mean': sum_y / count,
+				'min': low[0],
+				'min_lap': low[1],
+				'max': high[0],
+				'max_lap': high[1],
+				'slope': slope
+		}
+
+
+# Running totals plus trailing windows for one series. Closing a series drops
+# its windows; only the totals of finished stints are kept.
+class SeriesStats:
+		__slots__ = ('total', 'windows')
+
+		def __init__(self, windows=WINDOWS):
+				self.total = RunningStats()
+				self.windows = [WindowStats(size) for size in windows]
+
+		def add(self, lap, value):
+				self.total.add(lap, value)
+				for window in self.windows:
+						window.add(lap, value)
+
+		def close(self):
+				self.windows = []
+
+		def summary(self, laps=None):
+				# Statistics over the last `laps` laps, widened to the nearest kept
+				# window; the whole series when none is big enough. The summary's
+				# laps / first_lap / last_lap say which window was used.
+				count = self.total.count
+				if laps is not None and laps < count:
+						for window in self.windows:
+								if window.size >= laps:
+										return window.summary()
+				return self.total.summary()
+
+
+# Lap time and wear statistics per stint, per compound and for the race,
+# caught up from a LapHistory as laps are added
+class RollingStats:
+		def __init__(self, windows=WINDOWS):
+				self.window_sizes = windows
+				self.seen = 0
+				self.stint = -1
+				self.series = {}
+
+		def _series(self, key):
+				series = self.series.get(key)
+				if series is None:
+						series = self.series[key] = SeriesStats(self.window_sizes)
+				return series
+
+		def update(self, history):
+				n = len(history)
+				if n < self.seen:
+						# A different history; start over
+						self.__init__(self.window_sizes)
+				if n == self.seen:
+						return
+				start = self.seen
+				laps = history.lap[start:n].tolist()
+				ages = history.tyre_age[start:n].tolist()
+				compounds = history.compound[start:n].tolist()
+				columns = [history.column(metric)[start:n].tolist() for metric in METRICS]
+				previous_age = history.tyre_age[start - 1] if start else None
+				for i, lap in enumerate(laps):
+						if previous_age is None or ages[i] <= previous_age:
+								for metric in METRICS:
+										if ('stint', self.stint, metric) in self.series:
+												self.series[('stint', self.stint, metric)].close()
+								self.stint += 1
+						previous_age = ages[i]
+						compound = history.compounds[compounds[i]]
+						for metric, values in zip(METRICS, columns):
+								value = values[i]
+								self._series(('race', metric)).add(lap, value)
+								self._series(('stint', self.stint, metric)).add(lap, value)
+								self._series(('compound', compound, metric)).add(lap, value)
+				self.seen = n
+
+		def query(self, metric, scope='race', laps=None, compound=None, stint=None):
+				# Summary for scope 'race', 'stint' (current unless given) or 'compound'
+				if scope == 'stint':
+						key = ('stint', self.stint if stint is None else stint, metric)
+				elif scope == 'compound':
+						key = ('compound', compound, metric)
+				else:
+						key = ('race', metric)
+				series = self.series.get(key)
+				return series.summary(laps) if series else None
+
+
+COMPOUND_WORDS = {
+		'soft': 'Soft', 'softs': 'Soft',
+		'medium': 'Medium', 'mediums': 'Medium',
+		'hard': 'Hard', 'hards': 'Hard',
+		'inter': 'Intermediate', 'inters': 'Intermediate', 'intermediate': 'Intermediate',
+		'intermediates': 'Intermediate',
+		'wets': 'Wet', 'full wet': 'Wet', 'full wets': 'Wet'
+}
+LAST_LAPS = re.compile(r'last (\d+) laps?')
+STINT_WORDS = ('this stint', 'since the pit', 'since pit', 'since my pit', 'since our pit', 'current stint')
+RACE_WORDS = ('this race', 'so far', 'whole race')
+# "best lap", "average lap time", "slowest race lap": aggregates without a window
+LAP_AGGREGATE = re.compile(r'\b(?:best|fastest|worst|slowest|average|mean) (?:\w+ )?lap\b')
+
+
+def parse_stats_query(text):
+		# Aggregate questions such as "pace over the last 10 laps on mediums",
+		# "best lap since the pit stop" or "deg per lap this stint", as
+		# {'stat', 'metric', 'scope', 'compound', 'laps'}; None for anything else.
+		# A metric word alone is not enough: "best time to pit?" or "fuel per
+		# lap" belong to other questions, so the text must also name a window or
+		# scope, or be a lap aggregate like "best lap".
+		text = text.lower()
+		if re.search(r'\b(?:best|fastest)\b', text):
+				stat, metric = 'min', 'lap_time'
+		elif re.search(r'\b(?:worst|slowest)\b', text):
+				stat, metric = 'max', 'lap_time'
+		elif re.search(r'\bdeg', text) or ('wear' in text and ('per lap' in text or 'trend' in text)):
+				stat, metric = 'slope', 'wear'
+		elif 'pace' in text or 'average' in text or 'lap time' in text:
+				stat, metric = 'mean', 'lap_time'
+		else:
+				return None
+
+		match = LAST_LAPS.search(text)
+		laps = int(match.group(1)) if match else (1 if 'last lap' in text else None)
+		compound = None
+		for word in sorted(COMPOUND_WORDS, key=len, reverse=True):
+				if re.search(rf'\b{word}\b', text):
+						compound = COMPOUND_WORDS[word]
+						break
+		if any(words in text for words in STINT_WORDS):
+				scope = 'stint'
+		elif compound:
+				scope = 'compound'
+		else:
+				scope = 'race'
+
+		if not (laps is not None or scope != 'race' or any(words in text for words in RACE_WORDS)
+						or LAP_AGGREGATE.search(text)):
+				return None
+		return {'stat': stat, 'metric': metric, 'scope': scope, 'compound': compound, 'laps': laps}
@@ -0,0 +1,324 @@
+"""What-if sweeps over weather windows, safety-car laps and pit plans.
+
+    python scenario_sweep.py [--laps 50] [--seeds 20] [--rain none 20-35 30-]
+                             [--safety-car none 10-30/5] [--pit-laps 15-35/2]
+                             [--compounds Medium Hard] [--field 20] [--workers N]
+                             [--cache scenario_cache.sqlite] [--csv FILE] [--heatmap FILE.html]
+
+Every (scenario, seed) rollout runs a full RaceSimulator race in a process
+pool and is cached on disk, so re-running a sweep, or one that overlaps an
+earlier grid, only simulates the new rollouts.
+"""
+import argparse
+import concurrent.futures
+import csv
+import hashlib
+import itertools
+import json
+import math
+import os
+import sqlite3
+import threading
+import time
+
+import numpy as np
+
+import degradation_model
+import field_simulator
+import race_simulator
+from race_simulator import COMPOUNDS, RaceSimulator
+
+# Laps the safety car stays out once deployed
+SAFETY_CAR_LAPS = 3
+# Per-rollout results, in cache column order
+RESULT_FIELDS = ('race_time', 'position', 'pit_stops', 'final_wear', 'max_wear')
+# Scenario parameters, in table column order
+SCENARIO_FIELDS = ('rain', 'safety_car', 'pit_lap', 'compound')
+
+SCHEMA = """
+CREATE TABLE IF NOT EXISTS rollouts (
+		key TEXT PRIMARY KEY,
+		race_time REAL NOT NULL,
+		position INTEGER NOT NULL,
+		pit_stops INTEGER NOT NULL,
+		final_wear REAL NOT NULL,
+		max_wear REAL NOT NULL
+) WITHOUT ROWID;
+"""
+
+
+def model_fingerprint():
+		# Cached rollouts are only valid for the lap model that produced them
+		digest = hashlib.blake2b(digest_size=8)
+		for module in (race_simulator, field_simulator, degradation_model):
+				with open(module.__file__, 'rb') as source:
+						digest.update(source.read())
+		return digest.hexdigest()
+
+
+def scenario_grid(rain=(None,), safety_car=(None,), pit_laps=(None,), compounds=("Medium",)):
+		# Every combination as a scenario dict. rain is an inclusive (first, last)
+		# lap window; None means no rain, safety car or stop. Scenarios without a
+		# stop are not repeated per compound.
+		scenarios = []
+		for window, deployed, pit_lap in itertools.product(rain, safety_car, pit_laps):
+				for compound in (compounds if pit_lap is not None else (None,)):
+						scenarios.append({'rain': None if window is None else tuple(window), 'safety_car': deployed,
+															'pit_lap': pit_lap, 'compound': compound})
+		return scenarios
+
+
+def run_scenario(scenario, seed, total_laps=50, field_size=None):
+		# One race under the scenario's conditions. Conditions are set before
+		# each lap; the stop is made at the end of pit_lap and costs what
+		# RaceSimulator.pit_stop charges the field, discounted under the safety car.
+		sim = RaceSimulator(seed=seed, field_size=field_size)
+		# Before the start this also plans the field's stops for the race length
+		sim.total_laps = total_laps
+		rain, deployed, pit_lap = scenario['rain'], scenario['safety_car'], scenario['pit_lap']
+		race_time = max_wear = 0.0
+		while sim.lap < total_laps:
+				lap = sim.lap + 1
+				wet = rain is not None and rain[0] <= lap <= rain[1]
+				safety_car = deployed is not None and deployed <= lap < deployed + SAFETY_CAR_LAPS
+				sim.set_conditions("Wet" if wet else "Dry", safety_car)
+				race_time += sim.simulate_lap()
+				max_wear = max(max_wear, sim.tyre_wear)
+				if sim.lap == pit_lap and sim.lap < total_laps:
+						race_time += sim.pit_stop(scenario['compound'])
+		return (float(race_time), int(sim.position), int(sim.pit_stops), float(sim.tyre_wear), float(max_wear))
+
+
+def run_chunk(tasks, total_laps, field_size):
+		# Worker entry point: [(scenario, seed)] -> [result tuple]
+		return [run_scenario(scenario, seed, total_laps, field_size) for scenario, seed in tasks]
+
+
+# Rollout results on disk, keyed by scenario, seed, race set-up and lap model
+class SweepCache:
+		def __init__(self, path):
+				self.path = path
+				self._lock = threading.Lock()
+				self._db = sqlite3.connect(path, check_same_thread=False)
+				self._db.execute("PRAGMA journal_mode=WAL")
+				self._db.execute("PRAGMA synchronous=NORMAL")
+				self._db.executescript(SCHEMA)
+
+		def get_many(self, keys, batch=500):
+				found = {}
+				with self._lock:
+						for start in range(0, len(keys), batch):
+								chunk = keys[start:start + batch]
+								rows = self._db.execute(
+										f"SELECT * FROM rollouts WHERE key IN ({', '.join('?' * len(chunk))})", chunk).fetchall()
+								found.update((row[0], row[1:]) for row in rows)
+				return found
+
+		def put_many(self, items):
+				# items: [(key, result tuple)]
+				with self._lock, self._db:
+						self._db.executemany("INSERT OR REPLACE INTO rollouts VALUES (?, ?, ?, ?, ?, ?)",
+																 [(key,) + tuple(result) for key, result in items])
+
+		def __len__(self):
+				with self._lock:
+						return self._db.execute("SELECT count(*) FROM rollouts").fetchone()[0]
+
+		def close(self):
+				with self._lock:
+						if self._db is not None:
+								self._db.close()
+								self._db = None
+
+
+# Runs scenario grids across a process pool. Rollouts are independent and
+# seeded, so results do not depend on the worker count or on which rollouts
+# came from the cache.
+class ScenarioSweep:
+		def __init__(self, total_laps=50, field_size=20, workers=None, cache=None):
+				self.total_laps = total_laps
+				self.field_size = field_size
+				self.workers = workers or os.cpu_count() or 1
+				self.cache = cache
+				self.fingerprint = model_fingerprint()
+				self.last = {'rollouts': 0, 'cached': 0, 'simulated': 0, 'seconds': 0.0}
+
+		def rollout_key(self, scenario, seed):
+				key = json.dumps([self.fingerprint, self.total_laps, self.field_size, seed,
+													[scenario[name] for name in SCENARIO_FIELDS]])
+				return hashlib.blake2b(key.encode(), digest_size=16).hexdigest()
+
+		def run(self, scenarios, seeds=range(20)):
+				# One row per scenario: its parameters, the rollout count and the
+				# mean (and race time spread) of every result over the seeds
+				start = time.perf_counter()
+				seeds = list(seeds)
+				tasks = [(scenario, seed) for scenario in scenarios for seed in seeds]
+				keys = [self.rollout_key(scenario, seed) for scenario, seed in tasks]
+				results = self.cache.get_many(keys) if self.cache is not None else {}
+				cached = len(results)
+				pending = [i for i, key in enumerate(keys) if key not in results]
+				for indices, chunk in self._simulate([tasks[i] for i in pending], pending):
+						items = [(keys[i], result) for i, result in zip(indices, chunk)]
+						results.update(items)
+						if self.cache is not None:
+								self.cache.put_many(items)
+
+				values = np.array([results[key] for key in keys], dtype=float).reshape(len(scenarios), len(seeds), -1)
+				rows = []
+				for scenario, runs in zip(scenarios, values):
+						row = dict(scenario, rollouts=len(seeds))
+						row.update(zip(RESULT_FIELDS, runs.mean(axis=0).tolist()))
+						row['race_time_std'] = float(runs[:, 0].std())
+						rows.append(row)
+				self.last = {'rollouts': len(tasks), 'cached': cached, 'simulated': len(pending),
+										 'seconds': time.perf_counter() - start}
+				return rows
+
+		def _simulate(self, tasks, indices):
+				# Yields (task indices, results) per chunk as chunks finish. A few
+				# chunks per worker balance uneven rollouts without much pickling.
+				if not tasks:
+						return
+				size = max(1, math.ceil(len(tasks) / (self.workers * 4)))
+				chunks = [(indices[i:i + size], tasks[i:i + size]) for i in range(0, len(tasks), size)]
+				if self.workers == 1 or len(chunks) == 1:
+						for chunk_indices, chunk in chunks:
+								yield chunk_indices, run_chunk(chunk, self.total_laps, self.field_size)
+						return
+				with concurrent.futures.ProcessPoolExecutor(self.workers) as pool:
+						futures = {pool.submit(run_chunk, chunk, self.total_laps, self.field_size): chunk_indices
+											 for chunk_indices, chunk in chunks}
+						for future in concurrent.futures.as_completed(futures):
+								yield futures[future], future.result()
+
+
+def label(value):
+		if value is None:
+				return "none"
+		if isinstance(value, (tuple, list)):
+				return f"{value[0]}-{value[1]}"
+		return str(value)
+
+
+def format_table(rows, sort='race_time', limit=None):
+		rows = sorted(rows, key=lambda row: row[sort])[:limit]
+		lines = [f"{'rain':>7} {'sc':>4} {'pit':>4} {'compound':<12} {'race time':>10} {'spread':>7} "
+						 f"{'pos':>5} {'max wear':>8}"]
+		for row in rows:
+				lines.append(f"{label(row['rain']):>7} {label(row['safety_car']):>4} {label(row['pit_lap']):>4} "
+										 f"{label(row['compound']):<12} {row['race_time']:10.2f} {row['race_time_std']:7.2f} "
+										 f"{row['position']:5.1f} {row['max_wear']:8.1f}")
+		return "\n".join(lines)
+
+
+def write_csv(rows, path):
+		with open(path, 'w', newline='') as out:
+				writer = csv.DictWriter(out, fieldnames=list(rows[0]))
+				writer.writeheader()
+				for row in rows:
+						writer.writerow({name: label(value) if name in SCENARIO_FIELDS else value
+														 for name, value in row.items()})
+
+
+def heatmap_figure(rows, x='pit_lap', y='safety_car', value='race_time'):
+		# Best (lowest) value over the other parameters for each (x, y) cell
+		import plotly.graph_objs as go
+		xs = sorted({row[x] for row in rows}, key=sort_key)
+		ys = sorted({row[y] for row in rows}, key=sort_key)
+		grid = np.full((len(ys), len(xs)), np.nan)
+		best = {}
+		for row in rows:
+				cell = (ys.index(row[y]), xs.index(row[x]))
+				if np.isnan(grid[cell]) or row[value] < grid[cell]:
+						grid[cell] = row[value]
+						best[cell] = row
+		text = [[describe(best.get((i, j))) for j in range(len(xs))] for i in range(len(ys))]
+		figure = go.Figure(go.Heatmap(z=grid, x=[label(v) for v in xs], y=[label(v) for v in ys],
+																	text=text, hovertemplate="%{text}<extra></extra>",
+																	colorscale='RdYlGn_r', colorbar={'title': value.replace('_', ' ')}))
+		figure.update_layout(template='plotly_dark', title=f"Best {value.replace('_', ' ')} by {x} and {y}",
+												 xaxis_title=x.replace('_', ' '), yaxis_title=y.replace('_', ' '))
+		figure.update_xaxes(type='category')
+		figure.update_yaxes(type='category')
+		return figure
+
+
+def sort_key(value):
+		# None first, then numbers or windows in order
+		if value is None:
+				return (0, ())
+		return (1, tuple(value) if isinstance(value, (tuple, list)) else (value,))
+
+
+def describe(row):
+		if row is None:
+				return ""
+		return (f"rain {label(row['rain'])}, safety car {label(row['safety_car'])}, "
+						f"pit {label(row['pit_lap'])} {label(row['compound'])}<br>"
+						f"{row['race_time']:.2f}s ± {row['race_time_std']:.2f}, P{row['position']:.1f}")
+
+
+def parse_laps(values):
+		# "none", "N", "A-B" (every lap) or "A-B/S" (every S laps)
+		laps = []
+		for value in values:
+				if value == 'none':
+						laps.append(None)
+				elif '-' in value:
+						span, _, step = value.partition('/')
+						first, last = span.split('-')
+						laps.extend(range(int(first), int(last) + 1, int(step or 1)))
+				else:
+						laps.append(int(value))
+		return laps
+
+
+def parse_windows(values, total_laps):
+		# "none" or "A-B"; "A-" rains to the flag
+		windows = []
+		for value in values:
+				if value == 'none':
+						windows.append(None)
+				else:
+						first, last = value.split('-')
+						windows.append((int(first), int(last) if last else total_laps))
+		return windows
+
+
+def main():
+		parser = argparse.ArgumentParser(description=__doc__, formatter_class=argparse.RawDescriptionHelpFormatter)
+		parser.add_argument('--laps', type=int, default=50)
+		parser.add_argument('--seeds', type=int, default=20)
+		parser.add_argument('--rain', nargs='+', default=['none'])
+		parser.add_argument('--safety-car', nargs='+', default=['none'])
+		parser.add_argument('--pit-laps', nargs='+', default=['15-35/5'])
+		parser.add_argument('--compounds', nargs='+', default=['Medium', 'Hard'], choices=COMPOUNDS)
+		parser.add_argument('--field', type=int, default=20, help="cars simulated for positions; 0 disables")
+		parser.add_argument('--workers', type=int, default=None)
+		parser.add_argument('--cache', default='scenario_cache.sqlite', help="empty disables the cache")
+		parser.add_argument('--top', type=int, default=20)
+		parser.add_argument('--csv')
+		parser.add_argument('--heatmap')
+		parser.add_argument('--heatmap-axes', nargs=2, default=['pit_lap', 'safety_car'], choices=SCENARIO_FIELDS)
+		args = parser.parse_args()
+
+		scenarios = scenario_grid(parse_windows(args.rain, args.laps), parse_laps(args.safety_car),
+															parse_laps(args.pit_laps), args.compounds)
+		cache = SweepCache(args.cache) if args.cache else None
+		sweep = ScenarioSweep(args.laps, args.field or None, args.workers, cache)
+		rows = sweep.run(scenarios, range(args.seeds))
+		last = sweep.last
+		print(f"{len(scenarios)} scenarios x {args.seeds} seeds: {last['simulated']} rollouts simulated, "
+					f"{last['cached']} cached, {last['seconds']:.2f}s on {sweep.workers} workers")
+		print(format_table(rows, limit=args.top))
+		if args.csv:
+				write_csv(rows, args.csv)
+		if args.heatmap:
+				heatmap_figure(rows, *args.heatmap_axes).write_html(args.heatmap)
+		if cache is not None:
+				cache.close()
+
+
+if __name__ == '__main__':
+		main()
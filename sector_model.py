@@ -0,0 +1,177 @@
+from functools import lru_cache
+
+import numpy as np
+
+from race_simulator import (
+		BASE_DEGRADATION, DEGRADATION_AGE_SCALE, DEGRADATION_EXPONENT, WET_WEAR_PENALTY, WEAR_TIME_PENALTY,
+		COMPOUND_WEAR_RATE
+)
+
+TYRES = ('FL', 'FR', 'RL', 'RR')
+# +1 for the left-hand tyres, loaded in right-hand corners
+TYRE_SIDE = np.array([1.0, -1.0, 1.0, -1.0])
+TYRE_FRONT = np.array([1.0, 1.0, 0.0, 0.0])
+
+# The circuit: corners at fixed places, mostly right-handers
+TRACK_SEED = 2024
+TRACK_CORNERS = 14
+RIGHT_HAND_SHARE = 0.65
+CORNER_WIDTH = (0.008, 0.025)
+# Share of lateral load moved onto the outside tyres
+LOAD_TRANSFER = 0.3
+# Work from braking (fronts) and traction (rears) relative to cornering
+BRAKING_WEIGHT = 0.5
+TRACTION_WEIGHT = 0.35
+# Work every segment does just rolling
+ROLLING_WORK = 0.05
+
+# Carcass temperatures in degrees C. A lap sheds COOLING_PER_LAP e-folds of the
+# gap to the track temperature (more on the straights) and gains HEAT_PER_LAP,
+# WORK_HEATING of it in proportion to each tyre's work and the rest evenly, which
+# balances out near the Medium's window.
+COOLING_PER_LAP = 1.0
+STRAIGHT_COOLING = 0.5
+HEAT_PER_LAP = 65.0
+WORK_HEATING = 0.5
+TRACK_TEMP = 30.0
+WET_TRACK_TEMP = 18.0
+WET_COOLING = 1.5
+BLANKET_TEMP = 80.0
+
+# Per compound, indexed by compound code: centre of the operating window (about
+# where the compound settles in its own conditions), and how fast the rubber
+# heats relative to the Medium
+COMPOUND_OPTIMAL_TEMP = (105.0, 95.0, 88.0, 60.0, 55.0)
+COMPOUND_HEATING = (1.2, 1.0, 0.85, 0.9, 0.8)
+TEMP_WINDOW = 15.0
+# Extra wear and lap time per squared window-width away from the optimum
+TEMP_WEAR = 0.25
+TEMP_TIME_PENALTY = 0.4
+
+
+# A lap of the circuit cut into `segments` equal lengths, with the work each
+# of the four tyres does in each segment. Work is scaled so the four tyres
+# average one unit per lap; the per-lap wear of the aggregate model is spread
+# over segments and tyres in those proportions. Built once per segment count;
+# a single segment would shed the whole lap's cooling at once and zero the decay
+# the temperature recurrence divides by, so at least two are needed.
+class Circuit:
+		def __init__(self, segments, seed=TRACK_SEED):
+				if segments < 2:
+						raise ValueError(f"a circuit needs at least 2 segments, got {segments}")
+				self.segments = segments
+				rng = np.random.default_rng(seed)
+				position = (np.arange(segments) + 0.5) / segments
+				centres = np.sort(rng.random(TRACK_CORNERS))
+				widths = rng.uniform(*CORNER_WIDTH, TRACK_CORNERS)
+				signs = np.where(rng.random(TRACK_CORNERS) < RIGHT_HAND_SHARE, 1.0, -1.0)
+				amplitudes = rng.uniform(0.3, 1.0, TRACK_CORNERS)
+				# Signed curvature, + for right-hand corners, wrapped around the lap
+				offset = (position[:, None] - centres[None, :] + 0.5) % 1.0 - 0.5
+				self.curvature = (signs * amplitudes * np.exp(-(offset / widths) ** 2)).sum(axis=1)
+
+				load = np.abs(self.curvature)
+				slope = np.roll(load, -1) - np.roll(load, 1)
+				slope /= max(np.abs(slope).max(), 1e-12)
+				braking = np.maximum(slope, 0.0)
+				traction = np.maximum(-slope, 0.0)
+				lateral = load[:, None] * (1 + LOAD_TRANSFER * TYRE_SIDE[None, :] * np.sign(self.curvature)[:, None])
+				work = (lateral + BRAKING_WEIGHT * braking[:, None] * TYRE_FRONT
+								+ TRACTION_WEIGHT * traction[:, None] * (1 - TYRE_FRONT) + ROLLING_WORK)
+				self.work = work / work.sum(axis=0).mean()
+				# Share of the lap's total load on each segment and tyre, for lap time
+				self.load_share = self.work / self.work.sum()
+				self.heating = WORK_HEATING * self.work + (1 - WORK_HEATING) / segments
+
+				# T[s + 1] = (1 - k[s]) * T[s] + heat[s] + k[s] * track temp is solved
+				# for every segment at once with running products: decay[s] is the
+				# product of (1 - k) over the first s segments
+				cooling = 1 + STRAIGHT_COOLING * (1 - load / max(load.max(), 1e-12))
+				self.cooling = COOLING_PER_LAP * cooling / cooling.sum()
+				self.wet_cooling = np.minimum(WET_COOLING * self.cooling, 0.5)
+				self.decay = np.cumprod(1 - self.cooling)
+				self.wet_decay = np.cumprod(1 - self.wet_cooling)
+
+
+@lru_cache(maxsize=8)
+def circuit(segments):
+		return Circuit(segments)
+
+
+# Wear and temperature of the four tyres, advanced segment by segment. Each lap
+# is a handful of (segments, 4) array operations: temperatures from the closed
+# form of the heating/cooling recurrence, then wear scaled by how far each
+# segment runs from the compound's window. RaceSimulator reads the rollups:
+# the set is as worn as its worst tyre, runs at the mean temperature, and
+# loses time by load-weighted wear and window.
+class SectorTyreModel:
+		def __init__(self, segments=200):
+				self.segments = segments
+				self.circuit = circuit(segments)
+				self.fit()
+
+		def fit(self):
+				# A fresh set off the blankets
+				self.wear = np.zeros(len(TYRES))
+				self.temp = np.full(len(TYRES), BLANKET_TEMP)
+				self.lap_temp = self.temp.copy()
+				self.time_penalty = 0.0
+
+		def advance(self, compound, tyre_age, wet, temp_noise=0.0):
+				# One lap on tyres of `compound` (code) that are `tyre_age` laps old
+				# at its end; `temp_noise` shifts the track temperature
+				circuit = self.circuit
+				cooling, decay = (circuit.wet_cooling, circuit.wet_decay) if wet else (circuit.cooling, circuit.decay)
+				track = (WET_TRACK_TEMP if wet else TRACK_TEMP) + temp_noise
+				gain = HEAT_PER_LAP * COMPOUND_HEATING[compound]
+				inputs = gain * circuit.heating + (cooling * track)[:, None]
+				temps = decay[:, None] * (self.temp + np.cumsum(inputs / decay[:, None], axis=0))
+
+				off_window = ((temps - COMPOUND_OPTIMAL_TEMP[compound]) / TEMP_WINDOW) ** 2
+				degradation = 1 + (tyre_age / DEGRADATION_AGE_SCALE) ** DEGRADATION_EXPONENT
+				lap_wear = BASE_DEGRADATION * COMPOUND_WEAR_RATE[compound] * degradation
+				worn = lap_wear * circuit.work * (1 + TEMP_WEAR * off_window)
+				if wet:
+						worn += WET_WEAR_PENALTY * circuit.work
+				self.wear = np.minimum(100.0, self.wear + worn.sum(axis=0))
+				self.temp = temps[-1]
+				self.lap_temp = temps.mean(axis=0)
+
+				tyre_load = circuit.load_share.sum(axis=0)
+				self.time_penalty = float(WEAR_TIME_PENALTY * (tyre_load @ self.wear) / 100
+																	+ TEMP_TIME_PENALTY * (circuit.load_share * off_window).sum())
+				return self.worst_wear
+
+		@property
+		def worst_wear(self):
+				return float(self.wear.max())
+
+		@property
+		def mean_temp(self):
+				return float(self.lap_temp.mean())
+
+		@property
+		def nbytes(self):
+				return self.wear.nbytes + self.temp.nbytes + self.lap_temp.nbytes
+
+		def corners(self):
+				# {tyre: (wear %, mean lap temperature)}
+				return {tyre: (float(wear), float(temp)) for tyre, wear, temp in zip(TYRES, self.wear, self.lap_temp)}
+
+		def to_dict(self):
+				return {
+						'segments': self.segments,
+						'wear': self.wear.tolist(),
+						'temp': self.temp.tolist(),
+						'lap_temp': self.lap_temp.tolist(),
+						'time_penalty': self.time_penalty
+				}
+
+		@staticmethod
+		def from_dict(data):
+				model = SectorTyreModel(data['segments'])
+				model.wear = np.array(data['wear'])
+				model.temp = np.array(data['temp'])
+				model.lap_temp = np.array(data['lap_temp'])
+				model.time_penalty = data['time_penalty']
+				return model
@@ -0,0 +1,156 @@
+import secrets
+import threading
+import time
+import uuid
+from collections import OrderedDict
+
+from race_simulator import RaceSimulator
+
+# Rough per-simulator footprint used for the memory cap
+BASE_SESSION_BYTES = 2048
+BYTES_PER_LAP_TIME = 40
+
+
+def estimate_bytes(sim):
+		field = sim.field.nbytes if sim.field else 0
+		return BASE_SESSION_BYTES + BYTES_PER_LAP_TIME * len(sim.lap_times) + sim.history.nbytes + field
+
+
+class SessionEntry:
+		__slots__ = ('session_id', 'simulator', 'version', 'generation', 'last_access', 'size', 'lock', 'views',
+								 'timeline', 'owner_key')
+
+		def __init__(self, session_id, simulator, owner_key=None):
+				self.session_id = session_id
+				self.simulator = simulator
+				# Secret held by the page that created the session; only it may
+				# change the race, everyone else with the id just watches
+				self.owner_key = owner_key
+				self.version = 0
+				# Bumped whenever the simulator is replaced (race reset)
+				self.generation = 0
+				self.last_access = time.monotonic()
+				self.size = estimate_bytes(simulator)
+				# Held by callbacks while they read or mutate the simulator
+				self.lock = threading.RLock()
+				# Derived per-session caches (e.g. chart decimation); dropped on reset
+				self.views = {}
+				# Checkpointed RaceTimeline of the current race, built on first seek
+				self.timeline = None
+
+
+# In-memory simulators keyed by session id, evicted least-recently-used first
+# once a session is idle for ttl_seconds, there are more than max_sessions,
+# or the estimated total size passes max_bytes. New simulators come from
+# `factory`.
+class SessionStore:
+		def __init__(self, max_sessions=1000, ttl_seconds=3600, max_bytes=256 * 1024 * 1024,
+								 factory=RaceSimulator):
+				self.factory = factory
+				self.max_sessions = max_sessions
+				self.ttl_seconds = ttl_seconds
+				self.max_bytes = max_bytes
+				self.total_bytes = 0
+				self.evictions = 0
+				self._sessions = OrderedDict()
+				self._lock = threading.Lock()
+
+		def __len__(self):
+				return len(self._sessions)
+
+		def __contains__(self, session_id):
+				return session_id in self._sessions
+
+		def create(self, simulator=None):
+				session_id = uuid.uuid4().hex
+				entry = SessionEntry(session_id, simulator or self.factory(), owner_key=secrets.token_hex(16))
+				with self._lock:
+						self._sessions[session_id] = entry
+						self.total_bytes += entry.size
+						self._evict()
+				return session_id
+
+		def get(self, session_id):
+				# Live session; only create() makes sessions, so an unknown or
+				# evicted id is a KeyError
+				entry = self.lookup(session_id)
+				if entry is None:
+						raise KeyError(session_id)
+				return entry
+
+		def lookup(self, session_id):
+				# Live session or None; never creates one
+				with self._lock:
+						entry = self._sessions.get(session_id)
+						if entry is not None:
+								self._sessions.move_to_end(session_id)
+								entry.last_access = time.monotonic()
+								self._evict(keep=session_id)
+				return entry
+
+		def commit(self, entry):
+				# Record a state change; returns the new version for the browser store
+				size = estimate_bytes(entry.simulator)
+				if entry.timeline is not None:
+						size += entry.timeline.nbytes
+				with self._lock:
+						entry.version += 1
+						if entry.session_id in self._sessions:
+								self.total_bytes += size - entry.size
+						entry.size = size
+						self._evict(keep=entry.session_id)
+				return entry.version
+
+		def reset(self, entry):
+				entry.simulator.reset()
+				entry.generation += 1
+				entry.views.clear()
+				entry.timeline = None
+				return entry.simulator
+
+		def replace(self, entry, simulator):
+				# Swap in another simulator of the same race (e.g. rewound to an
+				# earlier lap); the timeline is kept
+				entry.simulator = simulator
+				entry.generation += 1
+				entry.views.clear()
+				return simulator
+
+		def authorize(self, entry, key):
+				# Whether `key` may change the session; a session without a key has
+				# no owner and is never handed to whoever asks first
+				if key is None or entry.owner_key is None:
+						return False
+				return secrets.compare_digest(key, entry.owner_key)
+
+		def client_state(self, entry):
+				return {'session_id': entry.session_id, 'version': entry.version}
+
+		def discard(self, session_id):
+				with self._lock:
+						entry = self._sessions.pop(session_id, None)
+						if entry is not None:
+								self.total_bytes -= entry.size
+
+		def _evict(self, keep=None):
+				now = time.monotonic()
+				while self._sessions:
+						session_id, entry = next(iter(self._sessions.items()))
+						if session_id == keep:
+								break
+						expired = now - entry.last_access > self.ttl_seconds
+						over_cap = (len(self._sessions) > self.max_sessions
+												or self.total_bytes > self.max_bytes)
+						if not (expired or over_cap):
+								break
+						del self._sessions[session_id]
+						self.total_bytes -= entry.size
+						self.evictions += 1
+
+		def stats(self):
+				with self._lock:
+						return {
+								'sessions': len(self._sessions),
+								'bytes': self.total_bytes,
+								'evictions': self.evictions
+						}
@@ -0,0 +1,64 @@
+import threading
+from collections import OrderedDict
+
+import numpy as np
+
+from race_simulator import state_seed
+
+
+# Bounded LRU memo of strategy work keyed on RaceSimulator.strategy_key().
+# Cached values are shared between callers and must be treated as read-only.
+class StrategyCache:
+		def __init__(self, maxsize=512):
+				self.maxsize = maxsize
+				self.hits = 0
+				self.misses = 0
+				self._entries = OrderedDict()
+				self._lock = threading.Lock()
+
+		def __len__(self):
+				return len(self._entries)
+
+		def get(self, key, compute):
+				with self._lock:
+						if key in self._entries:
+								self.hits += 1
+								self._entries.move_to_end(key)
+								return self._entries[key]
+						self.misses += 1
+
+				value = compute()
+				with self._lock:
+						self._entries[key] = value
+						self._entries.move_to_end(key)
+						while len(self._entries) > self.maxsize:
+								self._entries.popitem(last=False)
+				return value
+
+		def recommendation(self, sim):
+				return self.get(('strategy',) + sim.strategy_key(), sim.ai_strategy_recommendation)
+
+		def bands(self, sim, predictor, laps_ahead=10):
+				# Monte Carlo bands drawn from the per-key stream, so a recompute after
+				# eviction matches what was cached
+				key = ('bands', laps_ahead) + sim.strategy_key()
+
+				def compute():
+						rng = np.random.default_rng(state_seed(key))
+						return predictor.predict(sim, laps_ahead=laps_ahead, rng=rng)
+
+				return self.get(key, compute)
+
+		def clear(self):
+				with self._lock:
+						self._entries.clear()
+
+		def stats(self):
+				lookups = self.hits + self.misses
+				return {
+						'hits': self.hits,
+						'misses': self.misses,
+						'size': len(self._entries),
+						'maxsize': self.maxsize,
+						'hit_rate': self.hits / lookups if lookups else 0.0
+				}
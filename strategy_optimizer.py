@@ -0,0 +1,171 @@
+import threading
+from collections import OrderedDict
+
+import numpy as np
+
+from race_simulator import (
+		COMPOUNDS, COMPOUND_CODES, BASE_LAP_TIME, WEAR_TIME_PENALTY, PIT_LOSS,
+		COMPOUND_DRY_PACE, COMPOUND_WET_PENALTY, pit_loss
+)
+from degradation_model import COEFFICIENT_STEP
+
+# Laps looked ahead; longer races are planned over the next MAX_HORIZON laps
+MAX_HORIZON = 200
+# Tyre ages past the point every compound is fully worn behave the same
+MAX_TYRE_AGE = 200
+
+
+# Cost-to-go for fresh-tyre stints under one weather and wear model, solved
+# backwards from the flag:
+#
+#     V[r, c, a] = min(lap[c, a + 1] + V[r - 1, c, a + 1],      stay out
+#                      PIT_LOSS + min_c' lap[c', 1] + V[r - 1, c', 1])   pit
+#
+# for r laps remaining on compound c at tyre age a. Ages are clamped at the
+# first age where every compound is at 100% wear, after which lap times stop
+# changing. Rows only depend on the rows before them, so the table is
+# extended in place when a longer horizon is needed.
+class StrategyTable:
+		def __init__(self, wear_added, pace):
+				# wear_added: (compounds, ages) wear added on the lap driven at each age
+				wear = np.minimum(100.0, np.cumsum(wear_added, axis=1))
+				worn = np.flatnonzero((wear >= 100).all(axis=0))
+				ages = int(worn[0]) + 1 if len(worn) else wear.shape[1]
+				# Column a is the state after a laps on the set; column 0 is fresh
+				self.wear = np.hstack([np.zeros((len(pace), 1)), wear[:, :ages]])
+				self.max_age = ages
+				self.lap_time = BASE_LAP_TIME + self.wear / 100 * WEAR_TIME_PENALTY + np.asarray(pace)[:, None]
+				next_age = np.minimum(np.arange(ages + 1) + 1, ages)
+				self.next_age = next_age
+				self.next_lap_time = self.lap_time[:, next_age]
+				n = len(pace)
+				self.value = [np.zeros((n, ages + 1))]
+				self.pit = [np.zeros((n, ages + 1), dtype=bool)]
+				self.fresh = [0.0]
+				self.best_compound = [0]
+				self._lock = threading.Lock()
+
+		@property
+		def horizon(self):
+				return len(self.value) - 1
+
+		@property
+		def nbytes(self):
+				return sum(row.nbytes for row in self.value) + sum(row.nbytes for row in self.pit)
+
+		def extend(self, horizon):
+				with self._lock:
+						while len(self.value) <= horizon:
+								previous = self.value[-1]
+								stay = self.next_lap_time + previous[:, self.next_age]
+								# Fresh set: the first lap is driven at age 1
+								fresh = stay[:, 0]
+								best = int(fresh.argmin())
+								pit_cost = PIT_LOSS + fresh[best]
+								self.value.append(np.minimum(stay, pit_cost))
+								self.pit.append(pit_cost < stay)
+								self.fresh.append(float(fresh[best]))
+								self.best_compound.append(best)
+
+		def stint_plan(self, laps, compound, max_stops):
+				# Stops taken after fitting `compound` with `laps` to go, as
+				# (laps run before the stop, new compound)
+				stops = []
+				age = 0
+				for remaining in range(laps, 0, -1):
+						if self.pit[remaining][compound, min(age, self.max_age)]:
+								if len(stops) >= max_stops:
+										break
+								compound = self.best_compound[remaining]
+								stops.append((laps - remaining, compound))
+								age = 0
+						age += 1
+				return stops
+
+
+# Minimum expected race time pit plans. Tables are shared between sessions
+# and laps, keyed on weather and the rounded wear model, so the per-lap work
+# is one pass over the current stint plus table lookups.
+class StrategyOptimizer:
+		def __init__(self, max_tables=16, horizon=MAX_HORIZON):
+				self.max_tables = max_tables
+				self.horizon = horizon
+				self.solves = 0
+				self._tables = OrderedDict()
+				self._lock = threading.Lock()
+
+		def table(self, sim, wet):
+				model = sim.degradation
+				coefficients = model.fit_key(COMPOUNDS, wet)
+				key = (wet, coefficients)
+				with self._lock:
+						table = self._tables.get(key)
+						if table is not None:
+								self._tables.move_to_end(key)
+								return table
+				ages = np.arange(1, MAX_TYRE_AGE + 1)
+				features = model.feature(ages)
+				wear_added = np.array([
+						coefficients[2 * c] * COEFFICIENT_STEP + coefficients[2 * c + 1] * COEFFICIENT_STEP * features
+						for c in range(len(COMPOUNDS))
+				])
+				pace = COMPOUND_WET_PENALTY if wet else COMPOUND_DRY_PACE
+				table = StrategyTable(wear_added, pace)
+				with self._lock:
+						self.solves += 1
+						self._tables[key] = table
+						while len(self._tables) > self.max_tables:
+								self._tables.popitem(last=False)
+				return table
+
+		def optimize(self, sim, max_stops=3):
+				# Best plan from the simulator's current state to the flag (or the
+				# horizon), assuming today's weather holds. A stop under the safety
+				# car costs what the field compression leaves of PIT_LOSS.
+				wet = sim.weather == "Wet"
+				laps = min(sim.total_laps - sim.lap, self.horizon)
+				if laps <= 0:
+						return {'stops': [], 'expected_time': 0.0, 'stay_out_time': 0.0, 'pit_now_time': 0.0,
+										'pit_now_compound': sim.tyre_compound}
+				table = self.table(sim, wet)
+				table.extend(laps)
+
+				# Cost of staying out k more laps on the current set, then the best
+				# fresh-tyre plan for the rest (k = laps: no more stops)
+				compound = COMPOUND_CODES[sim.tyre_compound]
+				intercept, slope = sim.degradation.coefficients(sim.tyre_compound, wet)
+				ages = sim.tyre_age + np.arange(1, laps + 1)
+				wear = np.minimum(100.0, sim.tyre_wear + np.cumsum(intercept + slope * sim.degradation.feature(ages)))
+				pace = (COMPOUND_WET_PENALTY if wet else COMPOUND_DRY_PACE)[compound]
+				stint_time = np.concatenate([[0.0], np.cumsum(BASE_LAP_TIME + wear / 100 * WEAR_TIME_PENALTY + pace)])
+				rest = np.array(table.fresh[laps::-1])
+				stop_loss = np.full(laps + 1, PIT_LOSS)
+				stop_loss[-1] = 0.0
+				stop_loss[0] = pit_loss(sim.safety_car)
+				total = stint_time + stop_loss + rest
+				first = int(total.argmin())
+
+				stops = []
+				if first < laps:
+						fitted = table.best_compound[laps - first]
+						stops.append((first, fitted))
+						for run, new in table.stint_plan(laps - first, fitted, max_stops - 1):
+								stops.append((first + run, new))
+				return {
+						'stops': [{'lap': sim.lap + run, 'compound': COMPOUNDS[new]} for run, new in stops],
+						'expected_time': float(total[first]),
+						'stay_out_time': float(total[1:].min()) if laps > 1 else float(total[-1]),
+						'pit_now_time': float(total[0]),
+						# Tyres for the rest of the race if the car pits at the end of this lap
+						'pit_now_compound': COMPOUNDS[table.best_compound[laps]]
+				}
+
+		def stats(self):
+				return {
+						'tables': len(self._tables),
+						'solves': self.solves,
+						'bytes': sum(table.nbytes for table in self._tables.values())
+				}
+
+
+optimizer = StrategyOptimizer()
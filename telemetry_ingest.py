@@ -0,0 +1,305 @@
+import socket
+import threading
+import time
+from itertools import islice
+
+import numpy as np
+
+from anomaly_detector import SAMPLE_CHANNELS, SampleAnomalies
+
+# Recorded channels, in column order after the time/car/lap header
+CHANNELS = ('speed', 'tyre_temp', 'battery', 'fuel')
+
+# One telemetry sample; UDP datagrams and .npy recordings are packed arrays of these
+SAMPLE_DTYPE = np.dtype([('time', '<f8'), ('car', '<u2'), ('lap', '<u2')]
+												+ [(name, '<f4') for name in CHANNELS])
+
+# One car's aggregated lap: mean of every channel, min/max speed and tyre temp,
+# and the battery/fuel level at the end of the lap
+LAP_DTYPE = np.dtype([('lap', '<i4'), ('start', '<f8'), ('lap_time', '<f8'), ('samples', '<i4')]
+										 + [(name, '<f4') for name in CHANNELS]
+										 + [('speed_min', '<f4'), ('speed_max', '<f4'),
+												('tyre_temp_min', '<f4'), ('tyre_temp_max', '<f4'),
+												('battery_end', '<f4'), ('fuel_end', '<f4')])
+
+SPEED, TYRE_TEMP, BATTERY, FUEL = range(len(CHANNELS))
+NO_LAP = np.iinfo(np.int64).max
+
+
+# Last `capacity` samples of every channel for each car. Writes wrap around,
+# so memory is fixed however long the session runs.
+class TelemetryRing:
+		def __init__(self, n_cars=20, capacity=4096):
+				self.n_cars = n_cars
+				self.capacity = capacity
+				self.times = np.zeros((n_cars, capacity))
+				self.values = np.zeros((len(CHANNELS), n_cars, capacity), dtype=np.float32)
+				# Samples ever written per car; the write slot is written % capacity
+				self.written = np.zeros(n_cars, dtype=np.int64)
+
+		@property
+		def nbytes(self):
+				return self.times.nbytes + self.values.nbytes + self.written.nbytes
+
+		def push(self, cars, times, values):
+				# values: (len(CHANNELS), n) in the same order as cars/times
+				order = np.argsort(cars, kind='stable')
+				cars = cars[order]
+				counts = np.bincount(cars, minlength=self.n_cars)
+				rank = np.arange(len(cars)) - (np.cumsum(counts) - counts)[cars]
+				# Only the newest `capacity` samples of a car can survive one push
+				keep = rank >= counts[cars] - self.capacity
+				cars, rank, order = cars[keep], rank[keep], order[keep]
+				slots = (self.written[cars] + rank) % self.capacity
+				self.times[cars, slots] = times[order]
+				self.values[:, cars, slots] = values[:, order]
+				self.written += counts
+
+		def latest(self, car, n=None, channel=None):
+				# Up to n most recent samples of one car, oldest first
+				available = int(min(self.written[car], self.capacity))
+				n = available if n is None else min(n, available)
+				slots = (self.written[car] - n + np.arange(n)) % self.capacity
+				values = self.values[:, car, slots] if channel is None else self.values[CHANNELS.index(channel), car, slots]
+				return self.times[car, slots], values
+
+
+# Running per-car sums for the lap in progress; a lap is closed when the first
+# sample of a later lap arrives and kept in a per-car table of the last
+# `lap_capacity` laps.
+class LapAggregator:
+		def __init__(self, n_cars=20, lap_capacity=128):
+				self.n_cars = n_cars
+				self.lap_capacity = lap_capacity
+				self.current_lap = np.full(n_cars, -1, dtype=np.int64)
+				self.laps = np.zeros((n_cars, lap_capacity), dtype=LAP_DTYPE)
+				self.laps['lap'] = -1
+				self.late_samples = 0
+
+				channels = len(CHANNELS)
+				self.count = np.zeros(n_cars, dtype=np.int64)
+				self.sum = np.zeros((n_cars, channels))
+				self.min = np.zeros((n_cars, channels))
+				self.max = np.zeros((n_cars, channels))
+				self.last = np.zeros((n_cars, channels))
+				self.start = np.zeros(n_cars)
+				self._reset(slice(None))
+
+		@property
+		def nbytes(self):
+				running = self.sum.nbytes + self.min.nbytes + self.max.nbytes + self.last.nbytes
+				return self.laps.nbytes + running + self.count.nbytes + self.start.nbytes
+
+		def _reset(self, cars):
+				self.count[cars] = 0
+				self.sum[cars] = 0
+				self.min[cars] = np.inf
+				self.max[cars] = -np.inf
+				self.start[cars] = np.inf
+
+		def add(self, cars, laps, times, values):
+				# values: (n, len(CHANNELS)); samples must be in time order per car
+				late = laps < self.current_lap[cars]
+				self.late_samples += int(late.sum())
+				pending = ~late
+				while pending.any():
+						current = pending & (laps == self.current_lap[cars])
+						if current.any():
+								self._accumulate(cars[current], times[current], values[current])
+								pending &= ~current
+								if not pending.any():
+										break
+						# Cars with samples from a later lap close their lap and move on
+						next_lap = np.full(self.n_cars, NO_LAP)
+						next_start = np.full(self.n_cars, np.inf)
+						np.minimum.at(next_lap, cars[pending], laps[pending])
+						np.minimum.at(next_start, cars[pending], times[pending])
+						moving = np.flatnonzero(next_lap != NO_LAP)
+						self._close(moving, next_start[moving])
+						self.current_lap[moving] = next_lap[moving]
+
+		def _accumulate(self, cars, times, values):
+				np.add.at(self.sum, cars, values)
+				np.minimum.at(self.min, cars, values)
+				np.maximum.at(self.max, cars, values)
+				np.minimum.at(self.start, cars, times)
+				self.count += np.bincount(cars, minlength=self.n_cars)
+				# Last sample of each car in this batch
+				unique, from_end = np.unique(cars[::-1], return_index=True)
+				self.last[unique] = values[len(cars) - 1 - from_end]
+
+		def _close(self, cars, next_start):
+				# The lap runs from its first sample to the first sample of the next
+				has_samples = self.count[cars] > 0
+				closed, next_start = cars[has_samples], next_start[has_samples]
+				lap = self.current_lap[closed]
+				count = self.count[closed]
+				mean = self.sum[closed] / count[:, None]
+				record = np.zeros(len(closed), dtype=LAP_DTYPE)
+				record['lap'] = lap
+				record['start'] = self.start[closed]
+				record['lap_time'] = next_start - self.start[closed]
+				record['samples'] = count
+				for i, name in enumerate(CHANNELS):
+						record[name] = mean[:, i]
+				record['speed_min'] = self.min[closed, SPEED]
+				record['speed_max'] = self.max[closed, SPEED]
+				record['tyre_temp_min'] = self.min[closed, TYRE_TEMP]
+				record['tyre_temp_max'] = self.max[closed, TYRE_TEMP]
+				record['battery_end'] = self.last[closed, BATTERY]
+				record['fuel_end'] = self.last[closed, FUEL]
+				self.laps[closed, lap % self.lap_capacity] = record
+				self._reset(cars)
+
+		def lap(self, car, lap):
+				# Aggregate for a completed lap, or None if not (or no longer) held
+				record = self.laps[car, lap % self.lap_capacity]
+				return record if record['lap'] == lap else None
+
+
+# Ring buffers plus lap aggregation for every car in the feed, and optionally
+# anomaly checks on every sample
+class TelemetryIngest:
+		def __init__(self, n_cars=20, capacity=4096, lap_capacity=128, detect_anomalies=True):
+				self.n_cars = n_cars
+				self.ring = TelemetryRing(n_cars, capacity)
+				self.aggregator = LapAggregator(n_cars, lap_capacity)
+				self.anomalies = SampleAnomalies(n_cars) if detect_anomalies else None
+				self._anomaly_rows = [CHANNELS.index(name) for name in SAMPLE_CHANNELS]
+				self.samples = 0
+				self.rejected = 0
+				self._lock = threading.Lock()
+
+		@property
+		def nbytes(self):
+				anomalies = self.anomalies.nbytes if self.anomalies is not None else 0
+				return self.ring.nbytes + self.aggregator.nbytes + anomalies
+
+		def ingest(self, samples):
+				# samples: structured array of SAMPLE_DTYPE in time order
+				valid = samples['car'] < self.n_cars
+				if not valid.all():
+						self.rejected += int((~valid).sum())
+						samples = samples[valid]
+				if not len(samples):
+						return
+				cars = samples['car'].astype(np.intp)
+				laps = samples['lap'].astype(np.int64)
+				times = samples['time']
+				values = np.stack([samples[name] for name in CHANNELS])
+				with self._lock:
+						self.ring.push(cars, times, values)
+						self.aggregator.add(cars, laps, times, values.T)
+						if self.anomalies is not None:
+								self.anomalies.update(cars, laps, values[self._anomaly_rows])
+						self.samples += len(samples)
+
+		def lap(self, car, lap):
+				with self._lock:
+						record = self.aggregator.lap(car, lap)
+						return None if record is None else record.copy()
+
+		def latest(self, car, n=None, channel=None):
+				with self._lock:
+						times, values = self.ring.latest(car, n, channel)
+						return times.copy(), values.copy()
+
+		def alerts(self, car, lap, laps):
+				# Sample anomalies of one car on the last `laps` laps up to `lap`
+				if self.anomalies is None:
+						return []
+				with self._lock:
+						return self.anomalies.recent(car, lap, laps)
+
+		def stats(self):
+				return {
+						'samples': self.samples,
+						'late_samples': self.aggregator.late_samples,
+						'rejected': self.rejected,
+						'bytes': self.nbytes
+				}
+
+
+def apply_lap(sim, record):
+		# Per-lap values shown by the dashboard, taken from recorded telemetry
+		sim.speed = float(record['speed'])
+		sim.tyre_temp = float(record['tyre_temp'])
+		sim.battery = float(record['battery_end'])
+		sim.fuel = float(record['fuel_end'])
+
+
+def read_file(path, chunk_samples=2000):
+		# Chunks of SAMPLE_DTYPE from a .npy recording or a CSV with a header row
+		# of time,car,lap,speed,tyre_temp,battery,fuel
+		if str(path).endswith('.npy'):
+				recording = np.load(path, mmap_mode='r')
+				for start in range(0, len(recording), chunk_samples):
+						yield np.asarray(recording[start:start + chunk_samples]).astype(SAMPLE_DTYPE)
+				return
+		with open(path) as handle:
+				next(handle)
+				while True:
+						lines = list(islice(handle, chunk_samples))
+						if not lines:
+								return
+						rows = np.loadtxt(lines, delimiter=',', ndmin=2)
+						chunk = np.zeros(len(rows), dtype=SAMPLE_DTYPE)
+						for i, name in enumerate(SAMPLE_DTYPE.names):
+								chunk[name] = rows[:, i]
+						yield chunk
+
+
+def read_udp(host, port, timeout=1.0, stop=None):
+		# Datagrams of packed SAMPLE_DTYPE records; yields an empty chunk on timeout
+		sock = socket.socket(socket.AF_INET, socket.SOCK_DGRAM)
+		sock.bind((host, port))
+		sock.settimeout(timeout)
+		try:
+				while stop is None or not stop.is_set():
+						try:
+								data = sock.recv(65535)
+						except socket.timeout:
+								yield np.zeros(0, dtype=SAMPLE_DTYPE)
+								continue
+						usable = len(data) - len(data) % SAMPLE_DTYPE.itemsize
+						yield np.frombuffer(data[:usable], dtype=SAMPLE_DTYPE)
+		finally:
+				sock.close()
+
+
+def open_source(source, stop=None):
+		# "udp://host:port" or a file path
+		if source.startswith('udp://'):
+				host, port = source[len('udp://'):].rsplit(':', 1)
+				return read_udp(host, int(port), stop=stop)
+		return read_file(source)
+
+
+# Background reader feeding a TelemetryIngest. File recordings are paced by
+# their timestamps (`speed` x real time, 0 for as fast as possible).
+class TelemetryFeed(threading.Thread):
+		def __init__(self, source, ingest, speed=1.0):
+				super().__init__(name="telemetry-feed", daemon=True)
+				self.source = source
+				self.ingest = ingest
+				self.speed = speed
+				self.stopped = threading.Event()
+
+		def run(self):
+				paced = self.speed > 0 and not self.source.startswith('udp://')
+				first_time = started = None
+				for chunk in open_source(self.source, stop=self.stopped):
+						if self.stopped.is_set():
+								break
+						if not len(chunk):
+								continue
+						if paced:
+								if first_time is None:
+										first_time, started = chunk['time'][0], time.monotonic()
+								due = started + (chunk['time'][0] - first_time) / self.speed
+								if self.stopped.wait(max(0.0, due - time.monotonic())):
+										break
+						self.ingest.ingest(chunk)
+
+		def stop(self):
+				self.stopped.set()
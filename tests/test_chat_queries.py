@@ -0,0 +1,61 @@
+import importlib.util
+import os
+
+import pytest
+
+from rolling_stats import parse_stats_query
+
+DASHBOARD_PATH = os.path.join(os.path.dirname(os.path.dirname(os.path.abspath(__file__))), 'FInal Dashboard.py')
+
+# Questions for the other chat answers, with a phrase of the answer they get
+OTHER_INTENTS = (
+		("best time to pit?", "STAY OUT"),
+		("tyre degradation, should I pit", "STAY OUT"),
+		("fuel per lap", "I can help with"),
+		("position trend", "Currently P"),
+		("any alerts on battery degradation", "anomal"),
+)
+
+
+@pytest.fixture(scope='module')
+def dashboard():
+		spec = importlib.util.spec_from_file_location('dashboard', DASHBOARD_PATH)
+		module = importlib.util.module_from_spec(spec)
+		spec.loader.exec_module(module)
+		return module
+
+
+def ask(dashboard, session_id, question):
+		_, history, _ = dashboard.update_chat(1, question, [], {'session_id': session_id})
+		return history[-1]['message']
+
+
+@pytest.mark.parametrize('question', [question for question, _ in OTHER_INTENTS])
+def test_other_questions_are_not_stats(question):
+		assert parse_stats_query(question) is None
+
+
+@pytest.mark.parametrize('question, stat, scope, laps', [
+		("average lap time over the last 10 laps", 'mean', 'race', 10),
+		("pace over the last 10 laps on mediums", 'mean', 'compound', 10),
+		("best lap since the pit stop", 'min', 'stint', None),
+		("deg per lap this stint", 'slope', 'stint', None),
+		("what's our best lap?", 'min', 'race', None),
+])
+def test_stats_questions(question, stat, scope, laps):
+		query = parse_stats_query(question)
+		assert (query['stat'], query['scope'], query['laps']) == (stat, scope, laps)
+
+
+@pytest.mark.parametrize('question, answer', OTHER_INTENTS)
+def test_chat_routes_other_questions(dashboard, question, answer):
+		session_id = dashboard.sessions.create()
+		entry = dashboard.sessions.get(session_id)
+		for _ in range(5):
+				entry.simulator.simulate_lap()
+		reply = ask(dashboard, session_id, question)
+		if answer == "STAY OUT":
+				strategy = dashboard.strategy_cache.recommendation(entry.simulator)
+				answer = strategy['recommendation']
+		assert answer in reply
+		assert "over the last" not in reply and "this race is" not in reply
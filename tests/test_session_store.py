@@ -0,0 +1,27 @@
+import pytest
+
+from session_store import SessionStore
+
+
+def test_unknown_ids_are_not_created():
+		sessions = SessionStore()
+		assert sessions.lookup('forged') is None
+		with pytest.raises(KeyError):
+				sessions.get('forged')
+		assert len(sessions) == 0
+
+
+def test_only_the_owner_key_is_authorized():
+		sessions = SessionStore()
+		entry = sessions.get(sessions.create())
+		assert sessions.authorize(entry, entry.owner_key)
+		assert not sessions.authorize(entry, 'forged')
+		assert not sessions.authorize(entry, None)
+
+
+def test_keyless_sessions_have_no_owner():
+		sessions = SessionStore()
+		entry = sessions.get(sessions.create())
+		entry.owner_key = None
+		assert not sessions.authorize(entry, 'first')
+		assert entry.owner_key is None